@@ -0,0 +1,141 @@
+"""
+Runs the benchmark suite and compares results against a stored baseline.
+
+Run with `python -m benchmarks run` and `python -m benchmarks compare`.
+"""
+import datetime
+import json
+import pathlib
+import platform
+import sys
+
+import click
+
+from . import suite
+
+default_baseline = pathlib.Path(__file__).parent / "baseline.json"
+
+
+@click.group()
+def main() -> None:
+    """
+    Benchmarks of the hot paths of vigilant-crypto-snatch.
+    """
+
+
+@main.command()
+@click.option(
+    "--filter",
+    "pattern",
+    default=None,
+    help="Only run benchmarks whose name contains this string.",
+)
+@click.option(
+    "--quick",
+    is_flag=True,
+    help="Skip sizes above 10,000 rows.",
+)
+@click.option(
+    "--samples",
+    type=click.IntRange(min=1),
+    default=5,
+    show_default=True,
+    help="Number of timed samples per benchmark.",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    default=None,
+    help="Write the results to this JSON file.",
+)
+@click.option(
+    "--save-baseline",
+    is_flag=True,
+    help=f"Write the results to {default_baseline.name}.",
+)
+def run(pattern, quick, samples, output, save_baseline) -> None:
+    """
+    Run the benchmarks.
+    """
+    results = suite.run_suite(
+        pattern=pattern,
+        max_size=10_000 if quick else None,
+        samples=samples,
+        report=lambda measurement: print(
+            f"{measurement.key:50} {format_duration(measurement.median):>10}"
+            f" (min {format_duration(measurement.minimum)})",
+            flush=True,
+        ),
+    )
+    document = dict(
+        created=datetime.datetime.now().isoformat(timespec="seconds"),
+        python=sys.version.split()[0],
+        platform=platform.platform(),
+        machine=platform.machine(),
+        benchmarks={key: value.to_primitives() for key, value in results.items()},
+    )
+    paths = ([output] if output else []) + ([default_baseline] if save_baseline else [])
+    for path in paths:
+        with open(path, "w") as f:
+            json.dump(document, f, indent=2)
+            f.write("\n")
+
+
+@main.command()
+@click.argument(
+    "current", type=click.Path(exists=True, dir_okay=False, path_type=pathlib.Path)
+)
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, dir_okay=False, path_type=pathlib.Path),
+    default=default_baseline,
+    show_default=True,
+    help="Results to compare against.",
+)
+@click.option(
+    "--threshold",
+    type=click.FloatRange(min=1.0),
+    default=1.25,
+    show_default=True,
+    help="Ratio of the medians above which a benchmark counts as a regression.",
+)
+def compare(current, baseline, threshold) -> None:
+    """
+    Compare results against a baseline. Exits with status 1 on regressions.
+    """
+    with open(baseline) as f:
+        old = json.load(f)["benchmarks"]
+    with open(current) as f:
+        new = json.load(f)["benchmarks"]
+
+    regressions = 0
+    for key in sorted(set(old) & set(new)):
+        ratio = new[key]["median"] / old[key]["median"]
+        if ratio > threshold:
+            verdict = "slower"
+            regressions += 1
+        elif ratio < 1 / threshold:
+            verdict = "faster"
+        else:
+            verdict = ""
+        print(
+            f"{key:50} {format_duration(old[key]['median']):>10}"
+            f" {format_duration(new[key]['median']):>10} {ratio:6.2f}x {verdict}"
+        )
+    for key in sorted(set(new) - set(old)):
+        print(f"{key:50} {'':>10} {format_duration(new[key]['median']):>10} new")
+
+    if regressions:
+        print(f"{regressions} benchmarks are slower by more than {threshold}x.")
+        sys.exit(1)
+
+
+def format_duration(seconds: float) -> str:
+    for unit, factor in [("s", 1.0), ("ms", 1e-3), ("µs", 1e-6)]:
+        if seconds >= factor:
+            return f"{seconds / factor:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+if __name__ == "__main__":
+    main()
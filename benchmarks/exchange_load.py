@@ -0,0 +1,112 @@
+"""
+Sweep times of the watch loop against the local exchange simulator.
+
+The simulator answers like Kraken and Crypto Compare with log-normal latencies,
+injected errors and the rate limits of the real services. The triggers are
+built the same way as in the `watch` command, so the sweeps include the
+database, the caching historical source and all trigger conditions. The clients
+use the rate limits of the real services, as they would without the simulator.
+
+Run with `python -m benchmarks.exchange_load`.
+"""
+import datetime
+import time
+from typing import List
+
+import krakenex
+import numpy as np
+
+from vigilant_crypto_snatch.core import AssetPair
+from vigilant_crypto_snatch.datastorage import make_datastore
+from vigilant_crypto_snatch.exchange_simulator import ExchangeSimulator
+from vigilant_crypto_snatch.exchange_simulator import FaultModel
+from vigilant_crypto_snatch.exchange_simulator import LatencyModel
+from vigilant_crypto_snatch.exchange_simulator import SimulatorConfig
+from vigilant_crypto_snatch.historical import CachingHistoricalSource
+from vigilant_crypto_snatch.historical import CryptoCompareConfig
+from vigilant_crypto_snatch.historical import CryptoCompareHistoricalSource
+from vigilant_crypto_snatch.historical import DatabaseHistoricalSource
+from vigilant_crypto_snatch.historical import MarketSource
+from vigilant_crypto_snatch.marketplace import KrakenConfig
+from vigilant_crypto_snatch.marketplace.krakenex_adaptor import KrakenexMarketplace
+from vigilant_crypto_snatch.ratelimit import api_limits
+from vigilant_crypto_snatch.ratelimit import RequestScheduler
+from vigilant_crypto_snatch.triggers import make_triggers
+from vigilant_crypto_snatch.triggers import TriggerSpec
+from vigilant_crypto_snatch.watchloop import TriggerLoop
+
+coins = ["BTC", "ETH", "XRP", "ADA"]
+
+
+def make_trigger_specs(count: int) -> List[TriggerSpec]:
+    return [
+        TriggerSpec(
+            name=f"Trigger {i}",
+            asset_pair=AssetPair(coins[i % len(coins)], "EUR"),
+            cooldown_minutes=60,
+            volume_fiat=25.0,
+            delay_minutes=[10, 60, 240][i % 3],
+            drop_percentage=[-100, 1, 5][i % 3],
+        )
+        for i in range(count)
+    ]
+
+
+def make_simulator_config() -> SimulatorConfig:
+    return SimulatorConfig(
+        kraken_latency=LatencyModel(median_seconds=0.08, sigma=0.5),
+        crypto_compare_latency=LatencyModel(median_seconds=0.05, sigma=0.7),
+        faults=FaultModel(
+            insufficient_funds=0.05,
+            server_error=0.02,
+            timeout=0.005,
+            stall_seconds=2.0,
+        ),
+    )
+
+
+def make_scheduler(api: str) -> RequestScheduler:
+    return RequestScheduler(f"simulated {api}", api_limits[api])
+
+
+def main(count: int = 20, sweeps: int = 10) -> None:
+    with ExchangeSimulator(make_simulator_config()) as simulator:
+        handle = krakenex.API("key", "c2VjcmV0")
+        handle.uri = simulator.url
+        market = KrakenexMarketplace(KrakenConfig("key", "c2VjcmV0", False, {}), handle)
+        market.public_scheduler = make_scheduler("api.kraken.com/0/public")
+        market.private_scheduler = make_scheduler("api.kraken.com/0/private")
+        crypto_compare = CryptoCompareHistoricalSource(
+            CryptoCompareConfig("key"), simulator.url
+        )
+        crypto_compare.scheduler = make_scheduler("min-api.cryptocompare.com")
+        datastore = make_datastore(None)
+        caching_source = CachingHistoricalSource(
+            DatabaseHistoricalSource(datastore, datetime.timedelta(minutes=5)),
+            [MarketSource(market), crypto_compare],
+            datastore,
+        )
+        triggers = make_triggers(
+            make_trigger_specs(count), datastore, caching_source, market
+        )
+        trigger_loop = TriggerLoop(triggers, sleep=0)
+
+        durations = []
+        for sweep in range(sweeps):
+            start = time.perf_counter()
+            trigger_loop.check_triggers()
+            durations.append(time.perf_counter() - start)
+
+    p50, p90, p99 = np.percentile(durations, [50, 90, 99])
+    print(f"{count} triggers, {sweeps} sweeps")
+    print(f"sweep time p50: {p50:6.3f} s")
+    print(f"sweep time p90: {p90:6.3f} s")
+    print(f"sweep time p99: {p99:6.3f} s")
+    print(f"sweep time max: {max(durations):6.3f} s")
+    print("Requests:")
+    for (endpoint, outcome), number in sorted(simulator.counts.items()):
+        print(f"  {endpoint:15} {outcome:20} {number:6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Synthetic data for the benchmarks.
+
+All prices follow `historical.mock.mock_price`, so the data is deterministic and
+no network access is needed.
+"""
+import datetime
+import pathlib
+from typing import List
+
+import pandas as pd
+
+from vigilant_crypto_snatch.core import AssetPair
+from vigilant_crypto_snatch.datastorage.sqlalchemy_store import AlchemyMigration
+from vigilant_crypto_snatch.datastorage.sqlalchemy_store import AlchemyPrice
+from vigilant_crypto_snatch.datastorage.sqlalchemy_store import AlchemyTrade
+from vigilant_crypto_snatch.datastorage.sqlalchemy_store import SqlAlchemyDatastore
+from vigilant_crypto_snatch.historical.mock import mock_price
+from vigilant_crypto_snatch.triggers import TriggerSpec
+
+coins = ["BTC", "ETH", "XRP", "ADA"]
+fiat = "EUR"
+start = datetime.datetime(2018, 1, 1)
+
+
+def make_price_rows(
+    count: int, step: datetime.timedelta = datetime.timedelta(minutes=5)
+) -> List[dict]:
+    rows = []
+    for i in range(count):
+        timestamp = start + i * step
+        rows.append(
+            dict(
+                timestamp=timestamp,
+                last=mock_price(timestamp),
+                coin=coins[i % len(coins)],
+                fiat=fiat,
+            )
+        )
+    return rows
+
+
+def make_trade_rows(
+    count: int,
+    step: datetime.timedelta = datetime.timedelta(minutes=30),
+    triggers: int = 7,
+) -> List[dict]:
+    rows = []
+    for i in range(count):
+        timestamp = start + i * step
+        price = mock_price(timestamp)
+        rows.append(
+            dict(
+                timestamp=timestamp,
+                trigger_name=f"Trigger {i % triggers}",
+                volume_coin=25.0 / price,
+                volume_fiat=25.0,
+                coin=coins[i % len(coins)],
+                fiat=fiat,
+            )
+        )
+    return rows
+
+
+def make_datastore(
+    path: pathlib.Path, prices: int = 0, trades: int = 0
+) -> SqlAlchemyDatastore:
+    """
+    Creates a database file with the given number of prices and trades.
+
+    The rows are bulk inserted and the database is opened again afterwards, such
+    that the trade aggregates are built as on startup.
+    """
+    datastore = SqlAlchemyDatastore(path)
+    for offset in range(0, prices, 100_000):
+        datastore.session.bulk_insert_mappings(
+            AlchemyPrice, make_price_rows(min(100_000, prices - offset))
+        )
+    if trades:
+        datastore.session.bulk_insert_mappings(AlchemyTrade, make_trade_rows(trades))
+        # Like a database from an older version, so that the aggregates of the
+        # inserted trades are built when it is opened again.
+        datastore.session.query(AlchemyMigration).delete()
+    datastore.session.commit()
+    datastore.close()
+    return SqlAlchemyDatastore(path)
+
+
+def make_hourly_json(count: int, first: datetime.datetime = start) -> List[dict]:
+    """
+    Hourly bars in the format of the Crypto Compare `histohour` endpoint. The
+    mock price is only positive from 2019 on.
+    """
+    rows = []
+    for i in range(count):
+        timestamp = first + datetime.timedelta(hours=i)
+        close = mock_price(timestamp)
+        rows.append(
+            dict(
+                time=int(timestamp.timestamp()),
+                high=close * 1.01,
+                low=close * 0.99,
+                open=close,
+                volumefrom=1.0,
+                volumeto=close,
+                close=close,
+                conversionType="direct",
+                conversionSymbol="",
+            )
+        )
+    return rows
+
+
+def make_trades_dataframe(count: int) -> pd.DataFrame:
+    return pd.DataFrame(make_trade_rows(count))
+
+
+def make_trigger_specs(count: int) -> List[TriggerSpec]:
+    return [
+        TriggerSpec(
+            name=f"Trigger {i}",
+            asset_pair=AssetPair(coins[i % len(coins)], fiat),
+            cooldown_minutes=60,
+            volume_fiat=25.0,
+            delay_minutes=[10, 60, 240][i % 3],
+            drop_percentage=[1, 5, 10][i % 3],
+        )
+        for i in range(count)
+    ]
+
+
+def make_log_message(lines: int, line_length: int = 120) -> str:
+    return "\n".join(
+        f"{i:06d} " + "x" * (line_length - 7 + (i % 5) * 1000) for i in range(lines)
+    )
@@ -0,0 +1,81 @@
+"""
+Memory needed per price for the different representations.
+
+`DataclassPrice` and `DataclassAssetPair` are the plain dataclasses that
+`core.Price` and `core.AssetPair` used to be, kept here for comparison.
+
+Run with `python -m benchmarks.memory_core_types`.
+"""
+import dataclasses
+import datetime
+import gc
+import tracemalloc
+from typing import Callable
+
+import numpy as np
+
+from vigilant_crypto_snatch.core import AssetPair
+from vigilant_crypto_snatch.core import Price
+from vigilant_crypto_snatch.evaluation.price_series import PriceSeries
+
+
+@dataclasses.dataclass()
+class DataclassAssetPair:
+    coin: str
+    fiat: str
+
+    def __hash__(self) -> int:
+        return hash((self.coin, self.fiat))
+
+
+@dataclasses.dataclass()
+class DataclassPrice:
+    timestamp: datetime.datetime
+    last: float
+    asset_pair: DataclassAssetPair
+
+
+def measure(make: Callable[[], object]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    result = make()
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main(count: int = 100_000) -> None:
+    start = datetime.datetime(2021, 1, 1)
+    timestamps = [start + datetime.timedelta(minutes=i) for i in range(count)]
+    lasts = [float(i) for i in range(count)]
+
+    # The timestamps and floats are shared by all variants, so only the
+    # containers are measured. Every row gets its own asset pair object,
+    # like prices loaded from the database do.
+    results = {
+        "dataclass": measure(
+            lambda: [
+                DataclassPrice(t, l, DataclassAssetPair("BTC", "EUR"))
+                for t, l in zip(timestamps, lasts)
+            ]
+        ),
+        "slotted": measure(
+            lambda: [
+                Price(t, l, AssetPair("BTC", "EUR")) for t, l in zip(timestamps, lasts)
+            ]
+        ),
+        "series": measure(
+            lambda: PriceSeries(
+                AssetPair("BTC", "EUR"),
+                np.array([t.timestamp() for t in timestamps]),
+                np.array(lasts),
+            )
+        ),
+    }
+    for name, size in results.items():
+        print(f"{name:>10}: {size / count:6.1f} bytes per price")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Time to build the trade report from a synthetic database with 100k trades.
+
+`legacy_add_gains` is the previous row-by-row implementation, kept here for
+comparison. Prices come from the mock source, so no network access is needed.
+
+Run with `python -m benchmarks.report_gains`.
+"""
+import datetime
+import pathlib
+import tempfile
+import time
+
+import pandas as pd
+
+from vigilant_crypto_snatch.datastorage.sqlalchemy_store import AlchemyTrade
+from vigilant_crypto_snatch.datastorage.sqlalchemy_store import SqlAlchemyDatastore
+from vigilant_crypto_snatch.historical import MockHistorical
+from vigilant_crypto_snatch.historical.mock import mock_price
+from vigilant_crypto_snatch.reporting.trades import add_gains
+from vigilant_crypto_snatch.reporting.trades import gather_trades
+
+coins = ["BTC", "ETH", "XRP", "ADA"]
+
+
+def make_database(path: pathlib.Path, count: int) -> SqlAlchemyDatastore:
+    datastore = SqlAlchemyDatastore(path)
+    start = datetime.datetime(2018, 1, 1)
+    rows = []
+    for i in range(count):
+        timestamp = start + datetime.timedelta(minutes=30 * i)
+        price = mock_price(timestamp)
+        rows.append(
+            dict(
+                timestamp=timestamp,
+                trigger_name=f"Trigger {i % 7}",
+                volume_coin=25.0 / price,
+                volume_fiat=25.0,
+                coin=coins[i % len(coins)],
+                fiat="EUR",
+            )
+        )
+    datastore.session.bulk_insert_mappings(AlchemyTrade, rows)
+    datastore.session.commit()
+    return datastore
+
+
+def legacy_add_gains(trades: pd.DataFrame, current_prices: dict) -> None:
+    trades["buy_price"] = trades["volume_fiat"] / trades["volume_coin"]
+    trades["current_value"] = [
+        row["volume_coin"] * current_prices[(row["coin"], row["fiat"])]
+        for index, row in trades.iterrows()
+    ]
+    trades["gains"] = trades["current_value"] - trades["volume_fiat"]
+    trades["day"] = [
+        datetime.datetime.combine(ts.date(), datetime.time.min)
+        for ts in trades["timestamp"]
+    ]
+    trades["month"] = [
+        datetime.datetime(ts.year, ts.month, 1) for ts in trades["timestamp"]
+    ]
+    trades["year"] = [ts.year for ts in trades["timestamp"]]
+
+
+def main(count: int = 100_000) -> None:
+    now = datetime.datetime(2022, 1, 1)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        datastore = make_database(pathlib.Path(tmpdir) / "trades.sqlite", count)
+
+        start = time.perf_counter()
+        trades = gather_trades(datastore)
+        gather_duration = time.perf_counter() - start
+
+        legacy_trades = trades.copy()
+        start = time.perf_counter()
+        legacy_add_gains(
+            legacy_trades, {(coin, "EUR"): mock_price(now) for coin in coins}
+        )
+        legacy_duration = time.perf_counter() - start
+
+        start = time.perf_counter()
+        add_gains(trades, MockHistorical(), now)
+        duration = time.perf_counter() - start
+
+    print(f"gather_trades:    {gather_duration:6.3f} s for {count} trades")
+    print(f"legacy add_gains: {legacy_duration:6.3f} s")
+    print(f"add_gains:        {duration:6.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+Benchmarks of the hot paths.
+
+Every benchmark has a setup, which is not timed, and a function that is timed.
+Benchmarks with sizes are run once per size. `destructive` benchmarks change
+their data, so they get a fresh setup for every sample.
+"""
+import dataclasses
+import datetime
+import pathlib
+import statistics
+import tempfile
+import time
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+
+import numpy as np
+
+from . import generators
+from vigilant_crypto_snatch.core import AssetPair
+from vigilant_crypto_snatch.datastorage import make_datastore
+from vigilant_crypto_snatch.evaluation import accumulate_value
+from vigilant_crypto_snatch.evaluation import make_dataframe_from_json
+from vigilant_crypto_snatch.evaluation import PriceSeries
+from vigilant_crypto_snatch.evaluation import simulate_portfolio
+from vigilant_crypto_snatch.evaluation import simulate_triggers
+from vigilant_crypto_snatch.evaluation import walk_forward
+from vigilant_crypto_snatch.evaluation.drop_survey import drop_survey
+from vigilant_crypto_snatch.evaluation.robustness import bootstrap_triggers
+from vigilant_crypto_snatch.historical import MockHistorical
+from vigilant_crypto_snatch.marketplace import MockMarketplace
+from vigilant_crypto_snatch.notifications.message_utils import chunk_message
+from vigilant_crypto_snatch.reporting.trades import add_gains
+from vigilant_crypto_snatch.triggers import make_triggers
+from vigilant_crypto_snatch.watchloop import TriggerLoop
+
+
+@dataclasses.dataclass()
+class Benchmark:
+    name: str
+    setup: Callable[[int], Callable[[], Any]]
+    sizes: Sequence[int]
+    destructive: bool = False
+
+    def get_key(self, size: int) -> str:
+        return f"{self.name}[{size}]"
+
+
+@dataclasses.dataclass()
+class Measurement:
+    key: str
+    median: float
+    minimum: float
+    samples: int
+
+    def to_primitives(self) -> Dict[str, Any]:
+        return dict(median=self.median, min=self.minimum, samples=self.samples)
+
+
+registry: List[Benchmark] = []
+
+
+def benchmark(
+    name: str, sizes: Sequence[int] = (1,), destructive: bool = False
+) -> Callable[[Callable[[int], Callable[[], None]]], Callable]:
+    """
+    Registers a benchmark. The decorated function does the setup for a size and
+    returns the function to time.
+    """
+
+    def decorator(make: Callable[[int], Callable[[], None]]) -> Callable:
+        registry.append(
+            Benchmark(
+                name=name,
+                setup=make,
+                sizes=sizes,
+                destructive=destructive,
+            )
+        )
+        return make
+
+    return decorator
+
+
+def measure(
+    benchmark: Benchmark,
+    size: int,
+    samples: int = 5,
+    min_sample_time: float = 0.05,
+) -> Measurement:
+    """
+    Times the benchmark. Fast functions are called several times per sample, so
+    that each sample takes at least `min_sample_time`.
+    """
+    timed = benchmark.setup(size)
+    number = 1
+    if not benchmark.destructive:
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                timed()
+            duration = time.perf_counter() - start
+            if duration >= min_sample_time or number >= 1_000_000:
+                break
+            number *= 10
+
+    durations = []
+    for sample in range(samples):
+        if benchmark.destructive and sample > 0:
+            timed = benchmark.setup(size)
+        start = time.perf_counter()
+        for _ in range(number):
+            timed()
+        durations.append((time.perf_counter() - start) / number)
+    return Measurement(
+        key=benchmark.get_key(size),
+        median=statistics.median(durations),
+        minimum=min(durations),
+        samples=samples,
+    )
+
+
+def run_suite(
+    pattern: Optional[str] = None,
+    max_size: Optional[int] = None,
+    samples: int = 5,
+    report: Callable[[Measurement], None] = lambda measurement: None,
+) -> Dict[str, Measurement]:
+    results = {}
+    for benchmark in registry:
+        if pattern is not None and pattern not in benchmark.name:
+            continue
+        for size in benchmark.sizes:
+            if max_size is not None and size > max_size:
+                continue
+            measurement = measure(benchmark, size, samples)
+            report(measurement)
+            results[measurement.key] = measurement
+    return results
+
+
+# The temporary directories live until the end of the run, so that the
+# database files of the setups stay available.
+_temporary_directories: List[tempfile.TemporaryDirectory] = []
+
+
+def _temporary_path(name: str) -> pathlib.Path:
+    directory = tempfile.TemporaryDirectory()
+    _temporary_directories.append(directory)
+    return pathlib.Path(directory.name) / name
+
+
+database_sizes = (1_000, 10_000, 100_000, 1_000_000)
+
+
+@benchmark("watchloop.loop_body", sizes=(10, 100))
+def bench_loop_body(size: int) -> Callable[[], None]:
+    datastore = make_datastore(None)
+    triggers = make_triggers(
+        generators.make_trigger_specs(size),
+        datastore,
+        MockHistorical(),
+        MockMarketplace(),
+    )
+    trigger_loop = TriggerLoop(triggers, sleep=0)
+    return trigger_loop.loop_body
+
+
+@benchmark("datastore.get_price_around", sizes=database_sizes)
+def bench_get_price_around(size: int) -> Callable[[], None]:
+    datastore = generators.make_datastore(_temporary_path("prices.sqlite"), size)
+    then = generators.start + size // 2 * datetime.timedelta(minutes=5)
+    coin = generators.coins[size // 2 % len(generators.coins)]
+    asset_pair = AssetPair(coin, generators.fiat)
+    tolerance = datetime.timedelta(minutes=30)
+    return lambda: datastore.get_price_around(then, asset_pair, tolerance)
+
+
+@benchmark("datastore.was_triggered_since", sizes=database_sizes)
+def bench_was_triggered_since(size: int) -> Callable[[], None]:
+    datastore = generators.make_datastore(_temporary_path("trades.sqlite"), trades=size)
+    asset_pair = AssetPair(generators.coins[0], generators.fiat)
+    then = generators.start
+    # Checks answer from the in-memory index, which the first check loads. The
+    # query that loads it is timed by `datastore.reconcile_last_trade_times`.
+    datastore.was_triggered_since("Trigger 0", asset_pair, then)
+    return lambda: datastore.was_triggered_since("Trigger 0", asset_pair, then)
+
+
+@benchmark("datastore.reconcile_last_trade_times", sizes=database_sizes)
+def bench_reconcile_last_trade_times(size: int) -> Callable[[], None]:
+    datastore = generators.make_datastore(_temporary_path("trades.sqlite"), trades=size)
+    return datastore._reconcile_last_trade_times
+
+
+@benchmark("datastore.clean_old", sizes=(1_000, 10_000), destructive=True)
+def bench_clean_old(size: int) -> Callable[[], None]:
+    datastore = generators.make_datastore(_temporary_path("clean.sqlite"), size)
+    cutoff = generators.start + size // 2 * datetime.timedelta(minutes=5)
+    return lambda: datastore.clean_old(cutoff)
+
+
+@benchmark("evaluation.make_dataframe_from_json", sizes=(2_000, 20_000))
+def bench_make_dataframe_from_json(size: int) -> Callable[[], None]:
+    data = generators.make_hourly_json(size)
+    return lambda: make_dataframe_from_json(data)
+
+
+@benchmark("evaluation.simulate_triggers", sizes=(200, 1_000))
+def bench_simulate_triggers(size: int) -> Callable[[], None]:
+    data = make_dataframe_from_json(generators.make_hourly_json(size))
+    asset_pair = AssetPair(generators.coins[0], generators.fiat)
+    specs = [
+        spec
+        for spec in generators.make_trigger_specs(6)
+        if spec.asset_pair == asset_pair
+    ]
+    return lambda: simulate_triggers(data, asset_pair, specs)
+
+
+@benchmark("evaluation.accumulate_value", sizes=(200, 1_000))
+def bench_accumulate_value(size: int) -> Callable[[], None]:
+    data = make_dataframe_from_json(generators.make_hourly_json(size))
+    asset_pair = AssetPair(generators.coins[0], generators.fiat)
+    specs = [
+        spec
+        for spec in generators.make_trigger_specs(6)
+        if spec.asset_pair == asset_pair
+    ]
+    trades, trigger_names = simulate_triggers(data, asset_pair, specs)
+    return lambda: accumulate_value(data, trades, trigger_names)
+
+
+@benchmark("evaluation.simulate_portfolio", sizes=(1_000, 26_280))
+def bench_simulate_portfolio(size: int) -> Callable[[], None]:
+    data = make_dataframe_from_json(generators.make_hourly_json(size))
+    series = [
+        PriceSeries.from_dataframe(data, AssetPair(coin, generators.fiat))
+        for coin in generators.coins
+    ]
+    specs = generators.make_trigger_specs(12)
+    return lambda: simulate_portfolio(series, specs, {generators.fiat: 10_000})
+
+
+@benchmark("evaluation.walk_forward", sizes=(2_000,))
+def bench_walk_forward(size: int) -> Callable[[], None]:
+    data = make_dataframe_from_json(generators.make_hourly_json(size))
+    asset_pair = AssetPair(generators.coins[0], generators.fiat)
+    return lambda: walk_forward(data, asset_pair, max_workers=1)
+
+
+@benchmark("evaluation.bootstrap_triggers", sizes=(100, 1_000))
+def bench_bootstrap_triggers(size: int) -> Callable[[], None]:
+    data = make_dataframe_from_json(
+        generators.make_hourly_json(2_000, datetime.datetime(2021, 1, 1))
+    )
+    asset_pair = AssetPair(generators.coins[0], generators.fiat)
+    specs = [
+        spec
+        for spec in generators.make_trigger_specs(12)
+        if spec.asset_pair == asset_pair
+    ]
+    return lambda: bootstrap_triggers(
+        data, asset_pair, specs, num_paths=size, seed=0, max_workers=1
+    )
+
+
+@benchmark("evaluation.drop_survey", sizes=(200, 1_000))
+def bench_drop_survey(size: int) -> Callable[[], None]:
+    data = make_dataframe_from_json(generators.make_hourly_json(size))
+    hours = np.arange(1, 48, 6)
+    drops = np.linspace(0.01, 0.2, 5)
+    return lambda: drop_survey(data, hours, drops)
+
+
+@benchmark("reporting.add_gains", sizes=(1_000, 10_000, 100_000))
+def bench_add_gains(size: int) -> Callable[[], None]:
+    trades = generators.make_trades_dataframe(size)
+    source = MockHistorical()
+    now = datetime.datetime(2022, 1, 1)
+    return lambda: add_gains(trades.copy(), source, now)
+
+
+@benchmark("notifications.chunk_message", sizes=(100, 10_000))
+def bench_chunk_message(size: int) -> Callable[[], None]:
+    message = generators.make_log_message(size)
+    return lambda: chunk_message(message)
@@ -1,3 +1,5 @@
+import pathlib
+
 import click
 import coloredlogs
 
@@ -25,13 +27,42 @@ def main(loglevel) -> None:
 
 
 @main.command()
-def watch():
+@click.option(
+    "--metrics-port",
+    type=int,
+    default=None,
+    help="Serve Prometheus metrics on this local port.",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Print a timing tree for every trigger and predicate after each sweep.",
+)
+@click.option(
+    "--profile-dir",
+    type=click.Path(file_okay=False, path_type=pathlib.Path),
+    default=None,
+    help="Also store periodic cProfile snapshots in this directory. Implies --profile.",
+)
+@click.option(
+    "--profile-interval",
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help="Take a cProfile snapshot every this many sweeps.",
+)
+@click.option(
+    "--adaptive-order",
+    is_flag=True,
+    help="Check trigger conditions in the order that rules out a buy the fastest, based on observed pass rates and latencies.",
+)
+def watch(metrics_port, profile, profile_dir, profile_interval, adaptive_order) -> None:
     """
     Watch the market and execute defined triggers.
     """
     from .commands import watch
 
-    watch.main()
+    watch.main(metrics_port, profile, profile_dir, profile_interval, adaptive_order)
 
 
 @main.command()
@@ -41,6 +72,47 @@ def evaluate() -> None:
     streamlit_ui.main()
 
 
+@main.command()
+@click.option("--coin", default=None, help="Coin to optimize, like BTC.")
+@click.option("--fiat", default=None, help="Fiat currency to optimize, like EUR.")
+@click.option(
+    "--train-days",
+    type=click.FloatRange(min=1),
+    default=28,
+    show_default=True,
+    help="Length of the windows in which the parameters are searched.",
+)
+@click.option(
+    "--test-days",
+    type=click.FloatRange(min=1),
+    default=7,
+    show_default=True,
+    help="Length of the windows in which the best parameters are tested.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of processes for the search. Defaults to the number of CPUs.",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    default=None,
+    help="Also write the summary to this CSV file.",
+)
+def optimize(coin, fiat, train_days, test_days, workers, output) -> None:
+    """
+    Search drop trigger parameters with walk-forward optimization.
+
+    Without a coin and fiat, all asset pairs with drop triggers in the
+    configuration are optimized.
+    """
+    from .commands import optimize
+
+    optimize.main(coin, fiat, train_days, test_days, workers, output)
+
+
 @main.command()
 def test_drive() -> None:
     from .commands import testdrive
@@ -0,0 +1,63 @@
+import pathlib
+from typing import List
+from typing import Optional
+
+import pandas as pd
+
+from .. import logger
+from ..configuration import run_migrations
+from ..configuration import YamlConfigurationFactory
+from ..core import AssetPair
+from ..evaluation import get_hourly_data
+from ..evaluation import make_dataframe_from_json
+from ..evaluation.walk_forward import walk_forward
+from ..triggers import TriggerSpec
+
+
+def main(
+    coin: Optional[str],
+    fiat: Optional[str],
+    train_days: float,
+    test_days: float,
+    workers: Optional[int],
+    output: Optional[pathlib.Path],
+) -> None:
+    run_migrations()
+    config = YamlConfigurationFactory().make_config()
+    if coin and fiat:
+        asset_pairs = [AssetPair(coin, fiat)]
+    else:
+        asset_pairs = get_drop_asset_pairs(config.triggers)
+    if not asset_pairs:
+        logger.error("There are no drop triggers in the configuration to optimize.")
+        return
+
+    summaries = []
+    for asset_pair in asset_pairs:
+        logger.info(f"Optimizing drop triggers for {asset_pair} …")
+        data = make_dataframe_from_json(
+            get_hourly_data(asset_pair, config.crypto_compare.api_key)
+        )
+        result = walk_forward(
+            data,
+            asset_pair,
+            train_days=train_days,
+            test_days=test_days,
+            max_workers=workers,
+        )
+        print(f"{asset_pair.coin}/{asset_pair.fiat}")
+        print(result.summary.to_string(index=False))
+        summaries.append(
+            result.summary.assign(coin=asset_pair.coin, fiat=asset_pair.fiat)
+        )
+
+    if output is not None:
+        pd.concat(summaries, ignore_index=True).to_csv(output, index=False)
+
+
+def get_drop_asset_pairs(trigger_specs: List[TriggerSpec]) -> List[AssetPair]:
+    asset_pairs = []
+    for trigger_spec in trigger_specs:
+        if trigger_spec.drop_percentage and trigger_spec.asset_pair not in asset_pairs:
+            asset_pairs.append(trigger_spec.asset_pair)
+    return asset_pairs
@@ -1,2 +1,3 @@
+from . import optimize
 from . import testdrive
 from . import watch
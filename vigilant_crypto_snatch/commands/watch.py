@@ -1,4 +1,6 @@
 import datetime
+import pathlib
+from typing import Optional
 
 from .. import __version__
 from .. import logger
@@ -13,14 +15,25 @@ from ..historical import MarketSource
 from ..marketplace import check_and_perform_widthdrawal
 from ..marketplace import make_marketplace
 from ..marketplace import report_balances
+from ..metrics import InstrumentedDatastore
+from ..metrics import InstrumentedHistoricalSource
+from ..metrics import InstrumentedMarketplace
+from ..metrics import start_metrics_server
 from ..notifications import add_notify_run_logger
 from ..notifications import add_telegram_logger
 from ..paths import user_db_path
+from ..profiling import SweepProfiler
 from ..triggers import make_triggers
 from ..watchloop import TriggerLoop
 
 
-def main():
+def main(
+    metrics_port: Optional[int] = None,
+    profile: bool = False,
+    profile_dir: Optional[pathlib.Path] = None,
+    profile_interval: int = 10,
+    adaptive_order: bool = False,
+):
     run_migrations()
     config = YamlConfigurationFactory().make_config()
 
@@ -28,21 +41,39 @@ def main():
     add_notify_run_logger(config.notify_run)
     logger.info(f"Starting up with version {__version__} …")
 
-    datastore = make_datastore(user_db_path)
-    market = make_marketplace(
-        config.marketplace, config.bitstamp, config.kraken, config.ccxt
+    if metrics_port is not None:
+        start_metrics_server(metrics_port)
+
+    datastore = InstrumentedDatastore(make_datastore(user_db_path))
+    market = InstrumentedMarketplace(
+        make_marketplace(
+            config.marketplace, config.bitstamp, config.kraken, config.ccxt
+        )
     )
     check_and_perform_widthdrawal(market)
 
     report_balances(market, get_used_currencies(config.triggers))
 
-    database_source = DatabaseHistoricalSource(datastore, datetime.timedelta(minutes=5))
-    crypto_compare_source = CryptoCompareHistoricalSource(config.crypto_compare)
-    market_source = MarketSource(market)
-    caching_source = CachingHistoricalSource(
-        database_source, [market_source, crypto_compare_source], datastore
+    database_source = InstrumentedHistoricalSource(
+        DatabaseHistoricalSource(datastore, datetime.timedelta(minutes=5))
+    )
+    crypto_compare_source = InstrumentedHistoricalSource(
+        CryptoCompareHistoricalSource(config.crypto_compare, datastore=datastore)
+    )
+    market_source = InstrumentedHistoricalSource(MarketSource(market))
+    caching_source = InstrumentedHistoricalSource(
+        CachingHistoricalSource(
+            database_source, [market_source, crypto_compare_source], datastore
+        )
+    )
+    active_triggers = make_triggers(
+        config.triggers, datastore, caching_source, market, adaptive_order
     )
-    active_triggers = make_triggers(config.triggers, datastore, caching_source, market)
 
-    trigger_loop = TriggerLoop(active_triggers, config.polling_interval)
+    profiler = (
+        SweepProfiler(profile_dir, profile_interval)
+        if profile or profile_dir is not None
+        else None
+    )
+    trigger_loop = TriggerLoop(active_triggers, config.polling_interval, profiler)
     trigger_loop.loop()
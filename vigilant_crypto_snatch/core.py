@@ -1,33 +1,179 @@
 import dataclasses
 import datetime
+from typing import Any
+from typing import Dict
+from typing import Optional
+from typing import Tuple
 
 
-@dataclasses.dataclass()
-class AssetPair:
+# The value types below are created in large numbers during simulations and
+# reporting. They are frozen, use `__slots__` instead of a per-instance
+# `__dict__` and cache their hash.
+
+
+def _frozen_setattr(self, name: str, value: Any) -> None:
+    raise dataclasses.FrozenInstanceError(f"cannot assign to field '{name}'")
+
+
+def _frozen_delattr(self, name: str) -> None:
+    raise dataclasses.FrozenInstanceError(f"cannot delete field '{name}'")
+
+
+class AssetPair(object):
+    """
+    A coin and a fiat currency.
+
+    Instances are interned, so there is only one object per pair and comparisons
+    are mostly identity checks.
+    """
+
+    __slots__ = ("coin", "fiat", "_hash")
+    _instances: Dict[Tuple[str, str], "AssetPair"] = {}
+
     coin: str
     fiat: str
+    _hash: int
+
+    def __new__(cls, coin: str, fiat: str) -> "AssetPair":
+        key = (coin, fiat)
+        instance = cls._instances.get(key)
+        if instance is None:
+            instance = super().__new__(cls)
+            object.__setattr__(instance, "coin", coin)
+            object.__setattr__(instance, "fiat", fiat)
+            object.__setattr__(instance, "_hash", hash(key))
+            instance = cls._instances.setdefault(key, instance)
+        return instance
+
+    __setattr__ = _frozen_setattr
+    __delattr__ = _frozen_delattr
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, AssetPair):
+            return NotImplemented
+        return self.coin == other.coin and self.fiat == other.fiat
+
+    def __lt__(self, other: "AssetPair") -> bool:
+        return (self.coin, self.fiat) < (other.coin, other.fiat)
 
     def __hash__(self) -> int:
-        return hash((self.coin, self.fiat))
+        return self._hash
 
+    def __repr__(self) -> str:
+        return f"AssetPair(coin={self.coin!r}, fiat={self.fiat!r})"
+
+    def __reduce__(self):
+        return AssetPair, (self.coin, self.fiat)
+
+
+class Price(object):
+    __slots__ = ("timestamp", "last", "asset_pair", "_hash")
 
-@dataclasses.dataclass()
-class Price:
     timestamp: datetime.datetime
     last: float
     asset_pair: AssetPair
+    # Computed on first use.
+    _hash: Optional[int]
+
+    def __init__(
+        self, timestamp: datetime.datetime, last: float, asset_pair: AssetPair
+    ):
+        object.__setattr__(self, "timestamp", timestamp)
+        object.__setattr__(self, "last", last)
+        object.__setattr__(self, "asset_pair", asset_pair)
+        object.__setattr__(self, "_hash", None)
+
+    __setattr__ = _frozen_setattr
+    __delattr__ = _frozen_delattr
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, Price):
+            return NotImplemented
+        return (
+            self.timestamp == other.timestamp
+            and self.last == other.last
+            and self.asset_pair == other.asset_pair
+        )
+
+    def __hash__(self) -> int:
+        result = self._hash
+        if result is None:
+            result = hash((self.timestamp, self.last, self.asset_pair))
+            object.__setattr__(self, "_hash", result)
+        return result
+
+    def __repr__(self) -> str:
+        return f"Price(timestamp={self.timestamp!r}, last={self.last!r}, asset_pair={self.asset_pair!r})"
 
     def __str__(self):
         return f"{self.timestamp}: {self.last} {self.asset_pair.fiat}/{self.asset_pair.coin}"
 
+    def __reduce__(self):
+        return Price, (self.timestamp, self.last, self.asset_pair)
+
+
+class Trade(object):
+    __slots__ = (
+        "timestamp",
+        "trigger_name",
+        "volume_coin",
+        "volume_fiat",
+        "asset_pair",
+        "_hash",
+    )
 
-@dataclasses.dataclass()
-class Trade:
     timestamp: datetime.datetime
     trigger_name: str
     volume_coin: float
     volume_fiat: float
     asset_pair: AssetPair
+    # Computed on first use.
+    _hash: Optional[int]
+
+    def __init__(
+        self,
+        timestamp: datetime.datetime,
+        trigger_name: str,
+        volume_coin: float,
+        volume_fiat: float,
+        asset_pair: AssetPair,
+    ):
+        object.__setattr__(self, "timestamp", timestamp)
+        object.__setattr__(self, "trigger_name", trigger_name)
+        object.__setattr__(self, "volume_coin", volume_coin)
+        object.__setattr__(self, "volume_fiat", volume_fiat)
+        object.__setattr__(self, "asset_pair", asset_pair)
+        object.__setattr__(self, "_hash", None)
+
+    __setattr__ = _frozen_setattr
+    __delattr__ = _frozen_delattr
+
+    def _key(self) -> tuple:
+        return (
+            self.timestamp,
+            self.trigger_name,
+            self.volume_coin,
+            self.volume_fiat,
+            self.asset_pair,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, Trade):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self) -> int:
+        result = self._hash
+        if result is None:
+            result = hash(self._key())
+            object.__setattr__(self, "_hash", result)
+        return result
 
     def __repr__(self):
         return (
@@ -41,6 +187,9 @@ class Trade:
             f")"
         )
 
+    def __reduce__(self):
+        return Trade, self._key()
+
     def to_dict(self) -> dict:
         return dict(
             timestamp=self.timestamp,
@@ -50,3 +199,28 @@ class Trade:
             coin=self.asset_pair.coin,
             fiat=self.asset_pair.fiat,
         )
+
+
+@dataclasses.dataclass(frozen=True)
+class TradeAggregate:
+    """
+    Number and volume of the trades of one trigger and asset pair on a day.
+    """
+
+    asset_pair: AssetPair
+    trigger_name: str
+    day: datetime.date
+    count: int
+    volume_coin: float
+    volume_fiat: float
+
+    def to_dict(self) -> dict:
+        return dict(
+            coin=self.asset_pair.coin,
+            fiat=self.asset_pair.fiat,
+            trigger_name=self.trigger_name,
+            day=self.day,
+            count=self.count,
+            volume_coin=self.volume_coin,
+            volume_fiat=self.volume_fiat,
+        )
@@ -1,4 +1,6 @@
 from .factory import make_datastore
 from .interface import Datastore
 from .interface import DatastoreException
+from .interface import price_columns
+from .interface import trade_columns
 from .list_store import ListDatastore
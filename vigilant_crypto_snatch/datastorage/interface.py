@@ -4,16 +4,51 @@ from typing import *
 from ..core import AssetPair
 from ..core import Price
 from ..core import Trade
+from ..core import TradeAggregate
+
+
+# Column order of the rows from `iter_price_rows` and `iter_trade_rows`.
+price_columns = ["timestamp", "last", "coin", "fiat"]
+trade_columns = [
+    "timestamp",
+    "trigger_name",
+    "volume_coin",
+    "volume_fiat",
+    "coin",
+    "fiat",
+]
 
 
 class DatastoreException(Exception):
     pass
 
 
+def _in_range(timestamp: Any, start: Optional[Any], end: Optional[Any]) -> bool:
+    return (start is None or start <= timestamp) and (end is None or timestamp < end)
+
+
+T = TypeVar("T")
+
+
+def _chunked(items: Iterator[T], chunk_size: int) -> Iterator[List[T]]:
+    chunk: List[T] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
 class Datastore:
     def add_price(self, price: Price) -> None:
         raise NotImplementedError()  # pragma: no cover
 
+    def add_prices(self, prices: List[Price]) -> None:
+        for price in prices:
+            self.add_price(price)
+
     def add_trade(self, trade: Trade) -> None:
         raise NotImplementedError()  # pragma: no cover
 
@@ -38,3 +73,130 @@ class Datastore:
 
     def clean_old(self, before: datetime.datetime) -> None:
         raise NotImplementedError()  # pragma: no cover
+
+    def close(self) -> None:
+        """
+        Releases the connections. The datastore must not be used afterwards.
+        """
+        pass
+
+    def get_trade_aggregates(
+        self,
+        start: Optional[datetime.date] = None,
+        end: Optional[datetime.date] = None,
+        asset_pair: Optional[AssetPair] = None,
+    ) -> List[TradeAggregate]:
+        """
+        Trades summed up per asset pair, trigger and day, ordered by day.
+
+        The range of days includes `start` and excludes `end`.
+        """
+        totals: Dict[Tuple[AssetPair, str, datetime.date], List[float]] = {}
+        for trade in self.iter_trades(asset_pair=asset_pair):
+            day = trade.timestamp.date()
+            if not _in_range(day, start, end):
+                continue
+            total = totals.setdefault(
+                (trade.asset_pair, trade.trigger_name, day), [0, 0.0, 0.0]
+            )
+            total[0] += 1
+            total[1] += trade.volume_coin
+            total[2] += trade.volume_fiat
+        return [
+            TradeAggregate(
+                asset_pair, trigger_name, day, int(count), volume_coin, volume_fiat
+            )
+            for (asset_pair, trigger_name, day), (
+                count,
+                volume_coin,
+                volume_fiat,
+            ) in sorted(
+                totals.items(), key=lambda item: (item[0][2], item[0][0], item[0][1])
+            )
+        ]
+
+    # The following query methods yield the stored data ordered by time, with
+    # `start` inclusive and `end` exclusive. Implementations backed by a database
+    # should override them to stream rows in chunks of `chunk_size`.
+
+    def iter_prices(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        asset_pair: Optional[AssetPair] = None,
+        chunk_size: int = 1000,
+    ) -> Iterator[Price]:
+        prices = sorted(self.get_all_prices(), key=lambda price: price.timestamp)
+        for price in prices:
+            if _in_range(price.timestamp, start, end) and (
+                asset_pair is None or price.asset_pair == asset_pair
+            ):
+                yield price
+
+    def iter_trades(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        asset_pair: Optional[AssetPair] = None,
+        chunk_size: int = 1000,
+    ) -> Iterator[Trade]:
+        trades = sorted(self.get_all_trades(), key=lambda trade: trade.timestamp)
+        for trade in trades:
+            if _in_range(trade.timestamp, start, end) and (
+                asset_pair is None or trade.asset_pair == asset_pair
+            ):
+                yield trade
+
+    def iter_price_rows(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        asset_pair: Optional[AssetPair] = None,
+        chunk_size: int = 1000,
+    ) -> Iterator[Tuple]:
+        for price in self.iter_prices(start, end, asset_pair, chunk_size):
+            yield (
+                price.timestamp,
+                price.last,
+                price.asset_pair.coin,
+                price.asset_pair.fiat,
+            )
+
+    def iter_trade_rows(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        asset_pair: Optional[AssetPair] = None,
+        chunk_size: int = 1000,
+    ) -> Iterator[Tuple]:
+        for trade in self.iter_trades(start, end, asset_pair, chunk_size):
+            yield (
+                trade.timestamp,
+                trade.trigger_name,
+                trade.volume_coin,
+                trade.volume_fiat,
+                trade.asset_pair.coin,
+                trade.asset_pair.fiat,
+            )
+
+    def iter_trade_chunks(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        asset_pair: Optional[AssetPair] = None,
+        chunk_size: int = 1000,
+    ) -> Iterator[List[Trade]]:
+        return _chunked(
+            self.iter_trades(start, end, asset_pair, chunk_size), chunk_size
+        )
+
+    def iter_price_chunks(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        asset_pair: Optional[AssetPair] = None,
+        chunk_size: int = 1000,
+    ) -> Iterator[List[Price]]:
+        return _chunked(
+            self.iter_prices(start, end, asset_pair, chunk_size), chunk_size
+        )
@@ -1,6 +1,7 @@
 import datetime
 import os
 import pathlib
+import time
 from typing import *
 
 import sqlalchemy.ext.declarative
@@ -10,6 +11,7 @@ from .. import logger
 from ..core import AssetPair
 from ..core import Price
 from ..core import Trade
+from ..core import TradeAggregate
 from .interface import Datastore
 from .interface import DatastoreException
 
@@ -74,8 +76,41 @@ def trade_to_alchemy_trade(trade: Trade) -> AlchemyTrade:
     )
 
 
+class AlchemyTradeAggregate(Base):  # type: ignore
+    __tablename__ = "trade_aggregates"
+    __table_args__ = (
+        sqlalchemy.UniqueConstraint("coin", "fiat", "trigger_name", "day"),
+    )
+
+    id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
+    coin = sqlalchemy.Column(sqlalchemy.String, nullable=False)
+    fiat = sqlalchemy.Column(sqlalchemy.String, nullable=False)
+    trigger_name = sqlalchemy.Column(sqlalchemy.String, nullable=False)
+    day = sqlalchemy.Column(sqlalchemy.Date, nullable=False, index=True)
+    count = sqlalchemy.Column(sqlalchemy.Integer, nullable=False)
+    volume_coin = sqlalchemy.Column(sqlalchemy.Float, nullable=False)
+    volume_fiat = sqlalchemy.Column(sqlalchemy.Float, nullable=False)
+
+    def to_core(self):
+        return TradeAggregate(
+            asset_pair=AssetPair(self.coin, self.fiat),
+            trigger_name=self.trigger_name,
+            day=self.day,
+            count=self.count,
+            volume_coin=self.volume_coin,
+            volume_fiat=self.volume_fiat,
+        )
+
+
+class AlchemyMigration(Base):  # type: ignore
+    __tablename__ = "migrations"
+
+    name = sqlalchemy.Column(sqlalchemy.String, primary_key=True)
+    applied = sqlalchemy.Column(sqlalchemy.DateTime, nullable=False)
+
+
 class SqlAlchemyDatastore(Datastore):
-    def __init__(self, db_path: pathlib.Path = None):
+    def __init__(self, db_path: pathlib.Path = None, reconcile_interval: float = 600.0):
         if db_path is not None:
             if not db_path.parent.is_dir():
                 db_path.parent.mkdir(parents=True, exist_ok=True)
@@ -85,15 +120,24 @@ class SqlAlchemyDatastore(Datastore):
         db_url = f"sqlite://{db_full_path}"
         logger.debug(f"Using database url {db_url}")
         try:
-            engine = sqlalchemy.create_engine(db_url)
-            Base.metadata.create_all(engine)
-            session_factory = sqlalchemy.orm.sessionmaker(bind=engine)
+            self.engine = sqlalchemy.create_engine(db_url)
+            Base.metadata.create_all(self.engine)
+            session_factory = sqlalchemy.orm.sessionmaker(bind=self.engine)
             self.session = sqlalchemy.orm.scoped_session(session_factory)
         except sqlalchemy.exc.OperationalError as e:
             raise DatastoreException(
                 f"Something went wrong with the database. Perhaps it is easiest to just delete the database file."
             ) from e
 
+        # The database is the source of truth, this index of the latest trade per
+        # trigger and asset pair only saves a query per cooldown check. It is
+        # loaded on the first check, as only the watch loop needs it, and
+        # reloaded periodically to pick up changes by other processes.
+        self.reconcile_interval = reconcile_interval
+        self.last_trade_times: Dict[Tuple[str, str, str], datetime.datetime] = {}
+        self.last_reconcile: Optional[float] = None
+        self._backfill_trade_aggregates()
+
     def add_price(self, price: Price) -> None:
         alchemy_price = price_to_alchemy_price(price)
 
@@ -105,17 +149,43 @@ class SqlAlchemyDatastore(Datastore):
                 f"Something went wrong with the database. Perhaps it is easiest to just delete the database file."
             ) from e
 
+    def add_prices(self, prices: List[Price]) -> None:
+        try:
+            self.session.bulk_insert_mappings(
+                AlchemyPrice,
+                [
+                    dict(
+                        timestamp=price.timestamp,
+                        last=price.last,
+                        coin=price.asset_pair.coin,
+                        fiat=price.asset_pair.fiat,
+                    )
+                    for price in prices
+                ],
+            )
+            self.session.commit()
+        except sqlalchemy.exc.OperationalError as e:
+            raise DatastoreException(
+                f"Something went wrong with the database. Perhaps it is easiest to just delete the database file."
+            ) from e
+
     def add_trade(self, trade: Trade) -> None:
         alchemy_trade = trade_to_alchemy_trade(trade)
 
         try:
             self.session.add(alchemy_trade)
+            self._add_to_aggregate(trade)
             self.session.commit()
         except sqlalchemy.exc.OperationalError as e:
             raise DatastoreException(
                 f"Something went wrong with the database. Perhaps it is easiest to just delete the database file."
             ) from e
 
+        key = (trade.trigger_name, trade.asset_pair.coin, trade.asset_pair.fiat)
+        last = self.last_trade_times.get(key)
+        if last is None or trade.timestamp > last:
+            self.last_trade_times[key] = trade.timestamp
+
     def get_price_around(
         self,
         then: datetime.datetime,
@@ -151,32 +221,274 @@ class SqlAlchemyDatastore(Datastore):
     def was_triggered_since(
         self, trigger_name: str, asset_pair: AssetPair, then: datetime.datetime
     ) -> bool:
+        if (
+            self.last_reconcile is None
+            or time.monotonic() - self.last_reconcile >= self.reconcile_interval
+        ):
+            self._reconcile_last_trade_times()
+        last = self.last_trade_times.get(
+            (trigger_name, asset_pair.coin, asset_pair.fiat)
+        )
+        return last is not None and last > then
+
+    def _reconcile_last_trade_times(self) -> None:
         try:
-            trade_count = (
-                self.session.query(AlchemyTrade)
-                .filter(
-                    AlchemyTrade.trigger_name == trigger_name,
-                    AlchemyTrade.timestamp > then,
-                    AlchemyTrade.coin == asset_pair.coin,
-                    AlchemyTrade.fiat == asset_pair.fiat,
+            q = self.session.query(
+                AlchemyTrade.trigger_name,
+                AlchemyTrade.coin,
+                AlchemyTrade.fiat,
+                sqlalchemy.func.max(AlchemyTrade.timestamp),
+            ).group_by(AlchemyTrade.trigger_name, AlchemyTrade.coin, AlchemyTrade.fiat)
+            self.last_trade_times = {
+                (trigger_name, coin, fiat): timestamp
+                for trigger_name, coin, fiat, timestamp in q
+            }
+            # End the read transaction so that the next reconciliation sees
+            # trades committed by other connections.
+            self.session.commit()
+        except sqlalchemy.exc.OperationalError as e:
+            raise DatastoreException(
+                f"Something went wrong with the database. Perhaps it is easiest to just delete the database file."
+            ) from e
+        self.last_reconcile = time.monotonic()
+
+    def _add_to_aggregate(self, trade: Trade) -> None:
+        aggregate = (
+            self.session.query(AlchemyTradeAggregate)
+            .filter_by(
+                coin=trade.asset_pair.coin,
+                fiat=trade.asset_pair.fiat,
+                trigger_name=trade.trigger_name,
+                day=trade.timestamp.date(),
+            )
+            .one_or_none()
+        )
+        if aggregate is None:
+            aggregate = AlchemyTradeAggregate(
+                coin=trade.asset_pair.coin,
+                fiat=trade.asset_pair.fiat,
+                trigger_name=trade.trigger_name,
+                day=trade.timestamp.date(),
+                count=0,
+                volume_coin=0.0,
+                volume_fiat=0.0,
+            )
+            self.session.add(aggregate)
+        aggregate.count += 1
+        # The stubs type float columns as `Decimal`, SQLite returns floats.
+        aggregate.volume_coin = float(aggregate.volume_coin) + trade.volume_coin  # type: ignore
+        aggregate.volume_fiat = float(aggregate.volume_fiat) + trade.volume_fiat  # type: ignore
+
+    def _backfill_trade_aggregates(self) -> None:
+        """
+        Builds the aggregates from the trades of databases from older versions.
+
+        This is done once per database, a row in the migrations table records it.
+        Checking the aggregates against all trades on every start would take
+        longer the more trades there are.
+        """
+        try:
+            migration = (
+                self.session.query(AlchemyMigration)
+                .filter_by(name=AlchemyTradeAggregate.__tablename__)
+                .one_or_none()
+            )
+            if migration is not None:
+                self.session.commit()
+                return
+            logger.debug("Building trade aggregates from the existing trades.")
+            day = sqlalchemy.func.date(AlchemyTrade.timestamp)
+            rows = (
+                self.session.query(
+                    AlchemyTrade.coin,
+                    AlchemyTrade.fiat,
+                    AlchemyTrade.trigger_name,
+                    day,
+                    sqlalchemy.func.count(AlchemyTrade.id),
+                    sqlalchemy.func.sum(AlchemyTrade.volume_coin),
+                    sqlalchemy.func.sum(AlchemyTrade.volume_fiat),
+                )
+                .group_by(
+                    AlchemyTrade.coin, AlchemyTrade.fiat, AlchemyTrade.trigger_name, day
                 )
-                .count()
+                .all()
             )
-            return trade_count != 0
+            self.session.query(AlchemyTradeAggregate).delete()
+            self.session.bulk_insert_mappings(
+                AlchemyTradeAggregate,
+                [
+                    dict(
+                        coin=coin,
+                        fiat=fiat,
+                        trigger_name=trigger_name,
+                        day=datetime.date.fromisoformat(day),
+                        count=count,
+                        volume_coin=volume_coin,
+                        volume_fiat=volume_fiat,
+                    )
+                    for coin, fiat, trigger_name, day, count, volume_coin, volume_fiat in rows
+                ],
+            )
+            self.session.add(
+                AlchemyMigration(
+                    name=AlchemyTradeAggregate.__tablename__,
+                    applied=datetime.datetime.now(),
+                )
+            )
+            self.session.commit()
+        except sqlalchemy.exc.OperationalError as e:
+            raise DatastoreException(
+                f"Something went wrong with the database. Perhaps it is easiest to just delete the database file."
+            ) from e
+
+    def get_trade_aggregates(
+        self,
+        start: Optional[datetime.date] = None,
+        end: Optional[datetime.date] = None,
+        asset_pair: Optional[AssetPair] = None,
+    ) -> List[TradeAggregate]:
+        q = self.session.query(AlchemyTradeAggregate)
+        if start is not None:
+            q = q.filter(AlchemyTradeAggregate.day >= start)
+        if end is not None:
+            q = q.filter(AlchemyTradeAggregate.day < end)
+        if asset_pair is not None:
+            q = q.filter(
+                AlchemyTradeAggregate.coin == asset_pair.coin,
+                AlchemyTradeAggregate.fiat == asset_pair.fiat,
+            )
+        q = q.order_by(
+            AlchemyTradeAggregate.day,
+            AlchemyTradeAggregate.coin,
+            AlchemyTradeAggregate.fiat,
+            AlchemyTradeAggregate.trigger_name,
+        )
+        try:
+            return [elem.to_core() for elem in q]
         except sqlalchemy.exc.OperationalError as e:
             raise DatastoreException(
                 f"Something went wrong with the database. Perhaps it is easiest to just delete the database file."
             ) from e
 
     def get_all_trades(self) -> List[Trade]:
-        q = self.session.query(AlchemyTrade)
-        result = [elem.to_core() for elem in q]
-        return result
+        return list(self.iter_trades())
 
     def get_all_prices(self) -> List[Price]:
-        q = self.session.query(AlchemyPrice)
-        result = [elem.to_core() for elem in q]
-        return result
+        return list(self.iter_prices())
+
+    def iter_prices(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        asset_pair: Optional[AssetPair] = None,
+        chunk_size: int = 1000,
+    ) -> Iterator[Price]:
+        for timestamp, last, coin, fiat in self.iter_price_rows(
+            start, end, asset_pair, chunk_size
+        ):
+            yield Price(timestamp, last, AssetPair(coin, fiat))
+
+    def iter_trades(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        asset_pair: Optional[AssetPair] = None,
+        chunk_size: int = 1000,
+    ) -> Iterator[Trade]:
+        for (
+            timestamp,
+            trigger_name,
+            volume_coin,
+            volume_fiat,
+            coin,
+            fiat,
+        ) in self.iter_trade_rows(start, end, asset_pair, chunk_size):
+            yield Trade(
+                timestamp, trigger_name, volume_coin, volume_fiat, AssetPair(coin, fiat)
+            )
+
+    def iter_price_rows(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        asset_pair: Optional[AssetPair] = None,
+        chunk_size: int = 1000,
+    ) -> Iterator[Tuple]:
+        columns = [
+            AlchemyPrice.timestamp,
+            AlchemyPrice.last,
+            AlchemyPrice.coin,
+            AlchemyPrice.fiat,
+        ]
+        yield from self._iter_query(
+            self._make_query(AlchemyPrice, columns, start, end, asset_pair),
+            chunk_size,
+        )
+
+    def iter_trade_rows(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        asset_pair: Optional[AssetPair] = None,
+        chunk_size: int = 1000,
+    ) -> Iterator[Tuple]:
+        yield from self._iter_query(
+            self.make_trade_query(start, end, asset_pair), chunk_size
+        )
+
+    def make_trade_query(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        asset_pair: Optional[AssetPair] = None,
+    ) -> sqlalchemy.orm.Query:
+        """
+        Query for the trades with the columns of `trade_columns`, ordered by time.
+        """
+        columns = [
+            AlchemyTrade.timestamp,
+            AlchemyTrade.trigger_name,
+            AlchemyTrade.volume_coin,
+            AlchemyTrade.volume_fiat,
+            AlchemyTrade.coin,
+            AlchemyTrade.fiat,
+        ]
+        return self._make_query(AlchemyTrade, columns, start, end, asset_pair)
+
+    def _make_query(
+        self,
+        table,
+        columns: list,
+        start: Optional[datetime.datetime],
+        end: Optional[datetime.datetime],
+        asset_pair: Optional[AssetPair],
+    ) -> sqlalchemy.orm.Query:
+        # Selecting plain columns skips the ORM objects.
+        q = self.session.query(*columns)
+        if start is not None:
+            q = q.filter(table.timestamp >= start)
+        if end is not None:
+            q = q.filter(table.timestamp < end)
+        if asset_pair is not None:
+            q = q.filter(table.coin == asset_pair.coin, table.fiat == asset_pair.fiat)
+        return q.order_by(table.timestamp)
+
+    def _iter_query(self, q: sqlalchemy.orm.Query, chunk_size: int) -> Iterator[Tuple]:
+        # Rows are fetched from the cursor in chunks.
+        try:
+            for row in q.yield_per(chunk_size):
+                yield tuple(row)
+        except sqlalchemy.exc.OperationalError as e:
+            raise DatastoreException(
+                f"Something went wrong with the database. Perhaps it is easiest to just delete the database file."
+            ) from e
+
+    def close(self) -> None:
+        # SQLite connections may only be closed on the thread that opened them,
+        # so this must not be left to the garbage collector when the datastore
+        # is used on a worker thread.
+        self.session.remove()
+        self.engine.dispose()
 
     def clean_old(self, cutoff: datetime.datetime) -> None:
         logger.debug(f"Start cleaning of database before {cutoff} …")
@@ -83,3 +83,68 @@ def test_clean_old(datastore: Datastore) -> None:
     assert len(datastore.get_all_prices()) == 1
     datastore.clean_old(now)
     assert len(datastore.get_all_prices()) == 0
+
+
+def test_iter_trades_filters(datastore: Datastore) -> None:
+    btc = AssetPair("BTC", "EUR")
+    eth = AssetPair("ETH", "EUR")
+    start = datetime.datetime(2021, 1, 1)
+    trades = [
+        Trade(start + datetime.timedelta(days=i), "Test", 1.0, 2.0, pair)
+        for i in range(5)
+        for pair in [btc, eth]
+    ]
+    for trade in reversed(trades):
+        datastore.add_trade(trade)
+
+    assert list(datastore.iter_trades(asset_pair=btc)) == trades[::2]
+    in_range = list(
+        datastore.iter_trades(
+            start + datetime.timedelta(days=1), start + datetime.timedelta(days=3)
+        )
+    )
+    assert len(in_range) == 4
+    assert all(
+        trade.timestamp < start + datetime.timedelta(days=3) for trade in in_range
+    )
+    assert [len(chunk) for chunk in datastore.iter_trade_chunks(chunk_size=4)] == [
+        4,
+        4,
+        2,
+    ]
+    rows = list(datastore.iter_trade_rows(asset_pair=eth))
+    assert rows[0] == (start, "Test", 1.0, 2.0, "ETH", "EUR")
+
+
+def test_iter_prices_filters(datastore: Datastore) -> None:
+    btc = AssetPair("BTC", "EUR")
+    start = datetime.datetime(2021, 1, 1)
+    prices = [Price(start + datetime.timedelta(hours=i), i, btc) for i in range(5)]
+    for price in prices:
+        datastore.add_price(price)
+    datastore.add_price(Price(start, 1.0, AssetPair("ETH", "EUR")))
+    assert list(datastore.iter_prices(start, asset_pair=btc)) == prices
+    assert list(datastore.iter_price_rows(end=start + datetime.timedelta(hours=1))) == [
+        (start, 0, "BTC", "EUR"),
+        (start, 1.0, "ETH", "EUR"),
+    ]
+    assert sum(len(chunk) for chunk in datastore.iter_price_chunks(chunk_size=2)) == 6
+
+
+def test_trade_aggregates(datastore: Datastore) -> None:
+    btc = AssetPair("BTC", "EUR")
+    day = datetime.datetime(2021, 1, 1, 10)
+    datastore.add_trade(Trade(day, "A", 1.0, 10.0, btc))
+    datastore.add_trade(Trade(day + datetime.timedelta(hours=2), "A", 2.0, 20.0, btc))
+    datastore.add_trade(Trade(day, "B", 4.0, 40.0, btc))
+    datastore.add_trade(Trade(day + datetime.timedelta(days=1), "A", 8.0, 80.0, btc))
+
+    aggregates = datastore.get_trade_aggregates()
+    assert [(a.trigger_name, a.day, a.count, a.volume_fiat) for a in aggregates] == [
+        ("A", datetime.date(2021, 1, 1), 2, 30.0),
+        ("B", datetime.date(2021, 1, 1), 1, 40.0),
+        ("A", datetime.date(2021, 1, 2), 1, 80.0),
+    ]
+    assert len(datastore.get_trade_aggregates(start=datetime.date(2021, 1, 2))) == 1
+    assert len(datastore.get_trade_aggregates(end=datetime.date(2021, 1, 2))) == 2
+    assert datastore.get_trade_aggregates(asset_pair=AssetPair("ETH", "EUR")) == []
@@ -1,11 +1,87 @@
+import datetime
 import os
 import pathlib
 import tempfile
+import threading
+import time
 
+from ..core import AssetPair
+from ..core import Trade
 from .factory import make_datastore
+from .sqlalchemy_store import AlchemyMigration
+from .sqlalchemy_store import AlchemyTradeAggregate
+from .sqlalchemy_store import SqlAlchemyDatastore
 
 
 def test_create_file_db() -> None:
     t = tempfile.NamedTemporaryFile(suffix=".sqlite")
     os.unlink(t.name)
     make_datastore(pathlib.Path(t.name))
+
+
+def test_last_trade_index_reconciles() -> None:
+    t = tempfile.NamedTemporaryFile(suffix=".sqlite")
+    os.unlink(t.name)
+    path = pathlib.Path(t.name)
+    now = datetime.datetime(2021, 1, 2)
+    asset_pair = AssetPair("BTC", "EUR")
+    then = now - datetime.timedelta(hours=1)
+    datastore = SqlAlchemyDatastore(path, reconcile_interval=3600)
+    assert datastore.last_reconcile is None
+    assert not datastore.was_triggered_since("Test", asset_pair, then)
+    other = SqlAlchemyDatastore(path)
+    other.add_trade(Trade(now, "Test", 1.0, 2.0, asset_pair))
+
+    assert not datastore.was_triggered_since("Test", asset_pair, then)
+    datastore.last_reconcile = time.monotonic() - 3600
+    assert datastore.was_triggered_since("Test", asset_pair, then)
+
+    restarted = SqlAlchemyDatastore(path)
+    assert restarted.was_triggered_since("Test", asset_pair, then)
+    assert not restarted.was_triggered_since("Test", asset_pair, now)
+    assert not restarted.was_triggered_since("Other", asset_pair, then)
+
+
+def test_trade_aggregates_backfill() -> None:
+    t = tempfile.NamedTemporaryFile(suffix=".sqlite")
+    os.unlink(t.name)
+    path = pathlib.Path(t.name)
+    asset_pair = AssetPair("BTC", "EUR")
+    datastore = SqlAlchemyDatastore(path)
+    for hour in range(3):
+        datastore.add_trade(
+            Trade(datetime.datetime(2021, 1, 1, hour), "Test", 1.0, 2.0, asset_pair)
+        )
+    # Simulate a database written by an older version.
+    datastore.session.query(AlchemyTradeAggregate).delete()
+    datastore.session.query(AlchemyMigration).delete()
+    datastore.session.commit()
+
+    reopened = SqlAlchemyDatastore(path)
+    aggregates = reopened.get_trade_aggregates()
+    assert len(aggregates) == 1
+    assert aggregates[0].count == 3
+    assert aggregates[0].volume_fiat == 6.0
+    assert aggregates[0].day == datetime.date(2021, 1, 1)
+
+    # The aggregates are only built once, not on every start.
+    reopened.session.query(AlchemyTradeAggregate).delete()
+    reopened.session.commit()
+    assert SqlAlchemyDatastore(path).get_trade_aggregates() == []
+
+
+def test_close_from_worker_thread() -> None:
+    result = []
+
+    def worker():
+        datastore = make_datastore(None)
+        datastore.add_trade(
+            Trade(datetime.datetime(2021, 1, 1), "Test", 1.0, 2.0, AssetPair("A", "B"))
+        )
+        result.extend(datastore.get_all_trades())
+        datastore.close()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    assert len(result) == 1
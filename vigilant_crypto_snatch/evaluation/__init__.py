@@ -2,13 +2,34 @@ from .close_chart import make_close_chart
 from .currency_pairs import get_available_coins
 from .currency_pairs import get_available_fiats
 from .currency_pairs import get_currency_pairs
+from .downsample import lttb
+from .downsample import min_max_buckets
+from .downsample import select_range
 from .drop_survey import make_survey_chart
+from .feargreed_chart import get_fear_greed_data
 from .feargreed_chart import make_fear_greed_chart
+from .feargreed_chart import plot_fear_greed
 from .market_simulation import accumulate_value
 from .market_simulation import make_gain_chart
 from .market_simulation import simulate_triggers
 from .market_simulation import SimulationMarketplace
 from .market_simulation import summarize_simulation
+from .portfolio import Deposit
+from .portfolio import load_price_series
+from .portfolio import make_regular_deposits
+from .portfolio import PortfolioMarketplace
+from .portfolio import PortfolioResult
+from .portfolio import simulate_portfolio
+from .portfolio import summarize_portfolio
 from .price_data import get_hourly_data
 from .price_data import InterpolatingSource
 from .price_data import make_dataframe_from_json
+from .price_series import PriceSeries
+from .robustness import bootstrap_triggers
+from .robustness import RobustnessResult
+from .robustness import summarize_robustness
+from .vectorized import align_series
+from .vectorized import trigger_signals
+from .walk_forward import ParameterGrid
+from .walk_forward import walk_forward
+from .walk_forward import WalkForwardResult
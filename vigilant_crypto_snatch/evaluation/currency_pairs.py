@@ -2,6 +2,8 @@ from typing import List
 from typing import Tuple
 
 from ..myrequests import perform_http_request
+from ..ratelimit import get_scheduler
+from ..ratelimit import Priority
 
 
 def get_currency_pairs(api_key: str) -> list:
@@ -10,12 +12,13 @@ def get_currency_pairs(api_key: str) -> list:
 
 
 def request_currency_pairs(api_key: str) -> dict:
-    r = perform_http_request(
+    url = (
         f"https://min-api.cryptocompare.com/data/v2/pair/mapping/exchange"
         f"?e=Kraken"
         f"&api_key={api_key}"
     )
-    return r
+    get_scheduler(url).acquire(Priority.HISTORY)
+    return perform_http_request(url)
 
 
 def parse_currency_pairs(response: dict) -> List[Tuple[str, str]]:
@@ -0,0 +1,103 @@
+from typing import Tuple
+
+import numpy as np
+
+
+# Charts cannot show more points than they have pixels. These functions reduce
+# long series to a few thousand points before they are handed to a plotting
+# library. The x values have to be sorted.
+
+
+def select_range(
+    x: np.ndarray, y: np.ndarray, x_min: float, x_max: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the points within the range, plus one point on either side such that
+    the line continues to the edges of the visible area.
+    """
+    begin = max(int(np.searchsorted(x, x_min, side="left")) - 1, 0)
+    end = min(int(np.searchsorted(x, x_max, side="right")) + 1, len(x))
+    return x[begin:end], y[begin:end]
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last point and picks one point from each of the
+    `threshold - 2` buckets in between, namely the one which spans the largest
+    triangle with the previously selected point and the mean of the next bucket.
+    This keeps the visual shape including peaks.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    # The mean of each bucket is only needed for the bucket after the current one.
+    sums_x = np.add.reduceat(x[1 : n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1 : n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    means_x = np.append(sums_x / counts, x[-1])
+    means_y = np.append(sums_y / counts, y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        begin, end = edges[bucket], edges[bucket + 1]
+        next_x, next_y = means_x[bucket + 1], means_y[bucket + 1]
+        areas = np.abs(
+            (x[previous] - next_x) * (y[begin:end] - y[previous])
+            - (x[previous] - x[begin:end]) * (next_y - y[previous])
+        )
+        previous = begin + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return x[selected], y[selected]
+
+
+def min_max_buckets(
+    x: np.ndarray, y: np.ndarray, buckets: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Keeps the minimum and the maximum of each bucket of equal width in x.
+
+    This is the cheaper alternative to `lttb`, the result has at most
+    `2 * buckets` points, which are kept in their original order.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if 2 * buckets >= n or buckets < 1:
+        return x, y
+
+    span = x[-1] - x[0]
+    if span <= 0:
+        bucket_index = np.zeros(n, dtype=np.int64)
+    else:
+        bucket_index = np.minimum(
+            ((x - x[0]) / span * buckets).astype(np.int64), buckets - 1
+        )
+    starts = np.flatnonzero(np.diff(bucket_index, prepend=-1))
+    counts = np.diff(np.append(starts, n))
+    keep = np.unique(
+        np.concatenate(
+            [
+                _first_match(y, np.minimum.reduceat(y, starts), bucket_index, counts),
+                _first_match(y, np.maximum.reduceat(y, starts), bucket_index, counts),
+            ]
+        )
+    )
+    return x[keep], y[keep]
+
+
+def _first_match(
+    y: np.ndarray, extrema: np.ndarray, bucket_index: np.ndarray, counts: np.ndarray
+) -> np.ndarray:
+    # Index of the first element in each bucket which equals the extremum.
+    candidates = np.flatnonzero(y == np.repeat(extrema, counts))
+    _, first = np.unique(bucket_index[candidates], return_index=True)
+    return candidates[first]
@@ -6,14 +6,14 @@ import pandas as pd
 from vigilant_crypto_snatch.feargreed import AlternateMeFearAndGreedIndex
 
 
-def make_fear_greed_chart(
+def get_fear_greed_data(
     time_begin: datetime.datetime, time_end: datetime.datetime
-) -> alt.Chart:
+) -> pd.DataFrame:
     fear_greed_access = AlternateMeFearAndGreedIndex()
 
     date_range = pd.date_range(time_begin.date(), time_end.date())
     today = datetime.date.today()
-    fear_greed_df = pd.DataFrame(
+    return pd.DataFrame(
         {
             "date": date_range,
             "fear_greed_index": [
@@ -21,6 +21,15 @@ def make_fear_greed_chart(
             ],
         }
     )
+
+
+def make_fear_greed_chart(
+    time_begin: datetime.datetime, time_end: datetime.datetime
+) -> alt.Chart:
+    return plot_fear_greed(get_fear_greed_data(time_begin, time_end))
+
+
+def plot_fear_greed(fear_greed_df: pd.DataFrame) -> alt.Chart:
     chart = (
         alt.Chart(fear_greed_df, title="Fear & Greed Index")
         .mark_line()
@@ -42,25 +42,28 @@ def simulate_triggers(
     source = InterpolatingSource(data)
     market = SimulationMarketplace(source)
 
-    active_triggers = [
-        make_buy_trigger(datastore, source, market, trigger_spec)
-        for trigger_spec in trigger_specs
-    ]
-
-    for i in data.index:
-        row = data.loc[i]
-        now = row["datetime"]
-        for trigger in active_triggers:
-            if not (trigger.asset_pair == assert_pair):
-                continue
-            try:
-                if trigger.is_triggered(now):
-                    trigger.fire(now)
-            except HistoricalError as e:
-                pass
-        progress_callback((i + 1) / len(data))
-
-    all_trades = datastore.get_all_trades()
+    try:
+        active_triggers = [
+            make_buy_trigger(datastore, source, market, trigger_spec)
+            for trigger_spec in trigger_specs
+        ]
+
+        for i in data.index:
+            row = data.loc[i]
+            now = row["datetime"]
+            for trigger in active_triggers:
+                if not (trigger.asset_pair == assert_pair):
+                    continue
+                try:
+                    if trigger.is_triggered(now):
+                        trigger.fire(now)
+                except HistoricalError as e:
+                    pass
+            progress_callback((i + 1) / len(data))
+
+        all_trades = datastore.get_all_trades()
+    finally:
+        datastore.close()
     trade_df = pd.DataFrame([trade.to_dict() for trade in all_trades])
     trigger_names = [trigger.get_name() for trigger in active_triggers]
     return trade_df, trigger_names
@@ -0,0 +1,360 @@
+"""
+Simulation of several triggers on several asset pairs which share the balances
+of a marketplace.
+"""
+import dataclasses
+import datetime
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..core import AssetPair
+from ..core import Price
+from ..marketplace import InsufficientFundsError
+from ..marketplace import Marketplace
+from ..triggers import TriggerSpec
+from ..triggers.triggered_delegates import SufficientFundsTriggeredDelegate
+from ..triggers.volume_fiat_delegates import FixedVolumeFiatDelegate
+from ..triggers.volume_fiat_delegates import RatioVolumeFiatDelegate
+from ..triggers.volume_fiat_delegates import VolumeFiatDelegate
+from .price_data import get_hourly_data
+from .price_data import make_dataframe_from_json
+from .price_series import PriceSeries
+from .vectorized import accumulate_trigger_values
+from .vectorized import align_series
+from .vectorized import concat_trigger_values
+from .vectorized import trigger_signals
+
+
+@dataclasses.dataclass()
+class Deposit:
+    timestamp: datetime.datetime
+    fiat: str
+    amount: float
+
+
+def make_regular_deposits(
+    fiat: str,
+    amount: float,
+    start: datetime.datetime,
+    end: datetime.datetime,
+    interval: datetime.timedelta,
+) -> List[Deposit]:
+    deposits = []
+    timestamp = start
+    while timestamp <= end:
+        deposits.append(Deposit(timestamp, fiat, amount))
+        timestamp += interval
+    return deposits
+
+
+class PortfolioMarketplace(Marketplace):
+    """
+    Keeps balances per currency and fills orders at the current prices, which
+    the simulation sets before every time step.
+    """
+
+    def __init__(self, balances: Optional[Dict[str, float]] = None):
+        super().__init__()
+        self.balances: Dict[str, float] = dict(balances or {})
+        self.prices: Dict[AssetPair, float] = {}
+
+    def deposit(self, fiat: str, amount: float) -> None:
+        self.balances[fiat] = self.balances.get(fiat, 0.0) + amount
+
+    def place_order(self, asset_pair: AssetPair, volume_coin: float) -> None:
+        cost = volume_coin * self.prices[asset_pair]
+        balance = self.balances.get(asset_pair.fiat, 0.0)
+        # The volume is rounded, so buying with the whole balance may cost a
+        # tiny bit more than there is.
+        if cost > balance * (1 + 1e-6):
+            raise InsufficientFundsError()
+        self.balances[asset_pair.fiat] = max(0.0, balance - cost)
+        self.balances[asset_pair.coin] = (
+            self.balances.get(asset_pair.coin, 0.0) + volume_coin
+        )
+
+    def get_name(self) -> str:
+        return "Portfolio simulation"
+
+    def get_spot_price(self, asset_pair: AssetPair, now: datetime.datetime) -> Price:
+        return Price(timestamp=now, last=self.prices[asset_pair], asset_pair=asset_pair)
+
+    def get_balance(self) -> dict:
+        return dict(self.balances)
+
+
+@dataclasses.dataclass()
+class PortfolioResult:
+    asset_pairs: List[AssetPair]
+    trigger_names: List[str]
+    times: np.ndarray
+    closes: np.ndarray
+    # One row per trade, like `simulate_triggers`.
+    trades: pd.DataFrame
+    # Balance of every currency at every time step.
+    balances: pd.DataFrame
+    # Value of all balances in each fiat currency at every time step.
+    value: pd.DataFrame
+    # Invested fiat and value per trigger, like `accumulate_value`.
+    trigger_values: pd.DataFrame
+
+
+def load_price_series(
+    asset_pairs: Sequence[AssetPair], api_key: str
+) -> List[PriceSeries]:
+    return [
+        PriceSeries.from_dataframe(
+            make_dataframe_from_json(get_hourly_data(asset_pair, api_key)), asset_pair
+        )
+        for asset_pair in asset_pairs
+    ]
+
+
+def simulate_portfolio(
+    series: Sequence[PriceSeries],
+    trigger_specs: Sequence[TriggerSpec],
+    balances: Optional[Dict[str, float]] = None,
+    deposits: Sequence[Deposit] = (),
+    fear_greed: Optional[pd.DataFrame] = None,
+    step: Optional[float] = None,
+) -> PortfolioResult:
+    """
+    Runs the triggers on the prices of all series, which are aligned to a common
+    grid with `align_series`.
+
+    Triggers with a fixed volume only buy when the fiat balance suffices, those
+    with a percentage buy with that part of the current balance. An order that
+    cannot be paid pauses the trigger for 24 hours, like on a real marketplace.
+    Deposits are added at the first time step at or after their timestamp.
+    """
+    times, closes = align_series(series, step)
+    asset_pairs = [s.asset_pair for s in series]
+    rows = {asset_pair: row for row, asset_pair in enumerate(asset_pairs)}
+    for trigger_spec in trigger_specs:
+        if trigger_spec.asset_pair not in rows:
+            raise ValueError(
+                f"There is no price data for {trigger_spec.asset_pair} of trigger “{trigger_spec.name}”."
+            )
+    trigger_rows = np.array([rows[spec.asset_pair] for spec in trigger_specs], int)
+    cooldowns = np.array([spec.cooldown_minutes * 60.0 for spec in trigger_specs])
+    signals = np.array(
+        [
+            trigger_signals(spec, times, closes[rows[spec.asset_pair]], fear_greed)
+            for spec in trigger_specs
+        ],
+        dtype=bool,
+    ).reshape(len(trigger_specs), len(times))
+
+    market = PortfolioMarketplace(balances)
+    fiats = sorted(
+        {asset_pair.fiat for asset_pair in asset_pairs}
+        | {deposit.fiat for deposit in deposits}
+    )
+    for fiat in fiats:
+        market.deposit(fiat, 0.0)
+    initial_balances = market.get_balance()
+
+    funds_delegates: List[Optional[SufficientFundsTriggeredDelegate]] = []
+    volume_fiat_delegates: List[VolumeFiatDelegate] = []
+    for spec in trigger_specs:
+        if spec.volume_fiat is not None:
+            funds_delegates.append(
+                SufficientFundsTriggeredDelegate(
+                    spec.volume_fiat, spec.asset_pair.fiat, market
+                )
+            )
+            volume_fiat_delegates.append(FixedVolumeFiatDelegate(spec.volume_fiat))
+        elif spec.percentage_fiat is not None:
+            funds_delegates.append(None)
+            volume_fiat_delegates.append(
+                RatioVolumeFiatDelegate(
+                    spec.asset_pair.fiat, spec.percentage_fiat, market
+                )
+            )
+        else:
+            raise ValueError(f"Trigger “{spec.name}” has no fiat volume.")
+
+    deposit_steps = np.searchsorted(
+        times, [deposit.timestamp.timestamp() for deposit in deposits]
+    )
+    deposit_order = np.argsort(deposit_steps, kind="stable")
+    next_deposit = 0
+
+    last_trades = np.full(len(trigger_specs), -np.inf)
+    paused_until = np.full(len(trigger_specs), -np.inf)
+    trade_triggers: List[int] = []
+    trade_steps: List[int] = []
+    trade_volumes_coin: List[float] = []
+    trade_volumes_fiat: List[float] = []
+
+    for time_step in np.flatnonzero(signals.any(axis=0)).tolist():
+        while (
+            next_deposit < len(deposits)
+            and deposit_steps[deposit_order[next_deposit]] <= time_step
+        ):
+            deposit = deposits[deposit_order[next_deposit]]
+            market.deposit(deposit.fiat, deposit.amount)
+            next_deposit += 1
+
+        timestamp = times[time_step]
+        now = datetime.datetime.fromtimestamp(timestamp)
+        market.prices = dict(zip(asset_pairs, closes[:, time_step]))
+        for trigger in np.flatnonzero(signals[:, time_step]).tolist():
+            if last_trades[trigger] > timestamp - cooldowns[trigger]:
+                continue
+            if paused_until[trigger] > timestamp:
+                continue
+            funds_delegate = funds_delegates[trigger]
+            if funds_delegate is not None and not funds_delegate.is_triggered(now):
+                continue
+            volume_fiat = volume_fiat_delegates[trigger].get_volume_fiat()
+            if volume_fiat <= 0:
+                continue
+            asset_pair = trigger_specs[trigger].asset_pair
+            volume_coin = round(volume_fiat / market.prices[asset_pair], 8)
+            try:
+                market.place_order(asset_pair, volume_coin)
+            except InsufficientFundsError:
+                paused_until[trigger] = timestamp + 24 * 3600
+                continue
+            last_trades[trigger] = timestamp
+            trade_triggers.append(trigger)
+            trade_steps.append(time_step)
+            trade_volumes_coin.append(volume_coin)
+            trade_volumes_fiat.append(volume_fiat)
+            # The balance has changed within this time step.
+            for delegate in funds_delegates:
+                if delegate is not None:
+                    delegate.forget_evaluation()
+
+    return _make_result(
+        asset_pairs,
+        trigger_specs,
+        times,
+        closes,
+        initial_balances,
+        deposits,
+        deposit_steps,
+        np.array(trade_triggers, int),
+        np.array(trade_steps, int),
+        np.array(trade_volumes_coin, float),
+        np.array(trade_volumes_fiat, float),
+        trigger_rows,
+    )
+
+
+def _make_result(
+    asset_pairs: List[AssetPair],
+    trigger_specs: Sequence[TriggerSpec],
+    times: np.ndarray,
+    closes: np.ndarray,
+    initial_balances: Dict[str, float],
+    deposits: Sequence[Deposit],
+    deposit_steps: np.ndarray,
+    trade_triggers: np.ndarray,
+    trade_steps: np.ndarray,
+    volumes_coin: np.ndarray,
+    volumes_fiat: np.ndarray,
+    trigger_rows: np.ndarray,
+) -> PortfolioResult:
+    datetimes = [datetime.datetime.fromtimestamp(t) for t in times]
+    trigger_names = [spec.name for spec in trigger_specs]
+    trade_pairs = [trigger_specs[trigger].asset_pair for trigger in trade_triggers]
+    trades = pd.DataFrame(
+        {
+            "timestamp": [datetimes[step] for step in trade_steps],
+            "trigger_name": [trigger_names[trigger] for trigger in trade_triggers],
+            "volume_coin": volumes_coin,
+            "volume_fiat": volumes_fiat,
+            "coin": [asset_pair.coin for asset_pair in trade_pairs],
+            "fiat": [asset_pair.fiat for asset_pair in trade_pairs],
+        }
+    )
+
+    # Coins bought per asset pair at every time step, the fiat cost is the coin
+    # volume at the close.
+    trade_rows = trigger_rows[trade_triggers]
+    holdings = np.zeros_like(closes)
+    np.add.at(holdings, (trade_rows, trade_steps), volumes_coin)
+    holdings = np.cumsum(holdings, axis=1)
+    costs = np.zeros_like(closes)
+    np.add.at(
+        costs, (trade_rows, trade_steps), volumes_coin * closes[trade_rows, trade_steps]
+    )
+    costs = np.cumsum(costs, axis=1)
+
+    balances: Dict[str, np.ndarray] = {}
+    value: Dict[str, np.ndarray] = {}
+    for fiat in sorted({asset_pair.fiat for asset_pair in asset_pairs}):
+        deposited = np.zeros(len(times))
+        for deposit, deposit_step in zip(deposits, deposit_steps):
+            if deposit.fiat == fiat and deposit_step < len(times):
+                deposited[deposit_step] += deposit.amount
+        fiat_rows = [row for row, pair in enumerate(asset_pairs) if pair.fiat == fiat]
+        balance = initial_balances.get(fiat, 0.0) + np.cumsum(deposited)
+        balance = np.maximum(0.0, balance - costs[fiat_rows].sum(axis=0))
+        balances[fiat] = balance
+        value[fiat] = balance + (holdings[fiat_rows] * closes[fiat_rows]).sum(axis=0)
+    for coin in sorted({asset_pair.coin for asset_pair in asset_pairs}):
+        coin_rows = [row for row, pair in enumerate(asset_pairs) if pair.coin == coin]
+        balances[coin] = initial_balances.get(coin, 0.0) + holdings[coin_rows].sum(
+            axis=0
+        )
+
+    trigger_values = concat_trigger_values(
+        [
+            accumulate_trigger_values(
+                datetimes,
+                closes[trigger_rows[trigger]],
+                trade_steps[trade_triggers == trigger],
+                volumes_coin[trade_triggers == trigger],
+                volumes_fiat[trade_triggers == trigger],
+                trigger_names[trigger],
+            )
+            for trigger in range(len(trigger_specs))
+        ]
+    )
+
+    return PortfolioResult(
+        asset_pairs=asset_pairs,
+        trigger_names=trigger_names,
+        times=times,
+        closes=closes,
+        trades=trades,
+        balances=pd.DataFrame(balances, index=datetimes),
+        value=pd.DataFrame(value, index=datetimes),
+        trigger_values=trigger_values,
+    )
+
+
+def summarize_portfolio(result: PortfolioResult) -> pd.DataFrame:
+    """
+    Trades, investment and gain per trigger, like `summarize_simulation` but for
+    triggers on different asset pairs.
+    """
+    days = (result.times[-1] - result.times[0]) / 86400
+    last = result.trigger_values.groupby("trigger_name", sort=False).last()
+    counts = result.trades["trigger_name"].value_counts()
+    rows = []
+    for trigger_name in result.trigger_names:
+        values = last.loc[trigger_name]
+        invested = values["cumsum_fiat"]
+        gain = values["value_fiat"] / invested - 1 if invested > 0 else 0.0
+        rows.append(
+            {
+                "Trigger": trigger_name,
+                "Days": days,
+                "Trades": int(counts.get(trigger_name, 0)),
+                "Invested": invested,
+                "Acquired": values["cumsum_coin"],
+                "Value": values["value_fiat"],
+                "Gain %": gain,
+                "Gain %/a": np.power(gain + 1, 365 / days) - 1 if days > 0 else 0.0,
+            }
+        )
+    return pd.DataFrame(rows)
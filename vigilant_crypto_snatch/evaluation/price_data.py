@@ -13,6 +13,8 @@ from ..core import Price
 from ..historical import HistoricalError
 from ..historical import HistoricalSource
 from ..myrequests import perform_http_request
+from ..ratelimit import get_scheduler
+from ..ratelimit import Priority
 
 
 def make_interpolator(data: pd.DataFrame):
@@ -66,6 +68,7 @@ def download_hourly_data(asset_pair: AssetPair, api_key: str) -> dict:
         f"&fsym={asset_pair.coin}&tsym={asset_pair.fiat}"
         f"&limit=2000&toTs={timestamp}"
     )
+    get_scheduler(url).acquire(Priority.HISTORY)
     return perform_http_request(url)
 
 
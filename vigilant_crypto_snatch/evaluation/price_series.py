@@ -0,0 +1,78 @@
+import datetime
+from typing import Iterable
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from ..core import AssetPair
+from ..core import Price
+from ..historical import HistoricalError
+
+
+class PriceSeries(object):
+    """
+    Prices of a single asset pair stored as two NumPy columns.
+
+    Timestamps are POSIX seconds, like the `time` column of the Crypto Compare
+    data. This needs a small fraction of the memory of a list of `Price`
+    objects, which are only created on demand.
+    """
+
+    __slots__ = ("asset_pair", "times", "closes")
+
+    def __init__(self, asset_pair: AssetPair, times: np.ndarray, closes: np.ndarray):
+        if len(times) != len(closes):
+            raise ValueError("Timestamps and closes must have the same length.")
+        order = np.argsort(times, kind="stable")
+        self.asset_pair = asset_pair
+        self.times = np.asarray(times, dtype=np.float64)[order]
+        self.closes = np.asarray(closes, dtype=np.float64)[order]
+
+    @classmethod
+    def from_prices(
+        cls, prices: Iterable[Price], asset_pair: AssetPair
+    ) -> "PriceSeries":
+        times = []
+        closes = []
+        for price in prices:
+            if price.asset_pair == asset_pair:
+                times.append(price.timestamp.timestamp())
+                closes.append(price.last)
+        return cls(asset_pair, np.array(times), np.array(closes))
+
+    @classmethod
+    def from_dataframe(cls, data: pd.DataFrame, asset_pair: AssetPair) -> "PriceSeries":
+        return cls(asset_pair, data["time"].to_numpy(), data["close"].to_numpy())
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __getitem__(self, index: int) -> Price:
+        return Price(
+            timestamp=datetime.datetime.fromtimestamp(self.times[index]),
+            last=float(self.closes[index]),
+            asset_pair=self.asset_pair,
+        )
+
+    def __iter__(self) -> Iterator[Price]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def get_close(self, then: datetime.datetime) -> float:
+        timestamp = then.timestamp()
+        if len(self) == 0 or not self.times[0] <= timestamp <= self.times[-1]:
+            raise HistoricalError(f"No price data for {then} in series.")
+        return float(np.interp(timestamp, self.times, self.closes))
+
+    def get_closes(self, timestamps: np.ndarray) -> np.ndarray:
+        return np.interp(timestamps, self.times, self.closes)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "time": self.times,
+                "datetime": [datetime.datetime.fromtimestamp(t) for t in self.times],
+                "close": self.closes,
+            }
+        )
@@ -0,0 +1,266 @@
+"""
+Robustness of triggers against the randomness of the price history.
+
+Synthetic price paths are made by a block bootstrap of the hourly returns, which
+keeps the short-term structure of the returns within each block. The triggers
+are simulated on every path, which gives a distribution of gains and drawdowns
+instead of the single number from one history.
+"""
+import concurrent.futures
+import dataclasses
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..core import AssetPair
+from ..triggers import TriggerSpec
+from .vectorized import trigger_signals
+from .walk_forward import select_trades
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # pragma: no cover
+    # Python 3.7 has no shared memory, the series is then copied to each worker.
+    shared_memory = None  # type: ignore
+
+
+@dataclasses.dataclass()
+class RobustnessResult:
+    asset_pair: AssetPair
+    trigger_names: List[str]
+    # One row per trigger and path with trades, invested fiat, value, gain and
+    # maximum drawdown.
+    paths: pd.DataFrame
+    # The same for the actual history.
+    historical: pd.DataFrame
+
+
+def block_bootstrap(
+    closes: np.ndarray,
+    num_paths: int,
+    block_length: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """
+    Price paths with the length and start price of `closes`, made of randomly
+    chosen blocks of consecutive log returns. Returns one path per row.
+    """
+    returns = np.diff(np.log(closes))
+    block_length = min(block_length, len(returns))
+    num_blocks = -(-len(returns) // block_length)
+    starts = rng.integers(
+        0, len(returns) - block_length + 1, size=(num_paths, num_blocks)
+    )
+    indices = (starts[:, :, np.newaxis] + np.arange(block_length)).reshape(
+        num_paths, -1
+    )[:, : len(returns)]
+    log_paths = np.cumsum(returns[indices], axis=1)
+    paths = np.empty((num_paths, len(closes)))
+    paths[:, 0] = closes[0]
+    paths[:, 1:] = closes[0] * np.exp(log_paths)
+    return paths
+
+
+def evaluate_path(
+    times: np.ndarray, closes: np.ndarray, trigger_specs: Sequence[TriggerSpec]
+) -> np.ndarray:
+    """
+    Trades, invested fiat, final value, gain and maximum drawdown of each
+    trigger on one price path, with one row per trigger.
+
+    There is no limit on the fiat balance, like in `simulate_triggers`. The
+    drawdown is the largest fall of the value relative to the invested fiat
+    from its previous peak. Gain and drawdown are NaN without trades.
+    """
+    result = np.zeros((len(trigger_specs), 5))
+    for row, spec in enumerate(trigger_specs):
+        signal_steps = np.flatnonzero(trigger_signals(spec, times, closes))
+        steps = signal_steps[select_trades(times[signal_steps], spec.cooldown_minutes)]
+        if len(steps) == 0:
+            result[row, 3:] = np.nan
+            continue
+        volume_coin = np.round(spec.volume_fiat / closes[steps], 8)
+        first = steps[0]
+        coin = np.cumsum(np.bincount(steps - first, volume_coin))
+        fiat = np.cumsum(
+            np.bincount(steps - first, np.full(len(steps), spec.volume_fiat))
+        )
+        later = closes[first:]
+        coin = np.concatenate([coin, np.full(len(later) - len(coin), coin[-1])])
+        fiat = np.concatenate([fiat, np.full(len(later) - len(fiat), fiat[-1])])
+        ratio = coin * later / fiat
+        drawdown = np.max(1 - ratio / np.maximum.accumulate(ratio))
+        result[row] = (
+            len(steps),
+            fiat[-1],
+            coin[-1] * later[-1],
+            ratio[-1] - 1,
+            drawdown,
+        )
+    return result
+
+
+# Base series and triggers of the worker processes, set by `_init_worker`.
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(base: Any, length: int, trigger_specs: Sequence[TriggerSpec]) -> None:
+    if isinstance(base, str):
+        memory = shared_memory.SharedMemory(name=base)
+        _worker_state["memory"] = memory
+        base = np.ndarray((2, length), dtype=float, buffer=memory.buf)
+    _worker_state["base"] = base
+    _worker_state["trigger_specs"] = trigger_specs
+
+
+def _run_chunk(seed: np.random.SeedSequence, num_paths: int, block_length: int):
+    base = _worker_state["base"]
+    trigger_specs = _worker_state["trigger_specs"]
+    times, closes = base[0], base[1]
+    paths = block_bootstrap(
+        closes, num_paths, block_length, np.random.default_rng(seed)
+    )
+    return np.array([evaluate_path(times, path, trigger_specs) for path in paths])
+
+
+def _make_chunks(
+    num_paths: int, chunk_size: int, seed: Optional[int]
+) -> List[Tuple[np.random.SeedSequence, int]]:
+    # Every chunk has its own seed, so the paths do not depend on how the chunks
+    # are distributed among the workers.
+    sizes = [chunk_size] * (num_paths // chunk_size)
+    if num_paths % chunk_size:
+        sizes.append(num_paths % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    return list(zip(seeds, sizes))
+
+
+def bootstrap_triggers(
+    data: pd.DataFrame,
+    asset_pair: AssetPair,
+    trigger_specs: Sequence[TriggerSpec],
+    num_paths: int = 1000,
+    block_length: int = 24,
+    seed: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    chunk_size: int = 50,
+) -> RobustnessResult:
+    """
+    Simulates the triggers on the asset pair on `num_paths` bootstrapped price
+    paths with blocks of `block_length` time steps.
+
+    Chunks of paths are simulated in parallel processes, which read the base
+    series from shared memory. With `max_workers` of 1 everything runs in this
+    process. With the same `seed` the results are the same for any number of
+    workers. Triggers need a fixed fiat volume, Fear & Greed conditions are not
+    supported because there is no index for the synthetic paths.
+    """
+    trigger_specs = [spec for spec in trigger_specs if spec.asset_pair == asset_pair]
+    for spec in trigger_specs:
+        if spec.volume_fiat is None:
+            raise ValueError(f"Trigger “{spec.name}” needs a fixed fiat volume.")
+    base = np.array(
+        [data["time"].to_numpy(dtype=float), data["close"].to_numpy(dtype=float)]
+    )
+    if np.any(base[1] <= 0):
+        raise ValueError("Returns can only be bootstrapped from positive prices.")
+    chunks = _make_chunks(num_paths, chunk_size, seed)
+
+    if max_workers == 1:
+        _init_worker(base, base.shape[1], trigger_specs)
+        try:
+            results = [_run_chunk(s, n, block_length) for s, n in chunks]
+        finally:
+            _worker_state.clear()
+    else:
+        memory = None
+        if shared_memory is not None:
+            memory = shared_memory.SharedMemory(create=True, size=base.nbytes)
+            np.ndarray(base.shape, dtype=float, buffer=memory.buf)[:] = base
+        try:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers,
+                initializer=_init_worker,
+                initargs=(
+                    memory.name if memory is not None else base,
+                    base.shape[1],
+                    trigger_specs,
+                ),
+            ) as executor:
+                results = list(
+                    executor.map(
+                        _run_chunk,
+                        [s for s, _ in chunks],
+                        [n for _, n in chunks],
+                        [block_length] * len(chunks),
+                    )
+                )
+        finally:
+            if memory is not None:
+                memory.close()
+                memory.unlink()
+
+    trigger_names = [spec.name for spec in trigger_specs]
+    metrics = np.concatenate(results)
+    return RobustnessResult(
+        asset_pair=asset_pair,
+        trigger_names=trigger_names,
+        paths=_make_frame(metrics, trigger_names),
+        historical=_make_frame(
+            evaluate_path(base[0], base[1], trigger_specs)[np.newaxis],
+            trigger_names,
+        ),
+    )
+
+
+def _make_frame(metrics: np.ndarray, trigger_names: List[str]) -> pd.DataFrame:
+    num_paths, num_triggers, _ = metrics.shape
+    return pd.DataFrame(
+        {
+            "path": np.repeat(np.arange(num_paths), num_triggers),
+            "trigger_name": trigger_names * num_paths,
+            "trades": metrics[:, :, 0].ravel().astype(int),
+            "invested": metrics[:, :, 1].ravel(),
+            "value": metrics[:, :, 2].ravel(),
+            "gain": metrics[:, :, 3].ravel(),
+            "max_drawdown": metrics[:, :, 4].ravel(),
+        }
+    )
+
+
+def summarize_robustness(
+    result: RobustnessResult, percentiles: Sequence[float] = (5, 50, 95)
+) -> pd.DataFrame:
+    """
+    Distribution of gains and drawdowns per trigger over all paths, next to the
+    gain on the actual history. Paths without trades are left out of the gains.
+    """
+    rows = []
+    for trigger_name in result.trigger_names:
+        paths = result.paths[result.paths["trigger_name"] == trigger_name]
+        traded = paths[paths["trades"] > 0]
+        historical = result.historical[
+            result.historical["trigger_name"] == trigger_name
+        ]
+        row = {
+            "Trigger": trigger_name,
+            "Paths": len(paths),
+            "Median trades": paths["trades"].median(),
+            "Historical gain %": historical["gain"].iat[0],
+            "Mean gain %": traded["gain"].mean(),
+        }
+        for percentile in percentiles:
+            row[f"Gain % p{percentile:g}"] = traded["gain"].quantile(percentile / 100)
+        row["Loss probability"] = (traded["gain"] < 0).mean()
+        for percentile in percentiles:
+            row[f"Drawdown p{percentile:g}"] = traded["max_drawdown"].quantile(
+                percentile / 100
+            )
+        rows.append(row)
+    return pd.DataFrame(rows)
@@ -0,0 +1,42 @@
+import numpy as np
+
+from .downsample import lttb
+from .downsample import min_max_buckets
+from .downsample import select_range
+
+
+def test_lttb_keeps_ends_and_peak() -> None:
+    x = np.arange(10000, dtype=np.float64)
+    y = np.sin(x / 500)
+    y[4321] = 10.0
+    x_small, y_small = lttb(x, y, 200)
+    assert len(x_small) == 200
+    assert x_small[0] == 0 and x_small[-1] == 9999
+    assert np.all(np.diff(x_small) > 0)
+    assert 10.0 in y_small
+
+
+def test_lttb_short_series() -> None:
+    x = np.arange(5.0)
+    x_small, y_small = lttb(x, x, 10)
+    assert list(x_small) == list(x)
+
+
+def test_min_max_buckets() -> None:
+    x = np.arange(1000, dtype=np.float64)
+    y = np.cos(x)
+    y[500] = -5.0
+    y[501] = 5.0
+    x_small, y_small = min_max_buckets(x, y, 50)
+    assert len(x_small) <= 100
+    assert np.all(np.diff(x_small) > 0)
+    assert y_small.min() == -5.0
+    assert y_small.max() == 5.0
+
+
+def test_select_range() -> None:
+    x = np.arange(10.0)
+    x_range, y_range = select_range(x, x, 3.5, 6.5)
+    assert list(x_range) == [3.0, 4.0, 5.0, 6.0, 7.0]
+    x_range, y_range = select_range(x, x, -10, 100)
+    assert len(x_range) == 10
@@ -0,0 +1,139 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ..core import AssetPair
+from ..historical.mock import mock_price
+from ..marketplace import InsufficientFundsError
+from ..triggers import TriggerSpec
+from .market_simulation import simulate_triggers
+from .portfolio import make_regular_deposits
+from .portfolio import PortfolioMarketplace
+from .portfolio import simulate_portfolio
+from .portfolio import summarize_portfolio
+from .price_series import PriceSeries
+from .vectorized import align_series
+from .vectorized import drop_signals
+
+start = datetime.datetime(2021, 1, 1)
+btc = AssetPair("BTC", "EUR")
+eth = AssetPair("ETH", "EUR")
+
+
+def make_series(asset_pair: AssetPair, hours: int, scale: float = 1.0) -> PriceSeries:
+    datetimes = [start + datetime.timedelta(hours=hour) for hour in range(hours)]
+    data = pd.DataFrame(
+        {
+            "time": [d.timestamp() for d in datetimes],
+            "datetime": datetimes,
+            "close": [scale * mock_price(d) for d in datetimes],
+        }
+    )
+    return PriceSeries.from_dataframe(data, asset_pair)
+
+
+def test_align_series() -> None:
+    first = make_series(btc, 10)
+    second = make_series(eth, 20, 0.1)
+    times, closes = align_series([second, first])
+    assert np.array_equal(times, first.times)
+    assert closes.shape == (2, 10)
+    assert np.allclose(closes[1], first.closes)
+    times, closes = align_series([first, second], step=1800)
+    assert len(times) == 19
+
+
+def test_drop_signals() -> None:
+    times = np.arange(5) * 3600.0
+    closes = np.array([100.0, 100.0, 94.0, 100.0, 89.0])
+    signals = drop_signals(times, closes, delay_minutes=60, drop_percentage=5)
+    assert list(signals) == [False, False, True, False, True]
+
+
+def test_same_trades_as_simulate_triggers() -> None:
+    series = make_series(btc, 500)
+    trigger_specs = [
+        TriggerSpec(
+            name="Drop",
+            asset_pair=btc,
+            cooldown_minutes=120,
+            delay_minutes=180,
+            drop_percentage=1,
+            volume_fiat=25,
+        ),
+        TriggerSpec(
+            name="Daily", asset_pair=btc, cooldown_minutes=1440, volume_fiat=10
+        ),
+    ]
+    expected, _ = simulate_triggers(series.to_dataframe(), btc, trigger_specs)
+    result = simulate_portfolio([series], trigger_specs, {"EUR": 1e9})
+    assert len(result.trades) == len(expected) > 20
+    expected = expected.sort_values(["timestamp", "trigger_name"])
+    actual = result.trades.sort_values(["timestamp", "trigger_name"])
+    assert list(actual["timestamp"]) == list(expected["timestamp"])
+    assert np.allclose(actual["volume_coin"], expected["volume_coin"])
+
+
+def test_shared_budget() -> None:
+    series = [make_series(btc, 24 * 10), make_series(eth, 24 * 10, 0.1)]
+    trigger_specs = [
+        TriggerSpec(name="BTC", asset_pair=btc, cooldown_minutes=60, volume_fiat=30),
+        TriggerSpec(name="ETH", asset_pair=eth, cooldown_minutes=60, volume_fiat=30),
+    ]
+    result = simulate_portfolio(series, trigger_specs, {"EUR": 100})
+    # Three orders fit into the budget, after that both triggers are paused.
+    assert len(result.trades) == 3
+    assert result.balances["EUR"].iat[-1] == pytest.approx(10, abs=1e-3)
+    assert result.balances["BTC"].iat[-1] > 0
+    assert result.balances["ETH"].iat[-1] > 0
+
+    deposits = make_regular_deposits(
+        "EUR", 60, start, start + datetime.timedelta(days=9), datetime.timedelta(days=1)
+    )
+    result = simulate_portfolio(series, trigger_specs, {"EUR": 100}, deposits)
+    # Paused triggers resume after a day, by then the deposits cover new orders.
+    assert len(result.trades) == (100 + 60 * len(deposits)) // 30
+    assert result.balances["EUR"].min() >= 0
+
+    summary = summarize_portfolio(result)
+    assert list(summary["Trigger"]) == ["BTC", "ETH"]
+    assert summary["Trades"].sum() == len(result.trades)
+
+
+def test_ratio_volume() -> None:
+    series = [make_series(btc, 24 * 3)]
+    trigger_specs = [
+        TriggerSpec(
+            name="Half", asset_pair=btc, cooldown_minutes=1440, percentage_fiat=50
+        )
+    ]
+    result = simulate_portfolio(series, trigger_specs, {"EUR": 100})
+    assert list(result.trades["volume_fiat"]) == pytest.approx([50, 25, 12.5], rel=1e-4)
+
+
+def test_errors() -> None:
+    series = [make_series(btc, 10)]
+    with pytest.raises(ValueError):
+        simulate_portfolio(
+            series,
+            [
+                TriggerSpec(
+                    name="ETH", asset_pair=eth, cooldown_minutes=1, volume_fiat=1
+                )
+            ],
+        )
+    with pytest.raises(ValueError):
+        simulate_portfolio(
+            series, [TriggerSpec(name="None", asset_pair=btc, cooldown_minutes=1)]
+        )
+
+
+def test_portfolio_marketplace() -> None:
+    market = PortfolioMarketplace({"EUR": 10})
+    market.prices[btc] = 100.0
+    market.place_order(btc, 0.05)
+    assert market.get_balance() == pytest.approx({"EUR": 5, "BTC": 0.05})
+    with pytest.raises(InsufficientFundsError):
+        market.place_order(btc, 0.1)
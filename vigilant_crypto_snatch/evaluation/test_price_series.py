@@ -0,0 +1,33 @@
+import datetime
+
+import pytest
+
+from ..core import AssetPair
+from ..core import Price
+from ..historical import HistoricalError
+from .price_data import make_test_dataframe
+from .price_series import PriceSeries
+
+
+def test_from_dataframe() -> None:
+    asset_pair = AssetPair("BTC", "EUR")
+    series = PriceSeries.from_dataframe(make_test_dataframe(), asset_pair)
+    assert len(series) == 2
+    assert series[1].last == 43419.35
+    assert series[1].asset_pair is asset_pair
+    middle = datetime.datetime.fromtimestamp((series.times[0] + series.times[1]) / 2)
+    assert series.get_close(middle) == pytest.approx((43741.97 + 43419.35) / 2)
+    with pytest.raises(HistoricalError):
+        series.get_close(datetime.datetime(2000, 1, 1))
+    assert list(series.to_dataframe()["close"]) == [43741.97, 43419.35]
+
+
+def test_from_prices() -> None:
+    asset_pair = AssetPair("BTC", "EUR")
+    prices = [
+        Price(datetime.datetime(2021, 1, 2), 2.0, asset_pair),
+        Price(datetime.datetime(2021, 1, 1), 1.0, asset_pair),
+        Price(datetime.datetime(2021, 1, 1), 5.0, AssetPair("ETH", "EUR")),
+    ]
+    series = PriceSeries.from_prices(prices, asset_pair)
+    assert list(series) == [prices[1], prices[0]]
@@ -0,0 +1,112 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ..core import AssetPair
+from ..historical.mock import mock_price
+from ..triggers import TriggerSpec
+from .portfolio import simulate_portfolio
+from .price_series import PriceSeries
+from .robustness import block_bootstrap
+from .robustness import bootstrap_triggers
+from .robustness import evaluate_path
+from .robustness import summarize_robustness
+
+asset_pair = AssetPair("BTC", "EUR")
+trigger_specs = [
+    TriggerSpec(
+        name="Drop",
+        asset_pair=asset_pair,
+        cooldown_minutes=120,
+        delay_minutes=600,
+        drop_percentage=0.5,
+        volume_fiat=1000,
+    ),
+    TriggerSpec(
+        name="Daily", asset_pair=asset_pair, cooldown_minutes=1440, volume_fiat=1000
+    ),
+    TriggerSpec(
+        name="Never",
+        asset_pair=asset_pair,
+        cooldown_minutes=60,
+        delay_minutes=60,
+        drop_percentage=90,
+        volume_fiat=1000,
+    ),
+]
+
+
+def make_data(hours: int) -> pd.DataFrame:
+    start = datetime.datetime(2021, 1, 1)
+    datetimes = [start + datetime.timedelta(hours=hour) for hour in range(hours)]
+    return pd.DataFrame(
+        {
+            "time": [d.timestamp() for d in datetimes],
+            "datetime": datetimes,
+            "close": [mock_price(d) for d in datetimes],
+        }
+    )
+
+
+def test_block_bootstrap() -> None:
+    closes = make_data(100)["close"].to_numpy()
+    rng = np.random.default_rng(0)
+    paths = block_bootstrap(closes, 20, 10, rng)
+    assert paths.shape == (20, 100)
+    assert np.all(paths[:, 0] == closes[0])
+    returns = np.diff(np.log(closes))
+    assert np.all(np.isin(np.diff(np.log(paths[3])), returns))
+    # A single block spanning all returns can only reproduce the history.
+    paths = block_bootstrap(closes, 2, 1000, rng)
+    assert np.allclose(paths, closes)
+
+
+def test_evaluate_path() -> None:
+    data = make_data(24 * 20)
+    series = PriceSeries.from_dataframe(data, asset_pair)
+    metrics = evaluate_path(series.times, series.closes, trigger_specs)
+    result = simulate_portfolio([series], trigger_specs, {"EUR": np.inf})
+    for row, spec in enumerate(trigger_specs[:2]):
+        value = result.trigger_values[
+            result.trigger_values["trigger_name"] == spec.name
+        ].iloc[-1]
+        trades, invested, final_value, gain, drawdown = metrics[row]
+        assert trades == (result.trades["trigger_name"] == spec.name).sum() > 0
+        assert invested == pytest.approx(value["cumsum_fiat"])
+        assert final_value == pytest.approx(value["value_fiat"])
+        assert gain == pytest.approx(final_value / invested - 1)
+        assert 0 <= drawdown < 1
+    assert metrics[2, 0] == 0
+    assert np.isnan(metrics[2, 3])
+
+
+def test_bootstrap_triggers() -> None:
+    data = make_data(24 * 20)
+    result = bootstrap_triggers(
+        data, asset_pair, trigger_specs, num_paths=30, seed=1, max_workers=1
+    )
+    assert len(result.paths) == 30 * len(trigger_specs)
+    parallel = bootstrap_triggers(
+        data, asset_pair, trigger_specs, num_paths=30, seed=1, max_workers=2
+    )
+    pd.testing.assert_frame_equal(parallel.paths, result.paths)
+
+    summary = summarize_robustness(result)
+    assert list(summary["Trigger"]) == ["Drop", "Daily", "Never"]
+    assert summary["Gain % p5"].iat[0] <= summary["Gain % p95"].iat[0]
+    assert np.isnan(summary["Mean gain %"].iat[2])
+
+
+def test_bootstrap_errors() -> None:
+    data = make_data(100)
+    ratio = TriggerSpec(
+        name="Ratio", asset_pair=asset_pair, cooldown_minutes=60, percentage_fiat=10
+    )
+    with pytest.raises(ValueError):
+        bootstrap_triggers(data, asset_pair, [ratio], max_workers=1)
+    with pytest.raises(ValueError):
+        bootstrap_triggers(
+            data.assign(close=-1.0), asset_pair, trigger_specs, max_workers=1
+        )
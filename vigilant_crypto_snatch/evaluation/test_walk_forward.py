@@ -0,0 +1,86 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ..core import AssetPair
+from ..historical.mock import mock_price
+from ..triggers import TriggerSpec
+from .portfolio import simulate_portfolio
+from .price_series import PriceSeries
+from .walk_forward import grid_gains
+from .walk_forward import make_windows
+from .walk_forward import ParameterGrid
+from .walk_forward import select_trades
+from .walk_forward import walk_forward
+
+asset_pair = AssetPair("BTC", "EUR")
+
+
+def make_data(hours: int) -> pd.DataFrame:
+    start = datetime.datetime(2021, 1, 1)
+    datetimes = [start + datetime.timedelta(hours=hour) for hour in range(hours)]
+    return pd.DataFrame(
+        {
+            "time": [d.timestamp() for d in datetimes],
+            "datetime": datetimes,
+            "close": [mock_price(d) for d in datetimes],
+        }
+    )
+
+
+def test_make_windows() -> None:
+    times = np.arange(24 * 20) * 3600.0
+    windows = make_windows(times, train_days=7, test_days=3)
+    assert windows == [(0, 168, 240), (72, 240, 312), (144, 312, 384), (216, 384, 456)]
+
+
+def test_select_trades() -> None:
+    times = np.array([0, 60, 120, 3600, 3660, 7300]) * 1.0
+    assert list(select_trades(times, 1)) == [0, 1, 2, 3, 4, 5]
+    assert list(select_trades(times, 60)) == [0, 3, 5]
+
+
+def test_grid_gains_match_simulation() -> None:
+    data = make_data(24 * 20)
+    series = PriceSeries.from_dataframe(data, asset_pair)
+    grid = ParameterGrid(
+        drop_percentages=[1, 2], delay_minutes=[180, 600], cooldown_minutes=[60, 720]
+    )
+    gains, trades = grid_gains(series.times, series.closes, 0, grid)
+    spec = TriggerSpec(
+        name="Drop",
+        asset_pair=asset_pair,
+        cooldown_minutes=720,
+        volume_fiat=1000,
+        delay_minutes=600,
+        drop_percentage=1,
+    )
+    result = simulate_portfolio([series], [spec], {"EUR": np.inf})
+    value = result.trigger_values.iloc[-1]
+    assert trades[0, 1, 1] == len(result.trades) > 0
+    assert gains[0, 1, 1] == pytest.approx(
+        value["value_fiat"] / value["cumsum_fiat"] - 1, rel=1e-5
+    )
+
+
+def test_walk_forward() -> None:
+    data = make_data(24 * 50)
+    grid = ParameterGrid(
+        drop_percentages=[1, 2, 5], delay_minutes=[60, 240], cooldown_minutes=[60, 600]
+    )
+    result = walk_forward(data, asset_pair, grid, 14, 7, min_trades=1, max_workers=1)
+    assert len(result.windows) == 5
+    summary = result.summary
+    assert list(summary["Trigger"])[-1] == "Walk-forward"
+    assert summary["Trades"].iat[-1] == len(result.trades)
+    assert summary["Trades"].iloc[:-1].sum() == len(result.trades)
+    for window in result.windows:
+        assert window.train_start < window.test_start < window.test_end
+
+    parallel = walk_forward(data, asset_pair, grid, 14, 7, min_trades=1, max_workers=2)
+    pd.testing.assert_frame_equal(parallel.summary, summary)
+
+    with pytest.raises(ValueError):
+        walk_forward(data.iloc[:100], asset_pair, grid)
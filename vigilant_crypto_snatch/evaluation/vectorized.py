@@ -0,0 +1,141 @@
+"""
+Trigger conditions and values over whole price arrays.
+
+The conditions which only depend on prices and time are evaluated for all time
+steps at once. Cooldowns and funds depend on earlier trades, these are left to
+the portfolio simulation.
+"""
+import datetime
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..triggers import TriggerSpec
+from .price_series import PriceSeries
+
+
+def align_series(
+    series: Sequence[PriceSeries], step: Optional[float] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Interpolates all series onto a common grid of timestamps, covering the time
+    range in which all of them have data.
+
+    Without a `step` in seconds, the grid consists of the timestamps of the
+    first series. Returns the grid and the closes with one row per series.
+    """
+    if len(series) == 0:
+        raise ValueError("At least one price series is needed.")
+    start = max(s.times[0] for s in series)
+    end = min(s.times[-1] for s in series)
+    if start > end:
+        raise ValueError("The price series do not overlap in time.")
+    if step is None:
+        times = series[0].times
+        times = times[(start <= times) & (times <= end)]
+    else:
+        times = np.arange(start, end + step / 2, step)
+    closes = np.empty((len(series), len(times)))
+    for row, s in enumerate(series):
+        closes[row] = s.get_closes(times)
+    return times, closes
+
+
+def drop_signals(
+    times: np.ndarray, closes: np.ndarray, delay_minutes: float, drop_percentage: float
+) -> np.ndarray:
+    """
+    Whether the price has dropped by the percentage within the delay, like
+    `DropTriggeredDelegate`. Without a price at the earlier time the condition is
+    not fulfilled.
+    """
+    then = times - delay_minutes * 60
+    then_closes = np.interp(then, times, closes)
+    critical = then_closes * (1 - drop_percentage / 100)
+    return (closes < critical) & (then >= times[0])
+
+
+def fear_greed_signals(
+    times: np.ndarray, fear_greed: pd.DataFrame, threshold: int
+) -> np.ndarray:
+    """
+    Whether the Fear & Greed index of the day is below the threshold. The data
+    frame is the one from `get_fear_greed_data`.
+    """
+    values = pd.Series(
+        fear_greed["fear_greed_index"].to_numpy(dtype=float),
+        index=[date.date() for date in pd.to_datetime(fear_greed["date"])],
+    )
+    # All time zones are offset by multiples of 15 minutes, so the local date
+    # only needs to be computed once per quarter of an hour.
+    quarters, inverse = np.unique(np.floor(times / 900), return_inverse=True)
+    dates = [datetime.date.fromtimestamp(quarter * 900) for quarter in quarters]
+    quarter_values = values.reindex(dates).to_numpy()
+    return quarter_values[inverse] < threshold
+
+
+def trigger_signals(
+    trigger_spec: TriggerSpec,
+    times: np.ndarray,
+    closes: np.ndarray,
+    fear_greed: Optional[pd.DataFrame] = None,
+) -> np.ndarray:
+    """
+    Combines the start, drop and Fear & Greed conditions of a trigger for all time
+    steps.
+    """
+    signals = np.ones(len(times), dtype=bool)
+    if trigger_spec.start is not None:
+        signals &= times >= trigger_spec.start.timestamp()
+    if trigger_spec.delay_minutes is not None and trigger_spec.drop_percentage:
+        signals &= drop_signals(
+            times, closes, trigger_spec.delay_minutes, trigger_spec.drop_percentage
+        )
+    if trigger_spec.fear_and_greed_index_below:
+        if fear_greed is None:
+            raise ValueError(
+                f"Trigger “{trigger_spec.name}” needs the Fear & Greed index."
+            )
+        signals &= fear_greed_signals(
+            times, fear_greed, trigger_spec.fear_and_greed_index_below
+        )
+    return signals
+
+
+def accumulate_trigger_values(
+    datetimes: Sequence[datetime.datetime],
+    closes: np.ndarray,
+    steps: np.ndarray,
+    volume_coin: np.ndarray,
+    volume_fiat: np.ndarray,
+    trigger_name: str,
+) -> pd.DataFrame:
+    """
+    Invested fiat, acquired coin and its value for all time steps, given the
+    indices of the time steps with trades of one trigger. The result has the
+    format of `accumulate_value`.
+    """
+    cumsum_coin = np.cumsum(np.bincount(steps, volume_coin, minlength=len(closes)))
+    cumsum_fiat = np.cumsum(np.bincount(steps, volume_fiat, minlength=len(closes)))
+    return pd.DataFrame(
+        {
+            "datetime": datetimes,
+            "trigger_name": trigger_name,
+            "cumsum_coin": cumsum_coin,
+            "cumsum_fiat": cumsum_fiat,
+            "value_fiat": cumsum_coin * closes,
+        }
+    )
+
+
+def concat_trigger_values(values: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Interleaves the values of several triggers in the order of `accumulate_value`.
+    """
+    return pd.concat(values, ignore_index=True).sort_values(
+        "datetime", kind="mergesort", ignore_index=True
+    )
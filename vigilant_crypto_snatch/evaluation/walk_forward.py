@@ -0,0 +1,329 @@
+"""
+Walk-forward optimization of drop triggers.
+
+The history is split into rolling windows. On each training window the drop
+percentage, delay and cooldown with the highest gain are searched on a grid,
+then these parameters are simulated on the following test window, which the
+search has not seen.
+"""
+import concurrent.futures
+import dataclasses
+import datetime
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..core import AssetPair
+from ..triggers import TriggerSpec
+from .market_simulation import summarize_simulation
+from .portfolio import simulate_portfolio
+from .price_series import PriceSeries
+from .vectorized import accumulate_trigger_values
+
+
+@dataclasses.dataclass()
+class ParameterGrid:
+    drop_percentages: Sequence[float] = tuple(range(1, 21))
+    delay_minutes: Sequence[int] = tuple(60 * hours for hours in range(1, 49, 4))
+    cooldown_minutes: Sequence[int] = (60, 360, 720, 1440, 2880, 10080)
+
+    def __len__(self) -> int:
+        return (
+            len(self.drop_percentages)
+            * len(self.delay_minutes)
+            * len(self.cooldown_minutes)
+        )
+
+
+@dataclasses.dataclass()
+class WalkForwardWindow:
+    train_start: datetime.datetime
+    test_start: datetime.datetime
+    test_end: datetime.datetime
+    # `None` when no parameters made enough trades in the training window.
+    drop_percentage: Optional[float]
+    delay_minutes: Optional[int]
+    cooldown_minutes: Optional[int]
+    train_gain: float
+    train_trades: int
+
+
+@dataclasses.dataclass()
+class WalkForwardResult:
+    asset_pair: AssetPair
+    windows: List[WalkForwardWindow]
+    # Out-of-sample trades of all test windows.
+    trades: pd.DataFrame
+    # One row per test window and one for all of them, with the columns of
+    # `summarize_simulation` and the chosen parameters.
+    summary: pd.DataFrame
+
+
+def make_windows(
+    times: np.ndarray, train_days: float, test_days: float
+) -> List[Tuple[int, int, int]]:
+    """
+    Indices where the training window starts, where the test window starts and
+    where it ends. The windows move forward by the length of the test window.
+    """
+    windows = []
+    train_start = times[0]
+    while True:
+        test_start = train_start + train_days * 86400
+        test_end = test_start + test_days * 86400
+        if test_end > times[-1] + 1:
+            break
+        windows.append(
+            (
+                int(np.searchsorted(times, train_start)),
+                int(np.searchsorted(times, test_start)),
+                int(np.searchsorted(times, test_end)),
+            )
+        )
+        train_start += test_days * 86400
+    return windows
+
+
+def select_trades(times: np.ndarray, cooldown_minutes: float) -> np.ndarray:
+    """
+    Indices of the signal times that trade when a trade blocks the trigger for
+    the cooldown, like `WasTriggeredSinceDelegate`.
+    """
+    cooldown = cooldown_minutes * 60
+    if len(times) < 2 or np.min(np.diff(times)) >= cooldown:
+        return np.arange(len(times))
+    # The next possible trade after each signal, the chain of these from the
+    # first signal are the trades.
+    following = np.searchsorted(times, times + cooldown).tolist()
+    selected = []
+    index = 0
+    while index < len(times):
+        selected.append(index)
+        index = following[index]
+    return np.array(selected, int)
+
+
+def grid_gains(
+    times: np.ndarray, closes: np.ndarray, begin: int, grid: ParameterGrid
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Gain and number of trades for all parameters on the grid, when every trade
+    buys for the same amount of fiat. The prices before `begin` are only used to
+    look back for the drops. Both arrays are indexed by drop, delay and cooldown.
+    """
+    shape = (
+        len(grid.drop_percentages),
+        len(grid.delay_minutes),
+        len(grid.cooldown_minutes),
+    )
+    gains = np.zeros(shape)
+    trades = np.zeros(shape, int)
+    inverse_closes = 1 / closes
+    for j, delay in enumerate(grid.delay_minutes):
+        then = times - delay * 60
+        ratios = closes / np.interp(then, times, closes)
+        candidates = then >= times[0]
+        candidates[:begin] = False
+        for i, drop in enumerate(grid.drop_percentages):
+            signal_steps = np.flatnonzero(candidates & (ratios < 1 - drop / 100))
+            if len(signal_steps) == 0:
+                continue
+            for k, cooldown in enumerate(grid.cooldown_minutes):
+                steps = signal_steps[select_trades(times[signal_steps], cooldown)]
+                trades[i, j, k] = len(steps)
+                gains[i, j, k] = closes[-1] * np.mean(inverse_closes[steps]) - 1
+    return gains, trades
+
+
+def _optimize_window(
+    times: np.ndarray,
+    closes: np.ndarray,
+    begin: int,
+    grid: ParameterGrid,
+    min_trades: int,
+) -> Tuple[Optional[Tuple[float, int, int]], float, int]:
+    gains, trades = grid_gains(times, closes, begin, grid)
+    gains[trades < min_trades] = -np.inf
+    best = np.unravel_index(np.argmax(gains), gains.shape)
+    if not np.isfinite(gains[best]):
+        return None, 0.0, 0
+    parameters = (
+        grid.drop_percentages[int(best[0])],
+        grid.delay_minutes[int(best[1])],
+        grid.cooldown_minutes[int(best[2])],
+    )
+    return parameters, float(gains[best]), int(trades[best])
+
+
+def walk_forward(
+    data: pd.DataFrame,
+    asset_pair: AssetPair,
+    grid: Optional[ParameterGrid] = None,
+    train_days: float = 28,
+    test_days: float = 7,
+    volume_fiat: float = 25.0,
+    min_trades: int = 3,
+    max_workers: Optional[int] = None,
+) -> WalkForwardResult:
+    """
+    Optimizes a drop trigger on rolling training windows and simulates the best
+    parameters on the test window after each.
+
+    The training windows are searched in parallel processes, with `max_workers`
+    of 1 everything runs in this process. Parameters need `min_trades` trades
+    in the training window, so that a single lucky drop is not chosen. Each test
+    window starts without cooldown from the previous one.
+    """
+    if grid is None:
+        grid = ParameterGrid()
+    series = PriceSeries.from_dataframe(data, asset_pair)
+    times = series.times
+    closes = series.closes
+    windows = make_windows(times, train_days, test_days)
+    if len(windows) == 0:
+        raise ValueError(
+            f"The data covers less than {train_days + test_days} days for one window."
+        )
+    lookback = max(grid.delay_minutes) * 60
+
+    jobs = []
+    for train_begin, test_begin, _ in windows:
+        first = int(np.searchsorted(times, times[train_begin] - lookback))
+        jobs.append(
+            (
+                times[first:test_begin],
+                closes[first:test_begin],
+                train_begin - first,
+                grid,
+                min_trades,
+            )
+        )
+    if max_workers == 1:
+        optima = [_optimize_window(*job) for job in jobs]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers) as executor:
+            optima = list(executor.map(_optimize_window, *zip(*jobs)))
+
+    results = []
+    summaries = []
+    all_trades = []
+    for (train_begin, test_begin, test_end), (parameters, gain, train_trades) in zip(
+        windows, optima
+    ):
+        window = WalkForwardWindow(
+            train_start=datetime.datetime.fromtimestamp(times[train_begin]),
+            test_start=datetime.datetime.fromtimestamp(times[test_begin]),
+            test_end=datetime.datetime.fromtimestamp(times[test_end - 1]),
+            drop_percentage=None,
+            delay_minutes=None,
+            cooldown_minutes=None,
+            train_gain=gain,
+            train_trades=train_trades,
+        )
+        test_data = data.iloc[test_begin:test_end].reset_index(drop=True)
+        name = f"{window.test_start:%Y-%m-%d}"
+        if parameters is not None:
+            (
+                window.drop_percentage,
+                window.delay_minutes,
+                window.cooldown_minutes,
+            ) = parameters
+            test_trades, value = _simulate_test_window(
+                series, test_begin, test_end, window, parameters, volume_fiat, name
+            )
+            all_trades.append(test_trades)
+            summary = _summarize(test_data, test_trades, value, name, asset_pair)
+        else:
+            summary = {"Trigger": name, "Trades": 0}
+        summaries.append(
+            dict(
+                summary,
+                **{
+                    "Drop %": window.drop_percentage,
+                    "Delay / min": window.delay_minutes,
+                    "Cooldown / min": window.cooldown_minutes,
+                    "Train gain %": window.train_gain,
+                },
+            )
+        )
+        results.append(window)
+
+    if all_trades:
+        trades = pd.concat(all_trades, ignore_index=True)
+    else:
+        trades = pd.DataFrame(
+            columns=["timestamp", "trigger_name", "volume_coin", "volume_fiat"]
+        )
+    out_of_sample = data.iloc[windows[0][1] : windows[-1][2]].reset_index(drop=True)
+    total = trades.assign(trigger_name="Walk-forward")
+    steps = np.searchsorted(
+        out_of_sample["datetime"].to_numpy(), total["timestamp"].to_numpy()
+    )
+    value = accumulate_trigger_values(
+        list(out_of_sample["datetime"]),
+        out_of_sample["close"].to_numpy(),
+        steps,
+        total["volume_coin"].to_numpy(float),
+        total["volume_fiat"].to_numpy(float),
+        "Walk-forward",
+    )
+    summaries.append(
+        _summarize(out_of_sample, total, value, "Walk-forward", asset_pair)
+    )
+    return WalkForwardResult(
+        asset_pair=asset_pair,
+        windows=results,
+        trades=trades,
+        summary=pd.DataFrame(summaries),
+    )
+
+
+def _simulate_test_window(
+    series: PriceSeries,
+    test_begin: int,
+    test_end: int,
+    window: WalkForwardWindow,
+    parameters: Tuple[float, int, int],
+    volume_fiat: float,
+    name: str,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    drop_percentage, delay_minutes, cooldown_minutes = parameters
+    # The prices before the test window are needed to look back for the drop,
+    # the start of the trigger keeps it from trading there.
+    first = int(
+        np.searchsorted(series.times, series.times[test_begin] - delay_minutes * 60)
+    )
+    spec = TriggerSpec(
+        name=name,
+        asset_pair=series.asset_pair,
+        cooldown_minutes=cooldown_minutes,
+        volume_fiat=volume_fiat,
+        delay_minutes=delay_minutes,
+        drop_percentage=drop_percentage,
+        start=window.test_start,
+    )
+    window_series = PriceSeries(
+        series.asset_pair, series.times[first:test_end], series.closes[first:test_end]
+    )
+    result = simulate_portfolio(
+        [window_series], [spec], {series.asset_pair.fiat: np.inf}
+    )
+    value = result.trigger_values.iloc[test_begin - first :]
+    return result.trades, value
+
+
+def _summarize(
+    data: pd.DataFrame,
+    trades: pd.DataFrame,
+    value: pd.DataFrame,
+    name: str,
+    asset_pair: AssetPair,
+) -> dict:
+    # Windows without trades have no average price and gain.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        summary = summarize_simulation(data, trades, value, [name], asset_pair)
+    return summary.iloc[0].to_dict()
@@ -0,0 +1,335 @@
+"""
+Local HTTP stand-in for the Kraken REST API and the Crypto Compare `histo*`
+endpoints, used for load and latency tests of the watch loop.
+
+Responses get a random latency and can fail with injected errors. Both APIs are
+rate limited like the real services. Prices follow `mock_price`, so the ticker
+and the historical data agree with each other.
+"""
+import collections
+import dataclasses
+import datetime
+import http.server
+import json
+import math
+import random
+import threading
+import time
+import urllib.parse
+from typing import Any
+from typing import Counter
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+from .historical.mock import mock_price
+from .ratelimit import TokenBucket
+
+kraken_fiats = {"EUR", "USD", "GBP", "CHF", "CAD", "JPY"}
+
+crypto_compare_resolutions = {"minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclasses.dataclass()
+class LatencyModel:
+    """
+    Log-normal response times, given by the median and the spread `sigma`.
+    """
+
+    median_seconds: float = 0.0
+    sigma: float = 0.5
+
+    def sample(self, rng: random.Random) -> float:
+        if self.median_seconds <= 0:
+            return 0.0
+        return self.median_seconds * math.exp(rng.gauss(0.0, self.sigma))
+
+
+@dataclasses.dataclass()
+class FaultModel:
+    """
+    Probabilities of injected errors per request.
+
+    A timeout holds the request for `stall_seconds` and then closes the
+    connection without an answer.
+    """
+
+    insufficient_funds: float = 0.0
+    server_error: float = 0.0
+    timeout: float = 0.0
+    stall_seconds: float = 5.0
+
+
+@dataclasses.dataclass()
+class SimulatorConfig:
+    kraken_latency: LatencyModel = dataclasses.field(default_factory=LatencyModel)
+    crypto_compare_latency: LatencyModel = dataclasses.field(
+        default_factory=LatencyModel
+    )
+    faults: FaultModel = dataclasses.field(default_factory=FaultModel)
+    # Kraken allows about one public call per second. Private calls use a
+    # counter with a maximum of 15 which decays by 0.33 per second.
+    kraken_public_rate: float = 1.0
+    kraken_public_burst: float = 1.0
+    kraken_private_rate: float = 0.33
+    kraken_private_burst: float = 15.0
+    crypto_compare_rate: float = 50.0
+    crypto_compare_burst: float = 50.0
+    balances: Dict[str, float] = dataclasses.field(
+        default_factory=lambda: {"EUR": 10000.0}
+    )
+    withdrawal_fee: float = 0.0005
+    seed: int = 0
+
+
+Response = Tuple[int, Optional[Dict[str, Any]]]
+
+
+class ExchangeSimulator(object):
+    def __init__(self, config: Optional[SimulatorConfig] = None, port: int = 0):
+        self.config = config or SimulatorConfig()
+        self.rng = random.Random(self.config.seed)
+        self.rng_lock = threading.Lock()
+        self.balances = {
+            kraken_asset_name(asset): value
+            for asset, value in self.config.balances.items()
+        }
+        self.balance_lock = threading.Lock()
+        self.kraken_public_bucket = TokenBucket(
+            self.config.kraken_public_rate, self.config.kraken_public_burst
+        )
+        self.kraken_private_bucket = TokenBucket(
+            self.config.kraken_private_rate, self.config.kraken_private_burst
+        )
+        self.crypto_compare_bucket = TokenBucket(
+            self.config.crypto_compare_rate, self.config.crypto_compare_burst
+        )
+        self.counts: Counter[Tuple[str, str]] = collections.Counter()
+        self.counts_lock = threading.Lock()
+
+        self.host = "127.0.0.1"
+        self.server = http.server.ThreadingHTTPServer(
+            (self.host, port), _RequestHandler
+        )
+        self.server.daemon_threads = True
+        self.server.simulator = self  # type: ignore
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        # The port is only known after binding when 0 was requested.
+        return f"http://{self.host}:{self.server.server_port}"
+
+    def start(self) -> "ExchangeSimulator":
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, name="exchange-simulator", daemon=True
+        )
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def __enter__(self) -> "ExchangeSimulator":
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def random(self) -> float:
+        with self.rng_lock:
+            return self.rng.random()
+
+    def sample_latency(self, model: LatencyModel) -> float:
+        with self.rng_lock:
+            return model.sample(self.rng)
+
+    def count(self, endpoint: str, outcome: str) -> None:
+        with self.counts_lock:
+            self.counts[(endpoint, outcome)] += 1
+
+    def handle(self, path: str, params: Dict[str, str]) -> Optional[Response]:
+        """
+        Answers a request. `None` means that the connection is dropped.
+        """
+        parts = path.strip("/").split("/")
+        if len(parts) == 3 and parts[0] == "0" and parts[1] in ("public", "private"):
+            endpoint = parts[2]
+            latency = self.config.kraken_latency
+            bucket: Optional[TokenBucket] = (
+                self.kraken_public_bucket
+                if parts[1] == "public"
+                else self.kraken_private_bucket
+            )
+            # Orders have their own limits on Kraken, they do not count
+            # against the call counter.
+            if endpoint == "AddOrder":
+                bucket = None
+            handler = getattr(self, f"kraken_{endpoint.lower()}", None)
+        elif len(parts) == 2 and parts[0] == "data" and parts[1].startswith("histo"):
+            endpoint = parts[1]
+            latency = self.config.crypto_compare_latency
+            bucket = self.crypto_compare_bucket
+            handler = self.crypto_compare_histo
+        else:
+            self.count(path, "not found")
+            return 404, {"error": [f"Unknown path {path}"]}
+        if handler is None:
+            self.count(endpoint, "not found")
+            return 404, {"error": [f"EGeneral:Unknown method {endpoint}"]}
+
+        time.sleep(self.sample_latency(latency))
+
+        faults = self.config.faults
+        if self.random() < faults.timeout:
+            self.count(endpoint, "timeout")
+            time.sleep(faults.stall_seconds)
+            return None
+        if self.random() < faults.server_error:
+            self.count(endpoint, "server error")
+            return 503, None
+        if bucket is not None and not bucket.try_acquire():
+            self.count(endpoint, "rate limited")
+            if bucket is self.crypto_compare_bucket:
+                return 429, {
+                    "Response": "Error",
+                    "Message": "You are over your rate limit.",
+                    "Data": [],
+                }
+            else:
+                return 200, {"error": ["EAPI:Rate limit exceeded"]}
+
+        self.count(endpoint, "ok")
+        return handler(endpoint, params)
+
+    def get_price(self, coin: str, timestamp: float) -> float:
+        scale = 1.0 if coin.upper() in ("BTC", "XBT") else 0.1
+        return scale * mock_price(datetime.datetime.fromtimestamp(timestamp))
+
+    def kraken_ticker(self, endpoint: str, params: Dict[str, str]) -> Response:
+        pair = params["pair"]
+        coin, fiat = pair[:-3], pair[-3:]
+        last = self.get_price(coin, time.time())
+        key = kraken_asset_name(coin) + kraken_asset_name(fiat)
+        return 200, {"error": [], "result": {key: {"c": [f"{last:.2f}", "0.1"]}}}
+
+    def kraken_balance(self, endpoint: str, params: Dict[str, str]) -> Response:
+        with self.balance_lock:
+            balances = {
+                asset: f"{value:.10f}" for asset, value in self.balances.items()
+            }
+        return 200, {"error": [], "result": balances}
+
+    def kraken_addorder(self, endpoint: str, params: Dict[str, str]) -> Response:
+        if self.random() < self.config.faults.insufficient_funds:
+            self.count(endpoint, "insufficient funds")
+            return 200, {"error": ["EOrder:Insufficient funds"]}
+        pair = params["pair"]
+        coin = kraken_asset_name(pair[:-3])
+        fiat = kraken_asset_name(pair[-3:])
+        volume = float(params["volume"])
+        cost = volume * self.get_price(pair[:-3], time.time())
+        with self.balance_lock:
+            if self.balances.get(fiat, 0.0) < cost:
+                return 200, {"error": ["EOrder:Insufficient funds"]}
+            self.balances[fiat] -= cost
+            self.balances[coin] = self.balances.get(coin, 0.0) + volume
+        return 200, {
+            "error": [],
+            "result": {
+                "descr": {"order": f"buy {volume} {pair} @ market"},
+                "txid": [f"SIM-{int(self.random() * 2 ** 32):08X}"],
+            },
+        }
+
+    def kraken_withdrawinfo(self, endpoint: str, params: Dict[str, str]) -> Response:
+        amount = float(params["amount"])
+        return 200, {
+            "error": [],
+            "result": {
+                "method": params["asset"],
+                "limit": str(amount),
+                "amount": str(amount - self.config.withdrawal_fee),
+                "fee": str(self.config.withdrawal_fee),
+            },
+        }
+
+    def kraken_withdraw(self, endpoint: str, params: Dict[str, str]) -> Response:
+        asset = kraken_asset_name(params["asset"])
+        with self.balance_lock:
+            self.balances[asset] = max(
+                0.0, self.balances.get(asset, 0.0) - float(params["amount"])
+            )
+        return 200, {"error": [], "result": {"refid": "SIM-WITHDRAWAL"}}
+
+    def crypto_compare_histo(self, endpoint: str, params: Dict[str, str]) -> Response:
+        resolution = crypto_compare_resolutions.get(endpoint[len("histo") :])
+        if resolution is None:
+            return 404, {"Response": "Error", "Message": "Unknown resolution."}
+        limit = int(params.get("limit", 1440))
+        # Like Crypto Compare, there are no bars from the future.
+        to_ts = min(int(params.get("toTs", time.time())), int(time.time()))
+        last_bar = to_ts - to_ts % resolution
+        data = []
+        for i in range(limit, -1, -1):
+            bar_time = last_bar - i * resolution
+            close = self.get_price(params["fsym"], bar_time)
+            data.append(
+                dict(
+                    time=bar_time,
+                    open=close,
+                    high=close,
+                    low=close,
+                    close=close,
+                    volumefrom=1.0,
+                    volumeto=close,
+                )
+            )
+        return 200, {
+            "Response": "Success",
+            "TimeFrom": data[0]["time"],
+            "TimeTo": data[-1]["time"],
+            "Data": data,
+        }
+
+
+def kraken_asset_name(asset: str) -> str:
+    asset = {"BTC": "XBT"}.get(asset, asset)
+    if len(asset) == 3:
+        return ("Z" if asset in kraken_fiats else "X") + asset
+    return asset
+
+
+class _RequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        url = urllib.parse.urlsplit(self.path)
+        self._answer(url.path, dict(urllib.parse.parse_qsl(url.query)))
+
+    def do_POST(self) -> None:
+        url = urllib.parse.urlsplit(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length).decode()
+        params = dict(urllib.parse.parse_qsl(url.query))
+        params.update(urllib.parse.parse_qsl(body))
+        self._answer(url.path, params)
+
+    def _answer(self, path: str, params: Dict[str, str]) -> None:
+        response = self.server.simulator.handle(path, params)  # type: ignore
+        if response is None:
+            self.close_connection = True
+            return
+        status, payload = response
+        body = b"" if payload is None else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
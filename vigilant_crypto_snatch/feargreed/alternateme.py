@@ -3,12 +3,16 @@ from typing import Dict
 
 from ..myrequests import HttpRequestError
 from ..myrequests import perform_http_request
+from ..ratelimit import get_scheduler
+from ..ratelimit import Priority
 from .interface import FearAndGreedException
 from .interface import FearAndGreedIndex
 
 
 def alternative_me_fear_and_greed(limit: int = 1) -> Dict:
-    return perform_http_request(f"https://api.alternative.me/fng/?limit={limit}")
+    url = f"https://api.alternative.me/fng/?limit={limit}"
+    get_scheduler(url).acquire(Priority.HISTORY)
+    return perform_http_request(url)
 
 
 def stub_alternative_me_fear_and_greed(limit: int) -> Dict:
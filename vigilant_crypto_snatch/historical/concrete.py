@@ -1,16 +1,25 @@
+import array
+import bisect
 import dataclasses
 import datetime
+import time
 from typing import Any
 from typing import Dict
 from typing import List
+from typing import Optional
+from typing import Tuple
 
 from .. import logger
+from ..caching import SingleFlight
+from ..caching import TTLCache
 from ..core import AssetPair
 from ..core import Price
 from ..datastorage import Datastore
 from ..marketplace import Marketplace
 from ..myrequests import HttpRequestError
 from ..myrequests import perform_http_request
+from ..ratelimit import get_scheduler
+from ..ratelimit import Priority
 from .interface import HistoricalError
 from .interface import HistoricalSource
 
@@ -23,28 +32,147 @@ class CryptoCompareConfig:
         return dict(api_key=self.api_key)
 
 
+crypto_compare_url = "https://min-api.cryptocompare.com"
+
+# Length of a bar in seconds.
+crypto_compare_resolutions = {"minute": 60, "hour": 3600, "day": 86400}
+
+# Number of bars per request, the maximum that Crypto Compare returns.
+window_bars = 2000
+
+# Windows are shared by all instances, such that the GUI, the reports and the
+# triggers make only one request for the same window. Windows in the past do
+# not change and are kept for a day. The current window is only kept for the
+# length of a bar.
+crypto_compare_cache = TTLCache(max_size=256)
+crypto_compare_flights = SingleFlight()
+
+
+@dataclasses.dataclass()
+class PriceWindow:
+    times: array.array
+    closes: array.array
+
+    def get_close(self, bar_time: int) -> Optional[float]:
+        index = bisect.bisect_right(self.times, bar_time) - 1
+        if index < 0:
+            return None
+        return self.closes[index]
+
+
 class CryptoCompareHistoricalSource(HistoricalSource):
-    def __init__(self, config: CryptoCompareConfig):
+    """
+    Fetches windows of bars aligned to the resolution, such that triggers with
+    different delays on the same asset pair share one request.
+
+    With a datastore, all completed bars of a window are stored there as well.
+    """
+
+    def __init__(
+        self,
+        config: CryptoCompareConfig,
+        url: str = crypto_compare_url,
+        datastore: Optional[Datastore] = None,
+    ):
         self.api_key = config.api_key
+        self.url = url
+        self.scheduler = get_scheduler(url)
+        self.datastore = datastore
+        self.stored_until: Dict[Tuple[AssetPair, str, int], int] = {}
 
     def get_price(self, when: datetime.datetime, asset_pair: AssetPair) -> Price:
+        kind = self.get_kind(when)
+        resolution = crypto_compare_resolutions[kind]
+        timestamp = int(when.timestamp())
+        bar_time = timestamp - timestamp % resolution
+        window_length = window_bars * resolution
+        window_start = bar_time - bar_time % window_length
+        key = (self.url, asset_pair, kind, window_start)
+        window = crypto_compare_cache.get(key)
+        if window is None:
+
+            def download() -> PriceWindow:
+                result = self.download_window(asset_pair, kind, window_start)
+                if window_start + window_length + resolution <= time.time():
+                    ttl = 86400
+                else:
+                    ttl = resolution
+                crypto_compare_cache.put(key, result, ttl)
+                return result
+
+            window = crypto_compare_flights.do(key, download)
+
+        close = window.get_close(bar_time)
+        if close is None:
+            raise HistoricalError(
+                f"Crypto Compare has no {kind} data for {asset_pair.fiat}/{asset_pair.coin} at {when}."
+            )
+        logger.debug(f"Retrieved a price of {close} at {when} from Cryptocompare.")
+        return Price(timestamp=when, last=close, asset_pair=asset_pair)
+
+    def download_window(
+        self, asset_pair: AssetPair, kind: str, window_start: int
+    ) -> PriceWindow:
+        resolution = crypto_compare_resolutions[kind]
+        to_ts = window_start + (window_bars - 1) * resolution
         logger.debug(
-            f"Retrieving historical price at {when} for {asset_pair.fiat}/{asset_pair.coin} …"
+            f"Retrieving historical {kind} prices until {datetime.datetime.fromtimestamp(to_ts)} for {asset_pair.fiat}/{asset_pair.coin} …"
         )
-        timestamp = int(when.timestamp())
-        kind = self.get_kind(when)
-        url = self.base_url(kind, asset_pair) + f"&limit=1&toTs={timestamp}"
+        url = self.base_url(kind, asset_pair) + f"&limit={window_bars - 1}&toTs={to_ts}"
+        self.scheduler.acquire(Priority.HISTORY)
         try:
             j = perform_http_request(url)
         except HttpRequestError as e:
             raise HttpRequestError("HTTP error from Crypto Compare") from e
-        if len(j["Data"]) == 0:
+        # Before a coin was traded, the bars are filled with zeros.
+        bars = [(bar["time"], bar["close"]) for bar in j["Data"] if bar["close"] > 0]
+        if len(bars) == 0:
             raise HistoricalError(
                 f"There is no payload from the historical API: {str(j)}"
             )
-        close = j["Data"][-1]["close"]
-        logger.debug(f"Retrieved a price of {close} at {when} from Cryptocompare.")
-        return Price(timestamp=when, last=close, asset_pair=asset_pair)
+        window = PriceWindow(
+            array.array("q", (bar_time for bar_time, close in bars)),
+            array.array("d", (close for bar_time, close in bars)),
+        )
+        if self.datastore is not None:
+            self.store_bars(asset_pair, kind, window_start, bars)
+        return window
+
+    def store_bars(
+        self,
+        asset_pair: AssetPair,
+        kind: str,
+        window_start: int,
+        bars: List[Tuple[int, float]],
+    ) -> None:
+        """
+        Stores the completed bars which have not been stored before. A close is
+        the price at the end of its bar.
+        """
+        assert self.datastore is not None
+        resolution = crypto_compare_resolutions[kind]
+        key = (asset_pair, kind, window_start)
+        stored_until = self.stored_until.get(key, window_start - resolution)
+        now = time.time()
+        new_bars = [
+            (bar_time, close)
+            for bar_time, close in bars
+            if stored_until < bar_time and bar_time + resolution <= now
+        ]
+        if new_bars:
+            self.datastore.add_prices(
+                [
+                    Price(
+                        timestamp=datetime.datetime.fromtimestamp(
+                            bar_time + resolution
+                        ),
+                        last=close,
+                        asset_pair=asset_pair,
+                    )
+                    for bar_time, close in new_bars
+                ]
+            )
+            self.stored_until[key] = new_bars[-1][0]
 
     @staticmethod
     def get_kind(when: datetime.datetime) -> str:
@@ -58,7 +186,7 @@ class CryptoCompareHistoricalSource(HistoricalSource):
             return "day"
 
     def base_url(self, kind: str, asset_pair: AssetPair):
-        return f"https://min-api.cryptocompare.com/data/histo{kind}?api_key={self.api_key}&fsym={asset_pair.coin.upper()}&tsym={asset_pair.fiat.upper()}"
+        return f"{self.url}/data/histo{kind}?api_key={self.api_key}&fsym={asset_pair.coin.upper()}&tsym={asset_pair.fiat.upper()}"
 
 
 class DatabaseHistoricalSource(HistoricalSource):
@@ -12,6 +12,8 @@ from .. import logger
 from ..core import AssetPair
 from ..core import Price
 from ..myrequests import HttpRequestError
+from ..ratelimit import get_scheduler
+from ..ratelimit import Priority
 from .interface import BuyError
 from .interface import InsufficientFundsError
 from .interface import KrakenConfig
@@ -21,10 +23,10 @@ from .interface import WithdrawalError
 
 
 class KrakenexInterface:
-    def query_public(self, command: str, parameters: Dict = None) -> Dict:
+    def query_public(self, command: str, parameters: Optional[Dict] = None) -> Dict:
         raise NotImplementedError()  # pragma: no cover
 
-    def query_private(self, command: str, parameters: Dict = None) -> Dict:
+    def query_private(self, command: str, parameters: Optional[Dict] = None) -> Dict:
         raise NotImplementedError()  # pragma: no cover
 
 
@@ -32,10 +34,10 @@ class KrakenexMock:
     def __init__(self, methods: Dict[str, Callable]):
         self.methods = methods
 
-    def query_public(self, command: str, parameters: Dict = None) -> Dict:
+    def query_public(self, command: str, parameters: Optional[Dict] = None) -> Dict:
         return self.methods[command](parameters)
 
-    def query_private(self, command: str, parameters: Dict = None) -> Dict:
+    def query_private(self, command: str, parameters: Optional[Dict] = None) -> Dict:
         return self.methods[command](parameters)
 
 
@@ -65,6 +67,10 @@ class KrakenexMarketplace(Marketplace):
             self.handle = handle
         else:
             self.handle = krakenex.API(config.key, config.secret)
+        # Mocks have no URL, so their requests are not rate limited.
+        uri = getattr(self.handle, "uri", "")
+        self.public_scheduler = get_scheduler(f"{uri}/0/public")
+        self.private_scheduler = get_scheduler(f"{uri}/0/private")
         self.withdrawal_config = config.withdrawal
         self.prefer_fee_in_base_currency = config.prefer_fee_in_base_currency
         self.last_balance_time: Optional[datetime.datetime] = None
@@ -75,7 +81,7 @@ class KrakenexMarketplace(Marketplace):
 
     def get_spot_price(self, asset_pair: AssetPair, now: datetime.datetime) -> Price:
         try:
-            answer = self.handle.query_public(
+            answer = self.query_public(
                 "Ticker",
                 {"pair": f"{map_normal_to_kraken(asset_pair.coin)}{asset_pair.fiat}"},
             )
@@ -102,7 +108,7 @@ class KrakenexMarketplace(Marketplace):
             return self.last_balance_result
 
         try:
-            answer = self.handle.query_private("Balance")
+            answer = self.query_private("Balance")
         except requests.exceptions.ConnectionError as e:
             raise HttpRequestError("Connection error in Kraken Balance") from e
         except requests.exceptions.ReadTimeout as e:
@@ -132,7 +138,7 @@ class KrakenexMarketplace(Marketplace):
             "oflags": "fcib" if self.prefer_fee_in_base_currency else "fciq",
         }
         try:
-            answer = self.handle.query_private("AddOrder", arguments)
+            answer = self.query_private("AddOrder", arguments, cost=0.0)
         except requests.exceptions.ConnectionError as e:
             raise HttpRequestError("Connection error in Kraken AddOrder") from e
         except requests.exceptions.ReadTimeout as e:
@@ -144,7 +150,7 @@ class KrakenexMarketplace(Marketplace):
     def get_withdrawal_fee(self, coin: str, volume: float) -> float:
         target = self.withdrawal_config[coin].target
         try:
-            answer = self.handle.query_private(
+            answer = self.query_private(
                 "WithdrawInfo",
                 {
                     "asset": map_normal_to_kraken(coin),
@@ -177,7 +183,7 @@ class KrakenexMarketplace(Marketplace):
                 f"Trying to withdraw {volume} {coin} as fee is just {fee} {coin} and below limit."
             )
             try:
-                answer = self.handle.query_private(
+                answer = self.query_private(
                     "Withdraw",
                     {
                         "asset": map_normal_to_kraken(coin),
@@ -197,6 +203,31 @@ class KrakenexMarketplace(Marketplace):
                 f"Not withdrawing {volume} {coin} as fee is {fee} {coin} and above limit."
             )
 
+    def query_public(
+        self, command: str, parameters: Optional[Dict] = None, priority=Priority.TICKER
+    ) -> Dict:
+        self.public_scheduler.acquire(priority)
+        answer = self.handle.query_public(command, parameters)
+        if rate_limit_error in answer.get("error", []):
+            self.public_scheduler.drain()
+        return answer
+
+    def query_private(
+        self,
+        command: str,
+        parameters: Optional[Dict] = None,
+        priority=Priority.ORDER,
+        cost: float = 1.0,
+    ) -> Dict:
+        self.private_scheduler.acquire(priority, cost)
+        answer = self.handle.query_private(command, parameters)
+        if rate_limit_error in answer.get("error", []):
+            self.private_scheduler.drain()
+        return answer
+
+
+rate_limit_error = "EAPI:Rate limit exceeded"
+
 
 def raise_error(answer: dict, exception: Type[Exception]) -> None:
     errors = answer["error"]
@@ -0,0 +1,10 @@
+from .instrumented import InstrumentedDatastore
+from .instrumented import InstrumentedHistoricalSource
+from .instrumented import InstrumentedMarketplace
+from .registry import Counter
+from .registry import Gauge
+from .registry import Histogram
+from .registry import MetricsRegistry
+from .registry import observe_call
+from .registry import registry
+from .server import start_metrics_server
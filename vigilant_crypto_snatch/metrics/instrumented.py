@@ -0,0 +1,160 @@
+import datetime
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from ..core import AssetPair
+from ..core import Price
+from ..core import Trade
+from ..core import TradeAggregate
+from ..datastorage import Datastore
+from ..historical import HistoricalSource
+from ..marketplace import Marketplace
+from .registry import observe_call
+
+
+class InstrumentedHistoricalSource(HistoricalSource):
+    def __init__(self, source: HistoricalSource, name: Optional[str] = None):
+        self.source = source
+        self.name = name or type(source).__name__
+
+    def get_price(self, then: datetime.datetime, asset_pair: AssetPair) -> Price:
+        with observe_call("historical", self.name, "get_price"):
+            return self.source.get_price(then, asset_pair)
+
+    def __str__(self) -> str:
+        return f"Instrumented({self.source})"
+
+
+class InstrumentedMarketplace(Marketplace):
+    def __init__(self, market: Marketplace):
+        self.market = market
+        self.name = market.get_name()
+
+    def place_order(self, asset_pair: AssetPair, volume_coin: float) -> None:
+        with observe_call("marketplace", self.name, "place_order"):
+            self.market.place_order(asset_pair, volume_coin)
+
+    def get_spot_price(self, asset_pair: AssetPair, now: datetime.datetime) -> Price:
+        with observe_call("marketplace", self.name, "get_spot_price"):
+            return self.market.get_spot_price(asset_pair, now)
+
+    def get_name(self) -> str:
+        return self.market.get_name()
+
+    def get_balance(self) -> dict:
+        with observe_call("marketplace", self.name, "get_balance"):
+            return self.market.get_balance()
+
+    def get_withdrawal_fee(self, coin: str, volume: float) -> float:
+        with observe_call("marketplace", self.name, "get_withdrawal_fee"):
+            return self.market.get_withdrawal_fee(coin, volume)
+
+    def withdrawal(self, coin: str, volume: float) -> None:
+        with observe_call("marketplace", self.name, "withdrawal"):
+            self.market.withdrawal(coin, volume)
+
+
+class InstrumentedDatastore(Datastore):
+    def __init__(self, datastore: Datastore):
+        self.datastore = datastore
+        self.name = type(datastore).__name__
+
+    def add_price(self, price: Price) -> None:
+        with observe_call("datastore", self.name, "add_price"):
+            self.datastore.add_price(price)
+
+    def add_prices(self, prices: List[Price]) -> None:
+        with observe_call("datastore", self.name, "add_prices"):
+            self.datastore.add_prices(prices)
+
+    def add_trade(self, trade: Trade) -> None:
+        with observe_call("datastore", self.name, "add_trade"):
+            self.datastore.add_trade(trade)
+
+    def get_price_around(
+        self,
+        then: datetime.datetime,
+        asset_pair: AssetPair,
+        tolerance: datetime.timedelta,
+    ) -> Optional[Price]:
+        with observe_call("datastore", self.name, "get_price_around"):
+            return self.datastore.get_price_around(then, asset_pair, tolerance)
+
+    def was_triggered_since(
+        self, trigger_name: str, asset_pair: AssetPair, then: datetime.datetime
+    ) -> bool:
+        with observe_call("datastore", self.name, "was_triggered_since"):
+            return self.datastore.was_triggered_since(trigger_name, asset_pair, then)
+
+    def get_all_prices(self) -> List[Price]:
+        with observe_call("datastore", self.name, "get_all_prices"):
+            return self.datastore.get_all_prices()
+
+    def get_all_trades(self) -> List[Trade]:
+        with observe_call("datastore", self.name, "get_all_trades"):
+            return self.datastore.get_all_trades()
+
+    def clean_old(self, before: datetime.datetime) -> None:
+        with observe_call("datastore", self.name, "clean_old"):
+            self.datastore.clean_old(before)
+
+    def get_trade_aggregates(
+        self,
+        start: Optional[datetime.date] = None,
+        end: Optional[datetime.date] = None,
+        asset_pair: Optional[AssetPair] = None,
+    ) -> List[TradeAggregate]:
+        with observe_call("datastore", self.name, "get_trade_aggregates"):
+            return self.datastore.get_trade_aggregates(start, end, asset_pair)
+
+    def close(self) -> None:
+        self.datastore.close()
+
+    # The iterators are timed until they are exhausted, which includes the time
+    # the caller spends on each item.
+
+    def iter_prices(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        asset_pair: Optional[AssetPair] = None,
+        chunk_size: int = 1000,
+    ) -> Iterator[Price]:
+        with observe_call("datastore", self.name, "iter_prices"):
+            yield from self.datastore.iter_prices(start, end, asset_pair, chunk_size)
+
+    def iter_trades(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        asset_pair: Optional[AssetPair] = None,
+        chunk_size: int = 1000,
+    ) -> Iterator[Trade]:
+        with observe_call("datastore", self.name, "iter_trades"):
+            yield from self.datastore.iter_trades(start, end, asset_pair, chunk_size)
+
+    def iter_price_rows(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        asset_pair: Optional[AssetPair] = None,
+        chunk_size: int = 1000,
+    ) -> Iterator[Tuple]:
+        with observe_call("datastore", self.name, "iter_price_rows"):
+            yield from self.datastore.iter_price_rows(
+                start, end, asset_pair, chunk_size
+            )
+
+    def iter_trade_rows(
+        self,
+        start: Optional[datetime.datetime] = None,
+        end: Optional[datetime.datetime] = None,
+        asset_pair: Optional[AssetPair] = None,
+        chunk_size: int = 1000,
+    ) -> Iterator[Tuple]:
+        with observe_call("datastore", self.name, "iter_trade_rows"):
+            yield from self.datastore.iter_trade_rows(
+                start, end, asset_pair, chunk_size
+            )
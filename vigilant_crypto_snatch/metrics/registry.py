@@ -0,0 +1,278 @@
+import bisect
+import contextlib
+import math
+import threading
+import time
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+class Metric(object):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+
+    def _label_values(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Metric {self.name} expects labels {self.labelnames}, got {tuple(labels)}."
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines += self._render_samples()
+        return lines
+
+    def _render_samples(self) -> List[str]:
+        raise NotImplementedError()  # pragma: no cover
+
+    def _format_labels(
+        self, values: LabelValues, extra: Optional[Tuple[str, str]] = None
+    ) -> str:
+        pairs = list(zip(self.labelnames, values))
+        if extra is not None:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        inner = ",".join(
+            f'{name}="{escape_label_value(value)}"' for name, value in pairs
+        )
+        return "{" + inner + "}"
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def get(self, **labels: str) -> float:
+        return self.values.get(self._label_values(labels), 0.0)
+
+    def _render_samples(self) -> List[str]:
+        with self.lock:
+            items = sorted(self.values.items())
+        return [
+            f"{self.name}{self._format_labels(key)} {format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def get(self, **labels: str) -> float:
+        return self.values.get(self._label_values(labels), 0.0)
+
+    def _render_samples(self) -> List[str]:
+        with self.lock:
+            items = sorted(self.values.items())
+        return [
+            f"{self.name}{self._format_labels(key)} {format_value(value)}"
+            for key, value in items
+        ]
+
+
+class HistogramValues(object):
+    def __init__(self, num_buckets: int):
+        self.bucket_counts = [0] * num_buckets
+        self.count = 0
+        self.sum = 0.0
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.values: Dict[LabelValues, HistogramValues] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            if key not in self.values:
+                self.values[key] = HistogramValues(len(self.buckets))
+            values = self.values[key]
+            if index < len(self.buckets):
+                values.bucket_counts[index] += 1
+            values.count += 1
+            values.sum += value
+
+    @contextlib.contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def get_count(self, **labels: str) -> int:
+        values = self.values.get(self._label_values(labels))
+        return 0 if values is None else values.count
+
+    def _render_samples(self) -> List[str]:
+        lines = []
+        with self.lock:
+            items = sorted(self.values.items())
+            for key, values in items:
+                cumulative = 0
+                for upper, count in zip(self.buckets, values.bucket_counts):
+                    cumulative += count
+                    labels = self._format_labels(key, ("le", format_value(upper)))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = self._format_labels(key, ("le", "+Inf"))
+                lines.append(f"{self.name}_bucket{labels} {values.count}")
+                lines.append(
+                    f"{self.name}_sum{self._format_labels(key)} {format_value(values.sum)}"
+                )
+                lines.append(
+                    f"{self.name}_count{self._format_labels(key)} {values.count}"
+                )
+        return lines
+
+
+class MetricsRegistry(object):
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+        self.lock = threading.Lock()
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        with self.lock:
+            if name not in self.metrics:
+                self.metrics[name] = Histogram(name, documentation, labelnames, buckets)
+            metric = self.metrics[name]
+        assert isinstance(metric, Histogram), f"{name} is not a histogram."
+        return metric
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames):
+        with self.lock:
+            if name not in self.metrics:
+                self.metrics[name] = cls(name, documentation, labelnames)
+            metric = self.metrics[name]
+        assert isinstance(metric, cls), f"{name} is not a {cls.kind}."
+        return metric
+
+    def render(self) -> str:
+        with self.lock:
+            metrics = [self.metrics[name] for name in sorted(self.metrics)]
+        lines = []
+        for metric in metrics:
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+
+def escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+registry = MetricsRegistry()
+
+call_count = registry.counter(
+    "vcs_calls_total",
+    "Number of calls into external components.",
+    ["component", "target", "operation"],
+)
+call_errors = registry.counter(
+    "vcs_call_errors_total",
+    "Number of calls into external components that raised, by exception class.",
+    ["component", "target", "operation", "exception"],
+)
+call_latency = registry.histogram(
+    "vcs_call_duration_seconds",
+    "Latency of calls into external components.",
+    ["component", "target", "operation"],
+)
+
+
+@contextlib.contextmanager
+def observe_call(component: str, target: str, operation: str) -> Iterator[None]:
+    labels = dict(component=component, target=target, operation=operation)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        call_errors.inc(
+            component=component,
+            target=target,
+            operation=operation,
+            exception=type(e).__name__,
+        )
+        raise
+    finally:
+        call_count.inc(component=component, target=target, operation=operation)
+        call_latency.observe(time.perf_counter() - start, **labels)
@@ -0,0 +1,44 @@
+import http.server
+import threading
+
+from .. import logger
+from .registry import MetricsRegistry
+from .registry import registry as default_registry
+
+
+class MetricsRequestHandler(http.server.BaseHTTPRequestHandler):
+    server: "MetricsServer"
+
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(f"Metrics endpoint: {format % args}")
+
+
+class MetricsServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, registry: MetricsRegistry):
+        super().__init__(address, MetricsRequestHandler)
+        self.registry = registry
+
+
+def start_metrics_server(
+    port: int, host: str = "127.0.0.1", registry: MetricsRegistry = default_registry
+) -> MetricsServer:
+    server = MetricsServer((host, port), registry)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    logger.info(
+        f"Serving metrics on http://{host}:{server.server_address[1]}/metrics …"
+    )
+    return server
@@ -0,0 +1,40 @@
+import datetime
+
+from ..core import AssetPair
+from ..datastorage import ListDatastore
+from ..historical import MockHistorical
+from ..marketplace import MockMarketplace
+from .instrumented import InstrumentedDatastore
+from .instrumented import InstrumentedHistoricalSource
+from .instrumented import InstrumentedMarketplace
+from .registry import call_count
+
+
+def test_instrumented_components() -> None:
+    now = datetime.datetime.now()
+    asset_pair = AssetPair("BTC", "EUR")
+    source = InstrumentedHistoricalSource(MockHistorical())
+    market = InstrumentedMarketplace(MockMarketplace())
+    datastore = InstrumentedDatastore(ListDatastore())
+
+    before = call_count.get(
+        component="historical", target="MockHistorical", operation="get_price"
+    )
+    price = source.get_price(now, asset_pair)
+    datastore.add_price(price)
+    assert market.get_spot_price(asset_pair, now).last == 100
+    assert market.get_name() == "Mock"
+    assert datastore.get_all_prices() == [price]
+
+    assert (
+        call_count.get(
+            component="historical", target="MockHistorical", operation="get_price"
+        )
+        == before + 1
+    )
+    assert (
+        call_count.get(
+            component="datastore", target="ListDatastore", operation="add_price"
+        )
+        >= 1
+    )
@@ -0,0 +1,47 @@
+import pytest
+
+from .registry import MetricsRegistry
+from .registry import observe_call
+from .registry import registry
+
+
+def test_counter_render() -> None:
+    metrics = MetricsRegistry()
+    counter = metrics.counter("test_total", "Test counter.", ["name"])
+    counter.inc(name="a")
+    counter.inc(2, name="b")
+    text = metrics.render()
+    assert "# TYPE test_total counter" in text
+    assert 'test_total{name="a"} 1.0' in text
+    assert 'test_total{name="b"} 2.0' in text
+
+
+def test_histogram_buckets() -> None:
+    metrics = MetricsRegistry()
+    histogram = metrics.histogram("test_seconds", "Test.", buckets=[0.1, 1.0])
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5.0)
+    text = metrics.render()
+    assert 'test_seconds_bucket{le="0.1"} 1' in text
+    assert 'test_seconds_bucket{le="1.0"} 2' in text
+    assert 'test_seconds_bucket{le="+Inf"} 3' in text
+    assert "test_seconds_count 3" in text
+
+
+def test_wrong_labels() -> None:
+    metrics = MetricsRegistry()
+    counter = metrics.counter("test_total", "Test counter.", ["name"])
+    with pytest.raises(ValueError):
+        counter.inc(other="a")
+
+
+def test_observe_call_error() -> None:
+    errors = registry.counter(
+        "vcs_call_errors_total", "", ["component", "target", "operation", "exception"]
+    )
+    labels = dict(component="test", target="test", operation="fail")
+    with pytest.raises(KeyError):
+        with observe_call(**labels):
+            raise KeyError()
+    assert errors.get(exception="KeyError", **labels) == 1.0
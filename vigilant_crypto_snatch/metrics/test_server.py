@@ -0,0 +1,18 @@
+import requests
+
+from .registry import MetricsRegistry
+from .server import start_metrics_server
+
+
+def test_metrics_endpoint() -> None:
+    metrics = MetricsRegistry()
+    metrics.counter("test_total", "Test counter.").inc()
+    server = start_metrics_server(0, registry=metrics)
+    try:
+        port = server.server_address[1]
+        r = requests.get(f"http://127.0.0.1:{port}/metrics")
+        assert r.status_code == 200
+        assert "test_total 1.0" in r.text
+        assert requests.get(f"http://127.0.0.1:{port}/other").status_code == 404
+    finally:
+        server.shutdown()
@@ -1,7 +1,9 @@
 from .factory import add_notify_run_logger
 from .factory import add_telegram_logger
-from .message_queue import message_queue_holder
 from .message_queue import MessageQueue
 from .notify_run import NotifyRunConfig
+from .router import notification_router
+from .router import NotificationRouter
+from .spool import MessageSpool
 from .telegram import TelegramConfig
 from .telegram import TelegramSender
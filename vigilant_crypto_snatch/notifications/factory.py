@@ -1,28 +1,37 @@
 from typing import Optional
 
 from .. import logger
-from .logger import RemoteLogger
-from .message_queue import message_queue_holder
-from .message_queue import MessageQueue
+from ..paths import spool_dir
 from .notify_run import NotifyRunConfig
 from .notify_run import NotifyRunSender
+from .router import notification_router
+from .spool import MessageSpool
+from .spool import SpoolLockedError
 from .telegram import TelegramConfig
 from .telegram import TelegramSender
 
 
+def open_spool(name: str) -> Optional[MessageSpool]:
+    try:
+        return MessageSpool(spool_dir / f"{name}.jsonl")
+    except SpoolLockedError as e:
+        logger.warning(f"{e} Notifications of this process are sent without it.")
+        return None
+
+
 def add_telegram_logger(config: Optional[TelegramConfig]) -> None:
     if config:
-        telegram_sender = TelegramSender(config)
-        message_queue = MessageQueue(telegram_sender)
-        telegram_handler = RemoteLogger(config.level, message_queue)
-        message_queue_holder.set(message_queue)
-        logger.addHandler(telegram_handler)
+        notification_router.add_sender(
+            TelegramSender(config),
+            config.level,
+            open_spool("telegram"),
+        )
 
 
 def add_notify_run_logger(config: Optional[NotifyRunConfig]) -> None:
     if config:
-        notify_run_sender = NotifyRunSender(config)
-        message_queue = MessageQueue(notify_run_sender)
-        telegram_handler = RemoteLogger(config.level, message_queue)
-        message_queue_holder.set(message_queue)
-        logger.addHandler(telegram_handler)
+        notification_router.add_sender(
+            NotifyRunSender(config),
+            config.level,
+            open_spool("notify_run"),
+        )
@@ -1,7 +1,14 @@
+from typing import Optional
+
+
 class RemoteLoggerException(Exception):
     pass
 
 
 class Sender:
+    # Published rate limit of the service, `None` if it does not need one.
+    messages_per_second: Optional[float] = None
+    burst: float = 1.0
+
     def send_message(self, message: str) -> None:
         raise NotImplementedError()  # pragma: no cover
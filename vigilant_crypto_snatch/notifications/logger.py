@@ -1,18 +1,20 @@
 import logging
+import typing
 
-from .message_queue import MessageQueue
+if typing.TYPE_CHECKING:
+    from .router import NotificationRouter
 
 prefixes = {"CRITICAL": "🔴", "ERROR": "🟠", "WARNING": "🟡", "INFO": "🟢", "DEBUG": "🔵"}
 
 
 class RemoteLogger(logging.Handler):
-    def __init__(self, level: str, sender: MessageQueue):
-        super().__init__(level.upper())
-        self.sender = sender
+    def __init__(self, router: "NotificationRouter"):
+        super().__init__()
+        self.router = router
 
     def format(self, record: logging.LogRecord) -> str:
         emoji = prefixes[record.levelname]
         return f"{emoji} {record.getMessage()}"
 
     def emit(self, record: logging.LogRecord) -> None:
-        self.sender.queue_message(self.format(record))
+        self.router.route(record.levelno, self.format(record))
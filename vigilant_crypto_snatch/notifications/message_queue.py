@@ -1,66 +1,199 @@
+import collections
 import threading
+import time
+from typing import Deque
 from typing import List
 from typing import Optional
+from typing import Set
+from typing import Tuple
 
 from .. import logger
+from ..metrics.registry import observe_call
+from ..metrics.registry import registry
 from ..myrequests import HttpRequestError
+from ..ratelimit import TokenBucket
 from .interface import RemoteLoggerException
 from .interface import Sender
+from .message_utils import coalesce_messages
+from .spool import MessageSpool
+
+queue_depth = registry.gauge(
+    "vcs_notification_queue_depth",
+    "Number of notifications waiting to be sent.",
+    ["sender"],
+)
+dropped_messages = registry.counter(
+    "vcs_notifications_dropped_total",
+    "Notifications dropped because the queue was full.",
+    ["sender"],
+)
 
 
 class MessageQueue(object):
-    def __init__(self, sender: Sender):
+    def __init__(
+        self,
+        sender: Sender,
+        spool: Optional[MessageSpool] = None,
+        max_depth: int = 1000,
+        char_limit: int = 4000,
+        min_backoff: float = 1.0,
+        max_backoff: float = 300.0,
+        rate_limiter: Optional[TokenBucket] = None,
+    ):
         self.sender = sender
+        self.sender_name = type(sender).__name__
+        self.max_depth = max_depth
+        self.char_limit = char_limit
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.rate_limiter = rate_limiter
         self.running = True
-        self.queue: List[str] = []
+        self.queue: Deque[Tuple[int, str]] = collections.deque()
+        self.pending: Set[str] = set()
+        self.next_id = 0
+        # Highest id of the batch that is being sent, these are not dropped.
+        self.in_flight_id = -1
+        self.dropped = 0
+        self.dropped_unreported = 0
+        self.failures = 0
+        self.deadline: Optional[float] = None
         self.cv = threading.Condition()
+        self.spool = spool
+        if self.spool is not None:
+            for message_id, message in self.spool.replay():
+                self._enqueue(message_id, message)
+            self.next_id = self.spool.next_id
         self.thread = threading.Thread(target=self._watch_queue)
         self.thread.start()
 
     def queue_message(self, message: str) -> None:
         with self.cv:
-            if message not in self.queue:
-                self.queue.append(message)
+            if message in self.pending:
+                return
+            if self.spool is None:
+                message_id = self.next_id
+                self.next_id += 1
+            else:
+                message_id = self.spool.append(message)
+            self._enqueue(message_id, message)
             self.cv.notify()
 
+    def _enqueue(self, message_id: int, message: str) -> None:
+        if len(self.queue) >= self.max_depth:
+            self._drop_oldest()
+        self.queue.append((message_id, message))
+        self.pending.add(message)
+        queue_depth.set(len(self.queue), sender=self.sender_name)
+
+    def _drop_oldest(self) -> None:
+        # Messages of the batch which is being sent are skipped, they will be
+        # delivered anyway.
+        for index, (message_id, message) in enumerate(self.queue):
+            if message_id > self.in_flight_id:
+                break
+        else:
+            return
+        del self.queue[index]
+        self.pending.discard(message)
+        self.dropped += 1
+        self.dropped_unreported += 1
+        dropped_messages.inc(sender=self.sender_name)
+        # The spool only stores the highest delivered id. Behind messages in
+        # flight the dropped one stays in the spool until a later one is sent.
+        if self.spool is not None and index == 0:
+            self.spool.acknowledge(message_id)
+
     def _has_messages(self) -> bool:
         return len(self.queue) > 0
 
-    def shutdown(self) -> None:
-        logger.debug("Telegram Sender has received shutdown.")
-        self.running = False
+    def shutdown(self, timeout: float = 10.0) -> None:
+        self.stop(timeout)
+        self.join(timeout)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        logger.debug(f"{self.sender_name} has received shutdown.")
         with self.cv:
+            self.running = False
+            self.deadline = time.monotonic() + timeout
             self.cv.notify()
 
+    def join(self, timeout: float = 10.0) -> None:
+        self.thread.join(timeout)
+        if self.spool is not None:
+            self.spool.close()
+
     def _watch_queue(self) -> None:
-        while self.running:
+        while True:
             with self.cv:
-                while not self._has_messages():
+                while self.running and not self._has_messages():
                     self.cv.wait()
-                    if not self.running:
-                        break
-
-                while self._has_messages():
-                    try:
-                        message = self.queue[0]
-                        self.sender.send_message(message)
-                        del self.queue[0]
-                    except RemoteLoggerException:
-                        pass
-                    except HttpRequestError:
-                        pass
+                if not self._has_messages() or self._past_deadline():
+                    return
+                entries = list(self.queue)
+                dropped = self.dropped_unreported
+                self.in_flight_id = entries[-1][0]
 
+            success = self._send_entries(entries, dropped)
+            with self.cv:
+                self.in_flight_id = -1
+            if success:
+                self.failures = 0
+            else:
+                self.failures += 1
+                with self.cv:
+                    if not self.running:
+                        return
+                    self.cv.wait_for(lambda: not self.running, self._get_backoff())
 
-class MessageQueueHolder:
-    def __init__(self):
-        self._message_queue: Optional[MessageQueue] = None
+    def _past_deadline(self) -> bool:
+        return self.deadline is not None and time.monotonic() > self.deadline
 
-    def get(self) -> MessageQueue:
-        assert self._message_queue
-        return self._message_queue
+    def _send_entries(self, entries: List[Tuple[int, str]], dropped: int) -> bool:
+        messages = [message for message_id, message in entries]
+        if dropped:
+            messages.insert(
+                0,
+                f"⚠️ {dropped} notifications were dropped because too many queued up.",
+            )
+        batches = coalesce_messages(messages, self.char_limit)
+        sent = 0
+        for batch in batches:
+            if not self._wait_for_rate_limit():
+                break
+            try:
+                with observe_call("sender", self.sender_name, "send_message"):
+                    self.sender.send_message("\n".join(batch))
+            except RemoteLoggerException:
+                return False
+            except HttpRequestError:
+                return False
+            sent += len(batch)
+            if dropped:
+                sent -= 1
+                with self.cv:
+                    self.dropped_unreported -= dropped
+                dropped = 0
+            self._acknowledge(entries[sent - 1][0] if sent > 0 else -1)
+        return True
 
-    def set(self, message_queue: MessageQueue) -> None:
-        self._message_queue = message_queue
+    def _wait_for_rate_limit(self) -> bool:
+        if self.rate_limiter is None:
+            return True
+        while not self.rate_limiter.try_acquire():
+            with self.cv:
+                if self._past_deadline():
+                    return False
+                self.cv.wait(self.rate_limiter.time_until_available())
+        return True
 
+    def _acknowledge(self, last_id: int) -> None:
+        with self.cv:
+            while self.queue and self.queue[0][0] <= last_id:
+                message_id, message = self.queue.popleft()
+                self.pending.discard(message)
+            if self.spool is not None:
+                self.spool.acknowledge(last_id)
+            queue_depth.set(len(self.queue), sender=self.sender_name)
 
-message_queue_holder = MessageQueueHolder()
+    def _get_backoff(self) -> float:
+        return min(self.max_backoff, self.min_backoff * 2 ** (self.failures - 1))
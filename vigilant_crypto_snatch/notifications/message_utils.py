@@ -2,18 +2,17 @@ from typing import List
 
 
 def chunk_message(message: str, char_limit: int = 4000) -> List[str]:
-    lines = message.split("\n")
     capped_lines = []
-    for line in lines:
+    for line in message.split("\n"):
         if len(line) < char_limit:
             capped_lines.append(line)
         else:
-            lines += split_long_line(line, char_limit)
+            capped_lines += split_long_line(line, char_limit)
     chunks = []
     current_chunk: List[str] = []
     current_size = 0
     for line in capped_lines:
-        if len(line) + current_size >= char_limit:
+        if current_chunk and len(line) + current_size >= char_limit:
             chunks.append("\n".join(current_chunk))
             current_chunk = []
             current_size = 0
@@ -25,6 +24,21 @@ def chunk_message(message: str, char_limit: int = 4000) -> List[str]:
 
 
 def split_long_line(line: str, char_limit: int = 4000) -> List[str]:
-    intervals = len(line) // char_limit + 1
-    chunks = [line[(i * char_limit) : ((i + 1) * char_limit)] for i in range(intervals)]
-    return chunks
+    return [line[i : i + char_limit] for i in range(0, len(line), char_limit)]
+
+
+def coalesce_messages(messages: List[str], char_limit: int = 4000) -> List[List[str]]:
+    batches: List[List[str]] = []
+    current_batch: List[str] = []
+    current_size = 0
+    for message in messages:
+        size = len(message) + 1
+        if current_batch and current_size + size > char_limit:
+            batches.append(current_batch)
+            current_batch = []
+            current_size = 0
+        current_batch.append(message)
+        current_size += size
+    if current_batch:
+        batches.append(current_batch)
+    return batches
@@ -16,6 +16,10 @@ class NotifyRunConfig:
 
 
 class NotifyRunSender(Sender):
+    # notify.run does not publish a limit, so stay on the conservative side.
+    messages_per_second = 1.0
+    burst = 1.0
+
     def __init__(self, config: NotifyRunConfig):
         self.channel = config.channel
 
@@ -0,0 +1,59 @@
+import logging
+import time
+from typing import List
+from typing import Optional
+
+from .. import logger
+from ..ratelimit import TokenBucket
+from .interface import Sender
+from .logger import RemoteLogger
+from .message_queue import MessageQueue
+from .spool import MessageSpool
+
+
+class Route(object):
+    def __init__(self, level: int, message_queue: MessageQueue):
+        self.level = level
+        self.message_queue = message_queue
+
+
+class NotificationRouter(object):
+    def __init__(self):
+        self.routes: List[Route] = []
+        self.handler = RemoteLogger(self)
+
+    def add_sender(
+        self,
+        sender: Sender,
+        level: str,
+        spool: Optional[MessageSpool] = None,
+        char_limit: int = 4000,
+    ) -> MessageQueue:
+        rate_limiter = None
+        if sender.messages_per_second is not None:
+            rate_limiter = TokenBucket(sender.messages_per_second, sender.burst)
+        message_queue = MessageQueue(
+            sender, spool, char_limit=char_limit, rate_limiter=rate_limiter
+        )
+        self.routes.append(Route(logging.getLevelName(level.upper()), message_queue))
+        self.handler.setLevel(min(route.level for route in self.routes))
+        if self.handler not in logger.handlers:
+            logger.addHandler(self.handler)
+        return message_queue
+
+    def route(self, level: int, message: str) -> None:
+        for route in self.routes:
+            if level >= route.level:
+                route.message_queue.queue_message(message)
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        deadline = time.monotonic() + timeout
+        for route in self.routes:
+            route.message_queue.stop(timeout)
+        for route in self.routes:
+            route.message_queue.join(max(0.0, deadline - time.monotonic()))
+        logger.removeHandler(self.handler)
+        self.routes = []
+
+
+notification_router = NotificationRouter()
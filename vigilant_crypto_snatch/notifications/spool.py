@@ -0,0 +1,173 @@
+import json
+import os
+import pathlib
+import sys
+import threading
+import time
+from typing import Dict
+from typing import IO
+from typing import List
+from typing import Tuple
+
+from .. import logger
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+
+class SpoolLockedError(Exception):
+    pass
+
+
+class MessageSpool(object):
+    """
+    Append-only file of outgoing notifications for a single sender.
+
+    Each queued message is written as a JSON line with a running id. Once the
+    sender has delivered messages, a single acknowledgement record with the
+    highest delivered id is appended. Messages which have not been acknowledged
+    are replayed on the next start. The file is rewritten with just the pending
+    messages once it has accumulated too many records.
+
+    Only one process may own a spool. It is locked while open, another process
+    which opens it gets a `SpoolLockedError`.
+    """
+
+    def __init__(
+        self,
+        path: pathlib.Path,
+        fsync_batch: int = 20,
+        fsync_interval: float = 1.0,
+        compact_threshold: int = 1000,
+    ):
+        self.path = path
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.compact_threshold = compact_threshold
+        self.lock = threading.Lock()
+        self.pending: Dict[int, str] = {}
+        self.acknowledged = -1
+        self.next_id = 0
+        self.records = 0
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock_file = _lock(self.path.with_suffix(".lock"))
+        self._load()
+        self.file = open(self.path, "a", encoding="utf-8")
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    if "ack" in record:
+                        acknowledged = int(record["ack"])
+                    else:
+                        message_id = int(record["id"])
+                        message = str(record["message"])
+                except (ValueError, KeyError, TypeError):
+                    logger.debug(f"Skipping damaged line in spool {self.path}.")
+                    continue
+                self.records += 1
+                if "ack" in record:
+                    self.acknowledged = max(self.acknowledged, acknowledged)
+                else:
+                    self.pending[message_id] = message
+                    self.next_id = max(self.next_id, message_id + 1)
+        self.pending = {
+            message_id: message
+            for message_id, message in self.pending.items()
+            if message_id > self.acknowledged
+        }
+        self.next_id = max(self.next_id, self.acknowledged + 1)
+        if self.pending:
+            logger.debug(
+                f"Replaying {len(self.pending)} unsent messages from {self.path}."
+            )
+
+    def replay(self) -> List[Tuple[int, str]]:
+        with self.lock:
+            return sorted(self.pending.items())
+
+    def append(self, message: str) -> int:
+        with self.lock:
+            message_id = self.next_id
+            self.next_id += 1
+            self.pending[message_id] = message
+            self._write({"id": message_id, "message": message})
+            return message_id
+
+    def acknowledge(self, last_id: int) -> None:
+        with self.lock:
+            if last_id <= self.acknowledged:
+                return
+            self.acknowledged = last_id
+            for message_id in [i for i in self.pending if i <= last_id]:
+                del self.pending[message_id]
+            self._write({"ack": last_id})
+            if self.records > max(self.compact_threshold, 2 * len(self.pending)):
+                self._compact()
+
+    def sync(self) -> None:
+        with self.lock:
+            self._sync()
+
+    def close(self) -> None:
+        with self.lock:
+            self._sync()
+            self.file.close()
+            self.lock_file.close()
+
+    def _write(self, record: dict) -> None:
+        if self.file.closed:
+            return
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+        self.records += 1
+        self.unsynced += 1
+        if (
+            self.unsynced >= self.fsync_batch
+            or time.monotonic() - self.last_sync >= self.fsync_interval
+        ):
+            self._sync()
+
+    def _sync(self) -> None:
+        if self.unsynced > 0 and not self.file.closed:
+            os.fsync(self.file.fileno())
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+    def _compact(self) -> None:
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"ack": self.acknowledged}) + "\n")
+            for message_id, message in sorted(self.pending.items()):
+                f.write(json.dumps({"id": message_id, "message": message}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.file.close()
+        os.replace(tmp_path, self.path)
+        self.file = open(self.path, "a", encoding="utf-8")
+        self.records = len(self.pending) + 1
+        self.unsynced = 0
+
+
+def _lock(path: pathlib.Path) -> IO:
+    # The lock is advisory and released by the operating system when the
+    # process ends, so a crash does not leave a stale lock behind.
+    lock_file = open(path, "a")
+    try:
+        if sys.platform == "win32":
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError as e:
+        lock_file.close()
+        raise SpoolLockedError(f"Spool {path} is used by another process.") from e
+    return lock_file
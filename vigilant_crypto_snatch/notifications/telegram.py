@@ -23,6 +23,10 @@ class TelegramConfig:
 
 
 class TelegramSender(Sender):
+    # Telegram allows about one message per second into a single chat.
+    messages_per_second = 1.0
+    burst = 3.0
+
     def __init__(self, config: TelegramConfig):
         self.token = config.token
         if config.chat_id is None:
@@ -1,6 +1,8 @@
+import threading
 import time
 from typing import List
 
+from ..myrequests import HttpRequestError
 from .interface import Sender
 from .message_queue import MessageQueue
 
@@ -13,6 +15,35 @@ class MockSender(Sender):
         self.messages.append(message)
 
 
+class FlakySender(MockSender):
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+        self.attempts = 0
+
+    def send_message(self, message: str) -> None:
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise HttpRequestError("Flaky")
+        super().send_message(message)
+
+
+class BlockingSender(MockSender):
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def send_message(self, message: str) -> None:
+        self.release.wait()
+        super().send_message(message)
+
+
+def wait_for_messages(sender: MockSender, count: int = 1) -> None:
+    deadline = time.time() + 5
+    while len(sender.messages) < count and time.time() < deadline:
+        time.sleep(0.001)
+
+
 def test_sending() -> None:
     mock_sender = MockSender()
     message_queue = MessageQueue(mock_sender)
@@ -22,3 +53,46 @@ def test_sending() -> None:
         time.sleep(0.001)
     assert mock_sender.messages == ["Test"]
     message_queue.shutdown()
+
+
+def test_queueing_does_not_block_while_sending() -> None:
+    sender = BlockingSender()
+    message_queue = MessageQueue(sender)
+    message_queue.queue_message("First")
+    time.sleep(0.01)
+    start = time.time()
+    message_queue.queue_message("Second")
+    message_queue.queue_message("Second")
+    message_queue.queue_message("Third")
+    assert time.time() - start < 0.5
+    sender.release.set()
+    wait_for_messages(sender, 2)
+    assert sender.messages == ["First", "Second\nThird"]
+    message_queue.shutdown()
+
+
+def test_retry_with_backoff() -> None:
+    sender = FlakySender(failures=2)
+    message_queue = MessageQueue(sender, min_backoff=0.001, max_backoff=0.01)
+    message_queue.queue_message("Test")
+    wait_for_messages(sender)
+    assert sender.messages == ["Test"]
+    assert sender.attempts == 3
+    message_queue.shutdown()
+
+
+def test_max_depth() -> None:
+    sender = BlockingSender()
+    message_queue = MessageQueue(sender, max_depth=2)
+    message_queue.queue_message("First")
+    time.sleep(0.01)
+    for message in ["A", "B", "C"]:
+        message_queue.queue_message(message)
+    # The message in flight is not dropped, only the ones queued behind it.
+    assert message_queue.dropped == 2
+    sender.release.set()
+    wait_for_messages(sender, 2)
+    assert sender.messages[0] == "First"
+    assert sender.messages[1].startswith("⚠️ 2 notifications were dropped")
+    assert sender.messages[1].endswith("\nC")
+    message_queue.shutdown()
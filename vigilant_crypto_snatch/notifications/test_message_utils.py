@@ -1,4 +1,5 @@
 from .message_utils import chunk_message
+from .message_utils import coalesce_messages
 from .message_utils import split_long_line
 
 
@@ -8,7 +9,18 @@ def test_chunk_message() -> None:
     assert chunks == ["12\n45", "67\n90"]
 
 
+def test_chunk_message_long_lines() -> None:
+    message = "12\n" + "x" * 8 + "\n34"
+    chunks = chunk_message(message, 4)
+    assert chunks == ["12", "xxxx", "xxxx", "34"]
+
+
 def test_split_long_line() -> None:
     message = "123456789"
     chunks = split_long_line(message, 4)
     assert chunks == ["1234", "5678", "9"]
+
+
+def test_coalesce_messages() -> None:
+    batches = coalesce_messages(["12", "45", "67", "1234567890"], 6)
+    assert batches == [["12", "45"], ["67"], ["1234567890"]]
@@ -0,0 +1,59 @@
+import time
+
+from .. import logger
+from .router import NotificationRouter
+from .test_message_queue import BlockingSender
+from .test_message_queue import MockSender
+from .test_message_queue import wait_for_messages
+
+
+def test_level_filter() -> None:
+    router = NotificationRouter()
+    verbose = MockSender()
+    quiet = MockSender()
+    router.add_sender(verbose, "debug")
+    router.add_sender(quiet, "warning")
+    assert router.handler.level == 10
+    router.route(10, "Details")
+    logger.warning("Problem")
+    wait_for_messages(verbose, 2)
+    wait_for_messages(quiet, 1)
+    router.shutdown()
+    assert "Problem" in quiet.messages[-1]
+    assert all("Details" not in message for message in quiet.messages)
+    assert any("Details" in message for message in verbose.messages)
+    assert router.handler not in logger.handlers
+
+
+def test_slow_sender_does_not_delay_others() -> None:
+    router = NotificationRouter()
+    slow = BlockingSender()
+    fast = MockSender()
+    router.add_sender(slow, "info")
+    router.add_sender(fast, "info")
+    router.route(20, "Hello")
+    wait_for_messages(fast, 1)
+    assert fast.messages == ["Hello"]
+    assert slow.messages == []
+    slow.release.set()
+    wait_for_messages(slow, 1)
+    router.shutdown()
+    assert slow.messages == ["Hello"]
+
+
+def test_rate_limit() -> None:
+    class LimitedSender(MockSender):
+        messages_per_second = 50.0
+        burst = 1.0
+
+    router = NotificationRouter()
+    sender = LimitedSender()
+    message_queue = router.add_sender(sender, "info", char_limit=1)
+    assert message_queue.rate_limiter is not None
+    start = time.monotonic()
+    for i in range(5):
+        router.route(20, f"{i}")
+    wait_for_messages(sender, 5)
+    router.shutdown()
+    assert sender.messages == ["0", "1", "2", "3", "4"]
+    assert time.monotonic() - start >= 4 / 50 * 0.9
@@ -0,0 +1,102 @@
+import pathlib
+import tempfile
+import time
+
+import pytest
+
+from .message_queue import MessageQueue
+from .spool import MessageSpool
+from .spool import SpoolLockedError
+from .test_message_queue import BlockingSender
+from .test_message_queue import MockSender
+from .test_message_queue import wait_for_messages
+
+
+def test_replay_unacknowledged() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = pathlib.Path(tmpdir) / "spool.jsonl"
+        spool = MessageSpool(path)
+        first = spool.append("First")
+        spool.append("Second")
+        spool.acknowledge(first)
+        spool.close()
+
+        spool = MessageSpool(path)
+        assert spool.replay() == [(1, "Second")]
+        assert spool.append("Third") == 2
+        spool.close()
+
+
+def test_single_owner() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = pathlib.Path(tmpdir) / "spool.jsonl"
+        spool = MessageSpool(path)
+        with pytest.raises(SpoolLockedError):
+            MessageSpool(path)
+        spool.close()
+        MessageSpool(path).close()
+
+
+def test_skip_damaged_records() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = pathlib.Path(tmpdir) / "spool.jsonl"
+        spool = MessageSpool(path)
+        spool.append("First")
+        spool.close()
+        with open(path, "a") as f:
+            f.write('{"id": 5}\n{"message": "No ID"}\n[1, 2]\n{"ack": "x"}\n{"id"\n')
+
+        spool = MessageSpool(path)
+        assert spool.replay() == [(0, "First")]
+        assert spool.append("Second") == 1
+        spool.close()
+
+
+def test_compaction() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = pathlib.Path(tmpdir) / "spool.jsonl"
+        spool = MessageSpool(path, compact_threshold=10)
+        for i in range(20):
+            spool.acknowledge(spool.append(f"Message {i}"))
+        spool.append("Pending")
+        spool.close()
+        assert len(path.read_text().splitlines()) <= 11
+        assert MessageSpool(path).replay() == [(20, "Pending")]
+
+
+def test_queue_replays_spool() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = pathlib.Path(tmpdir) / "spool.jsonl"
+        spool = MessageSpool(path)
+        spool.append("Bought something")
+        spool.close()
+
+        sender = MockSender()
+        message_queue = MessageQueue(sender, MessageSpool(path))
+        wait_for_messages(sender)
+        message_queue.shutdown()
+        assert sender.messages == ["Bought something"]
+        assert MessageSpool(path).replay() == []
+
+
+def test_drop_keeps_message_in_flight() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = pathlib.Path(tmpdir) / "spool.jsonl"
+        sender = BlockingSender()
+        spool = MessageSpool(path)
+        message_queue = MessageQueue(sender, spool, max_depth=2)
+        message_queue.queue_message("First")
+        time.sleep(0.01)
+        for message in ["A", "B", "C"]:
+            message_queue.queue_message(message)
+        # Acknowledging the dropped messages would also acknowledge "First".
+        assert [message for _, message in spool.replay()] == [
+            "First",
+            "A",
+            "B",
+            "C",
+        ]
+        sender.release.set()
+        wait_for_messages(sender, 2)
+        message_queue.shutdown()
+        assert MessageSpool(path).replay() == []
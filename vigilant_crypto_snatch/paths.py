@@ -9,6 +9,7 @@ dirs = appdirs.AppDirs(
 config_path = pathlib.Path(dirs.user_config_dir) / "config.yml"
 user_db_path = pathlib.Path(dirs.user_data_dir) / "db.sqlite"
 chat_id_path = pathlib.Path(dirs.user_data_dir) / "telegram_chat_id.json"
+spool_dir = pathlib.Path(dirs.user_data_dir) / "spool"
 
 
 def report_app_dirs() -> None:  # pragma: no cover
@@ -0,0 +1,107 @@
+import contextlib
+import cProfile
+import datetime
+import pathlib
+import sys
+import threading
+import time
+from typing import Callable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import TextIO
+
+from . import logger
+
+
+class TimingNode(object):
+    def __init__(self, name: str):
+        self.name = name
+        self.duration = 0.0
+        self.children: List["TimingNode"] = []
+
+    def format(self, indent: int = 0) -> List[str]:
+        lines = [f"{'  ' * indent}{self.name}: {self.duration * 1000:.1f} ms"]
+        for child in self.children:
+            lines += child.format(indent + 1)
+        return lines
+
+
+_local = threading.local()
+
+
+def _get_stack() -> List[TimingNode]:
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+@contextlib.contextmanager
+def timed(name: str) -> Iterator[None]:
+    stack = _get_stack()
+    if not stack:
+        yield
+        return
+    node = TimingNode(name)
+    stack[-1].children.append(node)
+    stack.append(node)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        node.duration = time.perf_counter() - start
+        stack.pop()
+
+
+class SweepProfiler(object):
+    def __init__(
+        self,
+        snapshot_dir: Optional[pathlib.Path] = None,
+        snapshot_interval: int = 10,
+        snapshots_to_keep: int = 20,
+        output: TextIO = sys.stderr,
+    ):
+        self.snapshot_dir = snapshot_dir
+        self.snapshot_interval = snapshot_interval
+        self.snapshots_to_keep = snapshots_to_keep
+        self.output = output
+        self.sweeps = 0
+        if self.snapshot_dir is not None:
+            self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+    def profile_sweep(self, sweep: Callable[[], None]) -> TimingNode:
+        self.sweeps += 1
+        root = TimingNode(f"Sweep {self.sweeps}")
+        stack = _get_stack()
+        stack.append(root)
+        profile = self._make_profile()
+        start = time.perf_counter()
+        try:
+            if profile is None:
+                sweep()
+            else:
+                profile.runcall(sweep)
+        finally:
+            root.duration = time.perf_counter() - start
+            stack.pop()
+            if profile is not None:
+                self._save_snapshot(profile)
+            print("\n".join(root.format()), file=self.output, flush=True)
+        return root
+
+    def _make_profile(self) -> Optional[cProfile.Profile]:
+        if self.snapshot_dir is None:
+            return None
+        if (self.sweeps - 1) % self.snapshot_interval != 0:
+            return None
+        return cProfile.Profile()
+
+    def _save_snapshot(self, profile: cProfile.Profile) -> None:
+        assert self.snapshot_dir is not None
+        now = datetime.datetime.now()
+        path = self.snapshot_dir / f"sweep-{now:%Y%m%d-%H%M%S}-{self.sweeps:06d}.pstats"
+        profile.dump_stats(str(path))
+        logger.debug(f"Saved profile snapshot to {path}.")
+        snapshots = sorted(self.snapshot_dir.glob("sweep-*.pstats"))
+        for old in snapshots[: -self.snapshots_to_keep]:
+            old.unlink()
@@ -1,14 +1,20 @@
 import datetime
+import time
+from typing import List
+from typing import Tuple
 
+import numpy as np
 import pandas as pd
 from PySide6.QtCharts import QChart
-from PySide6.QtCharts import QChartView
 from PySide6.QtCharts import QDateTimeAxis
 from PySide6.QtCharts import QLineSeries
 from PySide6.QtCharts import QValueAxis
-from PySide6.QtCore import QPointF
+from PySide6.QtCore import QDateTime
 from PySide6.QtCore import Qt
 
+from ...evaluation import lttb
+from ...evaluation import select_range
+
 
 test_df = pd.DataFrame(
     {
@@ -24,32 +30,83 @@ test_df = pd.DataFrame(
 )
 
 
-def make_qt_chart_from_data_frame(df: pd.DataFrame, y_label: str) -> QChart:
-    chart = QChart()
+def datetimes_to_msecs(datetimes: pd.Series) -> np.ndarray:
+    """
+    Converts a column of datetimes to milliseconds since the epoch, which is what
+    `QDateTimeAxis` expects. Naive datetimes are taken as local time.
+    """
+    datetimes = pd.to_datetime(datetimes)
+    if datetimes.dt.tz is not None:
+        datetimes = datetimes.dt.tz_convert("UTC").dt.tz_localize(None)
+        return datetimes.to_numpy("datetime64[ms]").astype(np.int64).astype(float)
+
+    wall = datetimes.to_numpy("datetime64[ms]").astype(np.int64)
+    # The offset to UTC only changes at full hours, so it is computed once per
+    # distinct hour instead of once per row.
+    hours, inverse = np.unique(wall // 3_600_000, return_inverse=True)
+    offsets = np.array([_utc_offset_msecs(int(hour) * 3600) for hour in hours])
+    return (wall - offsets[inverse]).astype(float)
+
+
+def _utc_offset_msecs(wall_seconds: int) -> int:
+    wall_time = time.gmtime(wall_seconds)
+    epoch = time.mktime(time.struct_time((*wall_time[:8], -1)))
+    return int(wall_seconds - epoch) * 1000
+
+
+class DownsampledChart(QChart):
+    """
+    Line chart which keeps the full data and only shows `max_points` per series.
+
+    The series are downsampled with LTTB. When the visible range of the time axis
+    changes, for instance by zooming, the visible part is sampled again, such
+    that zooming in reveals the details.
+    """
+
+    def __init__(self, max_points: int = 2000):
+        super().__init__()
+        self.max_points = max_points
+        self.lines: List[Tuple[QLineSeries, np.ndarray, np.ndarray]] = []
+
+    def add_line(self, x: np.ndarray, y: np.ndarray, name: str = "") -> QLineSeries:
+        order = np.argsort(x, kind="stable")
+        series = QLineSeries()
+        if name:
+            series.setName(name)
+        self.addSeries(series)
+        self.lines.append((series, x[order], np.asarray(y, dtype=float)[order]))
+        return series
+
+    def resample(self, x_min: float, x_max: float) -> None:
+        for series, x, y in self.lines:
+            x_visible, y_visible = lttb(
+                *select_range(x, y, x_min, x_max), self.max_points
+            )
+            # The stubs declare sequences, but the method is made for arrays.
+            series.replaceNp(x_visible, y_visible)  # type: ignore
+
+    def range_changed(self, x_min: QDateTime, x_max: QDateTime) -> None:
+        self.resample(x_min.toMSecsSinceEpoch(), x_max.toMSecsSinceEpoch())
+
+
+def make_qt_chart_from_data_frame(
+    df: pd.DataFrame, y_label: str, max_points: int = 2000
+) -> QChart:
+    chart = DownsampledChart(max_points)
 
     axis_x = QDateTimeAxis()
     axis_y = QValueAxis()
+    chart.addAxis(axis_x, Qt.AlignBottom)
+    chart.addAxis(axis_y, Qt.AlignLeft)
 
+    x = datetimes_to_msecs(df["datetime"])
+    y = df["value"].to_numpy(dtype=float)
     if "label" in df.columns:
-        for index, group in df.groupby("label"):
-            points = [
-                QPointF(row["datetime"].timestamp(), row["value"])
-                for i, row in group.iterrows()
-            ]
-            series = QLineSeries()
-            series.setName(index)
-            series.append(points)
-            chart.addSeries(series)
-            series.attachAxis(axis_x)
-            series.attachAxis(axis_y)
+        for label, indices in df.groupby("label").indices.items():
+            chart.add_line(x[indices], y[indices], label)
     else:
-        points = [
-            QPointF(row["datetime"].timestamp(), row["value"])
-            for i, row in df.iterrows()
-        ]
-        series = QLineSeries()
-        series.append(points)
-        chart.addSeries(series)
+        chart.add_line(x, y)
+    for series, _, _ in chart.lines:
         series.attachAxis(axis_x)
         series.attachAxis(axis_y)
 
@@ -60,12 +117,13 @@ def make_qt_chart_from_data_frame(df: pd.DataFrame, y_label: str) -> QChart:
     axis_y.setTickCount(10)
     axis_y.setTitleText(y_label)
 
-    axis_x.setMin(min(df["datetime"]))
-    axis_x.setMax(max(df["datetime"]))
-    axis_y.setMin(min(df["value"]))
-    axis_y.setMax(max(df["value"]))
-
-    chart.addAxis(axis_x, Qt.AlignBottom)
-    chart.addAxis(axis_y, Qt.AlignLeft)
+    if len(df) > 0:
+        axis_x.setRange(
+            QDateTime.fromMSecsSinceEpoch(int(np.nanmin(x))),
+            QDateTime.fromMSecsSinceEpoch(int(np.nanmax(x))),
+        )
+        axis_y.setRange(np.nanmin(y), np.nanmax(y))
+        chart.resample(np.nanmin(x), np.nanmax(x))
+    axis_x.rangeChanged.connect(chart.range_changed)
 
     return chart
@@ -445,8 +445,7 @@ class SingleTriggerEditController:
 
     def get_spec(self) -> None:
         self.spec.name = self.ui.name.text()
-        self.spec.asset_pair.coin = self.ui.coin.text()
-        self.spec.asset_pair.fiat = self.ui.fiat.text()
+        self.spec.asset_pair = AssetPair(self.ui.coin.text(), self.ui.fiat.text())
         try:
             self.spec.cooldown_minutes = int(self.ui.cooldown_minutes.text())
         except ValueError as e:
@@ -62,6 +62,7 @@ class MainWindowController:
 
     def shutdown(self) -> None:
         self.status_tab_controller.shutdown()
+        self.simulation_tab_controller.shutdown()
 
     def menu_about(self):
         self.about_window.show()
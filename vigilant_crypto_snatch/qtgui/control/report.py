@@ -1,8 +1,16 @@
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import numpy as np
 import pandas as pd
 from PySide6.QtCore import QAbstractTableModel
+from PySide6.QtCore import QModelIndex
 from PySide6.QtCore import Qt
 
+from ...reporting import get_user_trade_aggregates_df
 from ...reporting import get_user_trades_df
+from ...reporting import open_user_datastore
 from ...reporting.trades import aggregates_per_asset_pair
 from ...reporting.trades import aggregates_per_asset_pair_and_trigger
 from ..ui.report import ReportTab
@@ -15,6 +23,7 @@ class ReportTabController:
 
         self.all_trades_table_model = PandasTableModel()
         self.ui.all_trades.setModel(self.all_trades_table_model)
+        self.ui.all_trades.setSortingEnabled(True)
 
         self.pairs_table_model = PandasTableModel()
         self.ui.pairs_table.setModel(self.pairs_table_model)
@@ -23,44 +32,174 @@ class ReportTabController:
         self.ui.pairs_triggers_table.setModel(self.pairs_triggers_table_model)
 
     def update_report(self):
-        trades = get_user_trades_df()
-        trades_copy = trades.copy()
-        trades_copy["timestamp"] = trades_copy["timestamp"].dt
-        self.all_trades_table_model.set_data_frame(trades)
-
-        per_asset_pair = aggregates_per_asset_pair(trades)
+        datastore = open_user_datastore()
+        if datastore is None:
+            return
+        try:
+            trades = get_user_trades_df(datastore)
+            aggregates = get_user_trade_aggregates_df(datastore)
+        finally:
+            datastore.close()
+        # Trades are only added, so the existing rows stay and only the gains
+        # columns change with the current price.
+        self.all_trades_table_model.update_data_frame(trades)
+
+        per_asset_pair = aggregates_per_asset_pair(aggregates)
         self.pairs_table_model.set_data_frame(per_asset_pair)
 
-        per_asset_pair_and_trigger = aggregates_per_asset_pair_and_trigger(trades)
+        per_asset_pair_and_trigger = aggregates_per_asset_pair_and_trigger(aggregates)
         self.pairs_triggers_table_model.set_data_frame(per_asset_pair_and_trigger)
 
 
 class PandasTableModel(QAbstractTableModel):
+    """
+    Table model for data frames with many rows.
+
+    The columns are kept as arrays and the displayed strings are formatted per
+    chunk of rows the first time a cell of that chunk is shown. Sorting only
+    computes a permutation of the rows, and `update_data_frame` appends new rows
+    without resetting the view.
+    """
+
+    chunk_size = 1024
+
     def __init__(self):
         super().__init__()
-        self.df: pd.DataFrame = pd.DataFrame()
+        self.column_names: List[str] = []
+        self.columns: List[np.ndarray] = []
+        self.row_names: np.ndarray = np.array([])
+        self.order: np.ndarray = np.arange(0)
+        self.formatted: List[Dict[int, List[str]]] = []
+        self.sort_column: Optional[int] = None
+        self.sort_order = Qt.SortOrder.AscendingOrder
 
     def set_data_frame(self, df: pd.DataFrame):
         self.beginResetModel()
-        self.df = df.astype("object")
+        self.column_names = [str(column) for column in df.columns]
+        self.columns = [df[column].to_numpy() for column in df.columns]
+        self.row_names = df.index.to_numpy()
+        self.formatted = [{} for _ in self.columns]
+        self.order = self._make_order()
         self.endResetModel()
 
+    def update_data_frame(self, df: pd.DataFrame):
+        """
+        Replaces the data with a frame that has the same columns and at least as
+        many rows, like the trades after new ones have arrived. Only the changed
+        columns are formatted again and the new rows are inserted.
+        """
+        old_length = len(self.row_names)
+        if [str(column) for column in df.columns] != self.column_names or (
+            len(df) < old_length
+        ):
+            self.set_data_frame(df)
+            return
+
+        changed_columns = []
+        for column, name in enumerate(df.columns):
+            values = df[name].to_numpy()
+            if not pd.Series(values[:old_length]).equals(
+                pd.Series(self.columns[column])
+            ):
+                changed_columns.append(column)
+                self.formatted[column] = {}
+            self.columns[column] = values
+            # The last chunk was formatted while it was shorter.
+            self.formatted[column].pop(old_length // self.chunk_size, None)
+        row_names_changed = not pd.Series(df.index[:old_length]).equals(
+            pd.Series(self.row_names)
+        )
+        self.row_names = df.index.to_numpy()
+
+        if len(df) > old_length:
+            self.beginInsertRows(QModelIndex(), old_length, len(df) - 1)
+            self.order = np.concatenate([self.order, np.arange(old_length, len(df))])
+            self.endInsertRows()
+            if self.sort_column is not None:
+                self.sort(self.sort_column, self.sort_order)
+        if old_length > 0:
+            for column in changed_columns:
+                self.dataChanged.emit(
+                    self.index(0, column), self.index(old_length - 1, column)
+                )
+            if row_names_changed:
+                self.headerDataChanged.emit(Qt.Orientation.Vertical, 0, old_length - 1)
+
+    def sort(self, column: int, order=Qt.SortOrder.AscendingOrder):
+        if not 0 <= column < len(self.columns):
+            return
+        self.sort_column = column
+        self.sort_order = order
+        self.layoutAboutToBeChanged.emit()
+        old_order = self.order
+        self.order = self._make_order()
+        # Keep selections on the same rows of the data.
+        positions = np.empty_like(self.order)
+        positions[self.order] = np.arange(len(self.order))
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(
+            persistent,
+            [
+                self.index(int(positions[old_order[index.row()]]), index.column())
+                for index in persistent
+            ],
+        )
+        self.layoutChanged.emit()
+
+    def _make_order(self) -> np.ndarray:
+        length = len(self.row_names)
+        if self.sort_column is None or self.sort_column >= len(self.columns):
+            return np.arange(length)
+        values = pd.Series(self.columns[self.sort_column])
+        try:
+            sorted_values = values.sort_values(
+                ascending=self.sort_order == Qt.SortOrder.AscendingOrder,
+                kind="mergesort",
+            )
+        except TypeError:
+            sorted_values = values.astype(str).sort_values(
+                ascending=self.sort_order == Qt.SortOrder.AscendingOrder,
+                kind="mergesort",
+            )
+        return sorted_values.index.to_numpy()
+
+    def _get_text(self, row: int, column: int) -> str:
+        chunk = row // self.chunk_size
+        texts = self.formatted[column].get(chunk)
+        if texts is None:
+            begin = chunk * self.chunk_size
+            texts = format_values(self.columns[column][begin : begin + self.chunk_size])
+            self.formatted[column][chunk] = texts
+        return texts[row - chunk * self.chunk_size]
+
     def rowCount(self, parent=None, *args, **kwargs):
-        return len(self.df)
+        return len(self.order)
 
     def columnCount(self, parent=None, *args, **kwargs):
-        return len(self.df.columns)
+        return len(self.columns)
 
     def headerData(self, index, orientation, role=None):
         # section is the index of the column/row.
         if role == Qt.ItemDataRole.DisplayRole:
             if orientation == Qt.Orientation.Horizontal:
-                return self.df.columns[index]
+                return self.column_names[index]
 
             if orientation == Qt.Orientation.Vertical:
-                return self.df.index[index]
+                return str(self.row_names[self.order[index]])
 
     def data(self, index, role=None):
         if role == Qt.ItemDataRole.DisplayRole:
-            entry = self.df.iloc[index.row(), index.column()]
-            return entry
+            return self._get_text(int(self.order[index.row()]), index.column())
+
+
+def format_values(values: np.ndarray) -> List[str]:
+    if len(values) == 0:
+        return []
+    series = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        texts = series.dt.strftime("%Y-%m-%d %H:%M:%S")
+    elif pd.api.types.is_float_dtype(series):
+        texts = series.map("{:.8g}".format)
+    else:
+        texts = series.astype(str)
+    return texts.where(series.notna(), "").tolist()
@@ -1,8 +1,18 @@
+import dataclasses
 import datetime
+import itertools
+import threading
+from typing import Dict
 from typing import Optional
 
 import pandas as pd
+from PySide6.QtCore import QObject
+from PySide6.QtCore import QRunnable
+from PySide6.QtCore import Qt
+from PySide6.QtCore import QThreadPool
+from PySide6.QtCore import Signal
 
+from ... import logger
 from ...configuration import Configuration
 from ...core import AssetPair
 from ...evaluation import accumulate_value
@@ -18,6 +28,120 @@ from .configuration import SingleTriggerEditController
 from .report import PandasTableModel
 
 
+class SimulationCancelled(Exception):
+    pass
+
+
+@dataclasses.dataclass()
+class SimulationResult:
+    spec: TriggerSpec
+    data: pd.DataFrame
+    fear_greed: pd.DataFrame
+    trades: pd.DataFrame
+    value: pd.DataFrame
+    summary: pd.DataFrame
+
+
+class SimulationWorkerSignals(QObject):
+    # Simulation number, overall progress and progress of the current step in percent.
+    progress = Signal(int, int, int)
+    finished = Signal(int, object)
+    failed = Signal(int, str)
+    cancelled = Signal(int)
+
+
+class SimulationWorker(QRunnable):
+    """
+    Downloads the data and simulates a single trigger on a thread of a `QThreadPool`.
+
+    All results are delivered through the signals, the charts and table models
+    are only touched on the GUI thread.
+    """
+
+    stages = ["Price data", "Fear & Greed", "Simulation", "Accumulation"]
+
+    def __init__(self, number: int, spec: TriggerSpec, api_key: str):
+        super().__init__()
+        self.number = number
+        self.spec = spec
+        self.api_key = api_key
+        self.signals = SimulationWorkerSignals()
+        self._cancelled = threading.Event()
+        self._stage = 0
+        self._last_percent = -1
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def run(self) -> None:
+        try:
+            result = self.simulate()
+        except SimulationCancelled:
+            self.signals.cancelled.emit(self.number)
+        except Exception as e:
+            logger.error(f"Simulation {self.number} failed: {repr(e)}")
+            self.signals.failed.emit(self.number, repr(e))
+        else:
+            self.signals.finished.emit(self.number, result)
+
+    def simulate(self) -> SimulationResult:
+        self._begin_stage(0)
+        data = get_hourly_data(self.spec.asset_pair, self.api_key)
+        data = make_dataframe_from_json(data)
+
+        self._begin_stage(1)
+        fear_greed = load_fear_greed_for(data, self._report_progress)
+
+        self._begin_stage(2)
+        trades, trigger_names = simulate_triggers(
+            data, self.spec.asset_pair, [self.spec], self._report_progress
+        )
+
+        self._begin_stage(3)
+        value = accumulate_value(data, trades, trigger_names, self._report_progress)
+        summary = summarize_simulation(
+            data, trades, value, trigger_names, self.spec.asset_pair
+        )
+        self._check_cancelled()
+        return SimulationResult(self.spec, data, fear_greed, trades, value, summary)
+
+    def _begin_stage(self, stage: int) -> None:
+        self._stage = stage
+        self._last_percent = -1
+        self._report_progress(0.0)
+
+    def _report_progress(self, fraction: float) -> None:
+        # Called for every row by the simulation loops, so this is also the
+        # point where cancellation takes effect. Signals are only emitted when
+        # the percentage changes to keep the event queue of the GUI short.
+        self._check_cancelled()
+        percent = int(fraction * 100)
+        if percent != self._last_percent:
+            self._last_percent = percent
+            total = int((self._stage + fraction) / len(self.stages) * 100)
+            self.signals.progress.emit(self.number, total, percent)
+
+    def _check_cancelled(self) -> None:
+        if self.is_cancelled():
+            raise SimulationCancelled()
+
+
+def load_fear_greed_for(data: pd.DataFrame, progress_callback) -> pd.DataFrame:
+    fear_greed_access = AlternateMeFearAndGreedIndex()
+    date_range = pd.date_range(
+        min(data["datetime"]).date(), max(data["datetime"]).date()
+    )
+    today = datetime.date.today()
+    values = []
+    for i, date in enumerate(date_range):
+        values.append(fear_greed_access.get_value(date.date(), today))
+        progress_callback((i + 1) / len(date_range))
+    return pd.DataFrame({"datetime": date_range, "value": values})
+
+
 class SimulationTabController:
     def __init__(self, ui: SimulationTab):
         self.ui = ui
@@ -31,6 +155,7 @@ class SimulationTabController:
             self.ui.trigger_pane, self.spec
         )
         self.ui.simulate.clicked.connect(self.simulate)
+        self.ui.cancel.clicked.connect(self.cancel)
         self.config: Optional[Configuration] = None
         self.trade_table_model = PandasTableModel()
         self.ui.trade_table.setModel(self.trade_table_model)
@@ -38,74 +163,97 @@ class SimulationTabController:
         self.ui.summary_table.setModel(self.summary_table_model)
         self.simulations = pd.DataFrame()
 
+        self.thread_pool = QThreadPool()
+        self.workers: Dict[int, SimulationWorker] = {}
+        self.simulation_numbers = itertools.count(1)
+        self.update_running_status()
+
     def set_config(self, config: Configuration):
         self.config = config
 
     def simulate(self):
-        self.ui.progress_bar_1.setValue(0)
+        if self.config is None:
+            logger.warning("Simulations need a configuration with an API key.")
+            return
         self.trigger_edit_controller.get_spec()
-        asset_pair = self.spec.asset_pair
-        data = get_hourly_data(asset_pair, self.config.crypto_compare.api_key)
-        data = make_dataframe_from_json(data)
-        data["label"] = "Close price"
-
-        close_chart = make_qt_chart_from_data_frame(
-            data.rename(columns={"close": "value"}), self.spec.asset_pair.fiat
+        # The worker gets its own copy, the editor may change the spec while the
+        # simulation is running.
+        spec = dataclasses.replace(self.spec)
+        worker = SimulationWorker(
+            next(self.simulation_numbers), spec, self.config.crypto_compare.api_key
         )
-        self.ui.close_chart.setChart(close_chart)
+        # The signals are emitted on a pool thread. Queued connections run the
+        # slots on the GUI thread.
+        queued = Qt.ConnectionType.QueuedConnection
+        worker.signals.progress.connect(self.simulation_progress, queued)
+        worker.signals.finished.connect(self.simulation_finished, queued)
+        worker.signals.failed.connect(self.simulation_failed, queued)
+        worker.signals.cancelled.connect(self.simulation_cancelled, queued)
+        self.workers[worker.number] = worker
+        self.ui.progress_bar_1.setValue(0)
+        self.ui.progress_bar_2.setValue(0)
+        self.update_running_status()
+        self.thread_pool.start(worker)
 
-        fear_greed_access = AlternateMeFearAndGreedIndex()
-        date_range = pd.date_range(
-            min(data["datetime"]).date(), max(data["datetime"]).date()
-        )
-        today = datetime.date.today()
-        fear_greed_df = pd.DataFrame(
-            {
-                "datetime": date_range,
-                "value": [
-                    fear_greed_access.get_value(date.date(), today)
-                    for date in date_range
-                ],
-            }
-        )
-        fear_greed_df["label"] = "Fear & Greed"
+    def cancel(self) -> None:
+        for worker in self.workers.values():
+            worker.cancel()
 
-        feargreed_chart = make_qt_chart_from_data_frame(fear_greed_df, "Index")
-        self.ui.fear_and_greed_chart.setChart(feargreed_chart)
+    def shutdown(self) -> None:
+        self.cancel()
+        self.thread_pool.waitForDone()
 
-        trades, trigger_names = simulate_triggers(
-            data,
-            self.spec.asset_pair,
-            [self.spec],
-            lambda fraction: self.ui.progress_bar_2.setValue(int(fraction * 100)),
-        )
-        self.ui.progress_bar_1.setValue(50)
-        self.trade_table_model.set_data_frame(trades)
-
-        value = accumulate_value(
-            data,
-            trades,
-            trigger_names,
-            lambda fraction: self.ui.progress_bar_2.setValue(int(fraction * 100)),
-        )
-        self.ui.progress_bar_1.setValue(100)
+    def simulation_progress(self, number: int, total: int, step: int) -> None:
+        # With several simulations running the bars follow the latest one.
+        if self.workers and number == max(self.workers):
+            self.ui.progress_bar_1.setValue(total)
+            self.ui.progress_bar_2.setValue(step)
 
-        summary = summarize_simulation(
-            data,
-            trades,
-            value,
-            trigger_names,
-            self.spec.asset_pair,
+    def simulation_finished(self, number: int, result: SimulationResult) -> None:
+        self.remove_worker(number)
+        self.show_result(result)
+
+    def simulation_failed(self, number: int, message: str) -> None:
+        self.remove_worker(number)
+
+    def simulation_cancelled(self, number: int) -> None:
+        self.remove_worker(number)
+        logger.info(f"Simulation {number} was cancelled.")
+
+    def remove_worker(self, number: int) -> None:
+        self.workers.pop(number, None)
+        self.update_running_status()
+
+    def update_running_status(self) -> None:
+        self.ui.cancel.setEnabled(bool(self.workers))
+        if self.workers:
+            self.ui.running.setText(f"Running simulations: {len(self.workers)}")
+        else:
+            self.ui.running.setText("No simulation running.")
+
+    def show_result(self, result: SimulationResult) -> None:
+        fiat = result.spec.asset_pair.fiat
+
+        data = result.data.rename(columns={"close": "value"})
+        data["label"] = "Close price"
+        self.ui.close_chart.setChart(make_qt_chart_from_data_frame(data, fiat))
+
+        fear_greed = result.fear_greed.copy()
+        fear_greed["label"] = "Fear & Greed"
+        self.ui.fear_and_greed_chart.setChart(
+            make_qt_chart_from_data_frame(fear_greed, "Index")
         )
+
+        self.trade_table_model.set_data_frame(result.trades)
+
         value_long = (
-            value.rename({"cumsum_fiat": "Invested", "value_fiat": "Value"}, axis=1)
+            result.value.rename(
+                {"cumsum_fiat": "Invested", "value_fiat": "Value"}, axis=1
+            )
             .melt(["datetime", "trigger_name"], ["Invested", "Value"])
             .rename(columns={"variable": "label"})
         )
-        gain_chart = make_qt_chart_from_data_frame(
-            value_long, self.spec.asset_pair.fiat
-        )
-        self.ui.gain_chart.setChart(gain_chart)
+        self.ui.gain_chart.setChart(make_qt_chart_from_data_frame(value_long, fiat))
 
-        self.simulations = pd.concat([self.simulations, summary])
+        self.simulations = pd.concat([self.simulations, result.summary])
         self.summary_table_model.set_data_frame(self.simulations)
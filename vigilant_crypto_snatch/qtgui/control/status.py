@@ -1,14 +1,20 @@
+import concurrent.futures
+import dataclasses
 import datetime
 import threading
 import time
 from typing import Any
+from typing import Dict
 from typing import List
 from typing import Optional
 
 from PySide6.QtCore import QAbstractTableModel
+from PySide6.QtCore import QObject
 from PySide6.QtCore import Qt
+from PySide6.QtCore import Signal
 from PySide6.QtGui import QColor
 
+from vigilant_crypto_snatch import logger
 from vigilant_crypto_snatch.configuration import Configuration
 from vigilant_crypto_snatch.datastorage import make_datastore
 from vigilant_crypto_snatch.historical import CachingHistoricalSource
@@ -19,10 +25,35 @@ from vigilant_crypto_snatch.marketplace import make_marketplace
 from vigilant_crypto_snatch.paths import user_db_path
 from vigilant_crypto_snatch.qtgui.ui.status import StatusTab
 from vigilant_crypto_snatch.triggers import BuyTrigger
+from vigilant_crypto_snatch.triggers import DelegateEvaluation
 from vigilant_crypto_snatch.triggers import make_triggers
 from vigilant_crypto_snatch.watchloop import process_trigger
 
 
+@dataclasses.dataclass()
+class TableContent:
+    cells: List[List[Any]]
+    colors: Optional[List[List[str]]] = None
+    tooltips: Optional[List[List[str]]] = None
+    columns_names: Optional[List[str]] = None
+    row_names: Optional[List[str]] = None
+
+
+@dataclasses.dataclass()
+class StatusSnapshot:
+    balances: TableContent
+    prices: TableContent
+    triggers: TableContent
+
+
+class StatusSignals(QObject):
+    refreshed = Signal(object)
+
+
+class StatusShutdown(Exception):
+    pass
+
+
 class StatusTabController:
     def __init__(self, ui: StatusTab):
         self.ui = ui
@@ -30,6 +61,20 @@ class StatusTabController:
         self.last_check: Optional[datetime.datetime] = None
 
         self.wire_ui()
+
+        # Balances, prices and trigger conditions are fetched concurrently on
+        # these threads. The results are sent to the GUI thread as one snapshot.
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=8, thread_name_prefix="status"
+        )
+        # Guards the executor, a refresh may still run when the tab shuts down.
+        self.shutdown_lock = threading.Lock()
+        self.shutting_down = False
+        self.signals = StatusSignals()
+        self.signals.refreshed.connect(
+            self.apply_snapshot, Qt.ConnectionType.QueuedConnection
+        )
+
         self.watch_worker = WatchWorker(self)
         self.watch_worker_thread = threading.Thread(target=self.watch_worker.run)
         self.watch_worker_thread.start()
@@ -47,8 +92,14 @@ class StatusTabController:
         self.ui.active_triggers.setModel(self.trigger_table_model)
         self.ui.active_triggers.verticalHeader().setVisible(True)
 
+        # Widgets must only be read on the GUI thread, the worker uses this copy.
+        self.watch_triggers = self.ui.watch_triggers.isChecked()
+        self.ui.watch_triggers.toggled.connect(self.watch_triggers_toggled)
+
+    def watch_triggers_toggled(self, checked: bool) -> None:
+        self.watch_triggers = checked
+
     def config_updated(self, config: Configuration):
-        self.config = config
         self.market = make_marketplace(
             config.marketplace, config.bitstamp, config.kraken, config.ccxt
         )
@@ -57,7 +108,9 @@ class StatusTabController:
         database_source = DatabaseHistoricalSource(
             datastore, datetime.timedelta(minutes=5)
         )
-        crypto_compare_source = CryptoCompareHistoricalSource(config.crypto_compare)
+        crypto_compare_source = CryptoCompareHistoricalSource(
+            config.crypto_compare, datastore=datastore
+        )
         market_source = MarketSource(self.market)
         caching_source = CachingHistoricalSource(
             database_source, [market_source, crypto_compare_source], datastore
@@ -69,76 +122,177 @@ class StatusTabController:
         # self.ui.active_triggers.verticalHeader().setFixedWidth(100)
 
         self.active_asset_pairs = {spec.asset_pair for spec in config.triggers}
+        # Set last, the worker thread only starts refreshing once this is set.
+        self.config = config
 
-    def _update_balance_worker(self):
-        if self.ui.watch_triggers.isChecked():
-            for trigger in self.active_triggers:
-                process_trigger(trigger)
-
-        self.balances_model.set_cells(
-            [
-                [coin, balance]
-                for coin, balance in sorted(self.market.get_balance().items())
-            ]
-        )
+    def gather_status(self, now: datetime.datetime) -> StatusSnapshot:
+        market = self.market
+        active_triggers = self.active_triggers
+        buy_triggers = [
+            trigger for trigger in active_triggers if isinstance(trigger, BuyTrigger)
+        ]
 
-        prices = {
-            asset_pair: self.market.get_spot_price(asset_pair, datetime.datetime.now())
+        balance_future = self.submit(market.get_balance)
+        price_futures = {
+            asset_pair: self.submit(market.get_spot_price, asset_pair, now)
             for asset_pair in self.active_asset_pairs
         }
-        self.spot_price_model.set_cells(
-            [
-                [asset_pair.coin, price.last, asset_pair.fiat]
-                for asset_pair, price in sorted(prices.items())
-            ]
+        # The evaluations are remembered by the delegates, so processing the
+        # triggers below reuses them instead of fetching everything again.
+        evaluation_futures = [
+            self.submit(trigger.get_evaluations, now) for trigger in buy_triggers
+        ]
+        evaluations: Dict[str, Optional[Dict[str, Optional[DelegateEvaluation]]]] = {}
+        for trigger, future in zip(buy_triggers, evaluation_futures):
+            try:
+                evaluations[trigger.get_name()] = future.result()
+            except Exception as e:
+                logger.warning(
+                    f"Could not evaluate trigger “{trigger.get_name()}”: {repr(e)}"
+                )
+                evaluations[trigger.get_name()] = None
+
+        if self.watch_triggers:
+            self.process_triggers(active_triggers, evaluations, now)
+
+        return StatusSnapshot(
+            balances=self.make_balance_table(balance_future),
+            prices=self.make_price_table(price_futures),
+            triggers=self.make_trigger_table(buy_triggers, now),
         )
 
-        buy_triggers = [
-            trigger
-            for trigger in self.active_triggers
-            if isinstance(trigger, BuyTrigger)
-        ]
+    def process_triggers(
+        self,
+        active_triggers: list,
+        evaluations: Dict[str, Optional[Dict[str, Optional[DelegateEvaluation]]]],
+        now: datetime.datetime,
+    ) -> None:
+        # Buying is done one trigger after the other as in the watch loop. After
+        # a trigger has bought, the remembered funds of the others are outdated.
+        after_buy = False
+        for trigger in active_triggers:
+            if isinstance(trigger, BuyTrigger) and after_buy:
+                trigger.forget_evaluations()
+            process_trigger(trigger, now)
+            trigger_evaluations = evaluations.get(trigger.get_name())
+            if trigger_evaluations is not None and all(
+                evaluation is None or evaluation.triggered
+                for evaluation in trigger_evaluations.values()
+            ):
+                after_buy = True
+
+    def make_balance_table(
+        self, balance_future: concurrent.futures.Future
+    ) -> TableContent:
+        try:
+            balances = balance_future.result()
+        except Exception as e:
+            logger.warning(f"Could not get balances: {repr(e)}")
+            balances = {}
+        return TableContent(
+            cells=[[coin, balance] for coin, balance in sorted(balances.items())]
+        )
+
+    def make_price_table(self, price_futures: dict) -> TableContent:
+        cells = []
+        for asset_pair, future in sorted(price_futures.items()):
+            try:
+                cells.append([asset_pair.coin, future.result().last, asset_pair.fiat])
+            except Exception as e:
+                logger.warning(f"Could not get price for {asset_pair}: {repr(e)}")
+                cells.append([asset_pair.coin, "—", asset_pair.fiat])
+        return TableContent(cells=cells)
+
+    def make_trigger_table(
+        self, buy_triggers: List[BuyTrigger], now: datetime.datetime
+    ) -> TableContent:
+        if not buy_triggers:
+            return TableContent(cells=[], colors=[], tooltips=[])
         predicate_names = list(sorted(buy_triggers[0].triggered_delegates.keys()))
         trigger_cells = []
         trigger_colors = []
+        trigger_tooltips = []
         trigger_names = []
 
         for trigger in buy_triggers:
             cells = []
             colors = []
-            for predicate_name in predicate_names:
-                predicate = trigger.triggered_delegates[predicate_name]
-                if predicate is None:
+            tooltips = []
+            try:
+                # Uses the results from above, unless a buy has invalidated them.
+                evaluations = trigger.get_evaluations(now)
+            except Exception as e:
+                cells = ["Error"] * len(predicate_names)
+                colors = ["#afafaf"] * len(predicate_names)
+                tooltips = [repr(e)] * len(predicate_names)
+                evaluations = {}
+            for predicate_name in predicate_names if evaluations else []:
+                evaluation = evaluations[predicate_name]
+                if evaluation is None:
                     cells.append("—")
                     colors.append("#afafaf")
+                    tooltips.append("")
                 else:
-                    if predicate.is_triggered(datetime.datetime.now()):
+                    if evaluation.triggered:
                         cells.append("Ready")
                         colors.append("#4daf4a")
+                        tooltips.append(
+                            ", ".join(
+                                f"{key}: {value}"
+                                for key, value in evaluation.values.items()
+                            )
+                        )
                     else:
                         cells.append("Waiting")
                         colors.append("#e41a1c")
+                        tooltips.append(evaluation.reason or "")
             trigger_cells.append(cells)
             trigger_colors.append(colors)
+            trigger_tooltips.append(tooltips)
             trigger_names.append(trigger.get_name())
 
-        self.trigger_table_model.columns_names = predicate_names
-        self.trigger_table_model.row_names = trigger_names
-        self.trigger_table_model.set_cells(trigger_cells, trigger_colors)
+        return TableContent(
+            cells=trigger_cells,
+            colors=trigger_colors,
+            tooltips=trigger_tooltips,
+            columns_names=predicate_names,
+            row_names=trigger_names,
+        )
+
+    def submit(self, fn, *args) -> concurrent.futures.Future:
+        with self.shutdown_lock:
+            if self.shutting_down:
+                raise StatusShutdown()
+            return self.executor.submit(fn, *args)
+
+    def apply_snapshot(self, snapshot: StatusSnapshot) -> None:
+        # Snapshots which were under way during the shutdown arrive afterwards.
+        if self.shutting_down:
+            return
+        self.balances_model.update(snapshot.balances)
+        self.spot_price_model.update(snapshot.prices)
+        self.trigger_table_model.update(snapshot.triggers)
 
     def shutdown(self):
         if self.watch_worker is not None:
             self.watch_worker.running = False
+        with self.shutdown_lock:
+            self.shutting_down = True
+            self.executor.shutdown(wait=False)
 
     def ui_changed(self):
-        if self.config is not None:
+        if self.config is not None and not self.shutting_down:
             if (
                 self.last_check is None
                 or self.last_check
                 < datetime.datetime.now() - datetime.timedelta(seconds=30)
             ):
                 self.last_check = datetime.datetime.now()
-                self._update_balance_worker()
+                try:
+                    snapshot = self.gather_status(self.last_check)
+                except StatusShutdown:
+                    return
+                self.signals.refreshed.emit(snapshot)
 
 
 class WatchWorker:
@@ -164,14 +318,64 @@ class DumbTableModel(QAbstractTableModel):
         self.row_names: List[str] = []
         self.cells: List[List[Any]] = []
         self.colors: List[List[str]] = []
+        self.tooltips: List[List[str]] = []
 
-    def set_cells(self, cells: List[List[Any]], colors: List[List[str]] = None):
+    def set_cells(
+        self,
+        cells: List[List[Any]],
+        colors: Optional[List[List[str]]] = None,
+        tooltips: Optional[List[List[str]]] = None,
+    ):
         self.beginResetModel()
         self.cells = cells
         if colors is not None:
             self.colors = colors
+        if tooltips is not None:
+            self.tooltips = tooltips
         self.endResetModel()
 
+    def update(self, content: TableContent) -> None:
+        """
+        Shows new content, signalling only the cells which have changed.
+
+        The model is only reset when the shape or the headers change. Otherwise
+        the views keep their selection and scroll position and do not flicker.
+        """
+        columns_names = (
+            self.columns_names
+            if content.columns_names is None
+            else content.columns_names
+        )
+        row_names = self.row_names if content.row_names is None else content.row_names
+        colors = self.colors if content.colors is None else content.colors
+        tooltips = self.tooltips if content.tooltips is None else content.tooltips
+        if (
+            columns_names != self.columns_names
+            or row_names != self.row_names
+            or len(content.cells) != len(self.cells)
+        ):
+            self.columns_names = columns_names
+            self.row_names = row_names
+            self.set_cells(content.cells, colors, tooltips)
+            return
+
+        old_cells, old_colors, old_tooltips = self.cells, self.colors, self.tooltips
+        self.cells = content.cells
+        self.colors = colors
+        self.tooltips = tooltips
+        for row in range(len(self.cells)):
+            old_row = _row_states(old_cells, old_colors, old_tooltips, row)
+            new_row = _row_states(self.cells, self.colors, self.tooltips, row)
+            changed = [
+                column
+                for column in range(max(len(old_row), len(new_row)))
+                if old_row[column : column + 1] != new_row[column : column + 1]
+            ]
+            if changed:
+                self.dataChanged.emit(
+                    self.index(row, changed[0]), self.index(row, changed[-1])
+                )
+
     def rowCount(self, parent=None, *args, **kwargs):
         return len(self.cells)
 
@@ -199,3 +403,19 @@ class DumbTableModel(QAbstractTableModel):
 
         if role == Qt.ItemDataRole.DecorationRole and self.colors:
             return QColor(self.colors[index.row()][index.column()])
+
+        if role == Qt.ItemDataRole.ToolTipRole and self.tooltips:
+            return self.tooltips[index.row()][index.column()]
+
+
+def _row_states(
+    cells: List[List[Any]], colors: List[List[str]], tooltips: List[List[str]], row: int
+) -> List[tuple]:
+    return [
+        (
+            cell,
+            colors[row][column] if colors else None,
+            tooltips[row][column] if tooltips else None,
+        )
+        for column, cell in enumerate(cells[row])
+    ]
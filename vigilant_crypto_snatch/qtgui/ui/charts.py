@@ -22,7 +22,7 @@ class TestChartView(QChartView):
 def main():
     app = QApplication(sys.argv)
     window = TestChartView()
-    chart = make_qt_chart_from_data_frame(test_df)
+    chart = make_qt_chart_from_data_frame(test_df, "Value")
     window.setChart(chart)
     window.show()
     retval = app.exec()
@@ -2,6 +2,7 @@ from PySide6.QtCharts import QChartView
 from PySide6.QtCore import Qt
 from PySide6.QtWidgets import QGridLayout
 from PySide6.QtWidgets import QHBoxLayout
+from PySide6.QtWidgets import QLabel
 from PySide6.QtWidgets import QProgressBar
 from PySide6.QtWidgets import QPushButton
 from PySide6.QtWidgets import QSplitter
@@ -36,6 +37,12 @@ class SimulationTab(QWidget):
         self.simulate = QPushButton("Simulate Trigger")
         left_layout.addWidget(self.simulate)
 
+        self.cancel = QPushButton("Cancel Simulations")
+        left_layout.addWidget(self.cancel)
+
+        self.running = QLabel()
+        left_layout.addWidget(self.running)
+
         self.progress_bar_1 = QProgressBar()
         left_layout.addWidget(self.progress_bar_1)
         self.progress_bar_2 = QProgressBar()
@@ -50,15 +57,20 @@ class SimulationTab(QWidget):
         splitter.addWidget(result_widget)
 
         self.close_chart = QChartView()
+        self.close_chart.setRubberBand(QChartView.RubberBand.HorizontalRubberBand)
         result_toolbox.addWidget(self.close_chart, 0, 0)
 
         self.fear_and_greed_chart = QChartView()
+        self.fear_and_greed_chart.setRubberBand(
+            QChartView.RubberBand.HorizontalRubberBand
+        )
         result_toolbox.addWidget(self.fear_and_greed_chart, 0, 1)
 
         self.trade_table = QTableView()
         result_toolbox.addWidget(self.trade_table, 1, 0)
 
         self.gain_chart = QChartView()
+        self.gain_chart.setRubberBand(QChartView.RubberBand.HorizontalRubberBand)
         result_toolbox.addWidget(self.gain_chart, 1, 1)
 
         splitter.setSizes([200, 1000])
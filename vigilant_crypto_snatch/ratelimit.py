@@ -0,0 +1,233 @@
+import bisect
+import dataclasses
+import enum
+import itertools
+import threading
+import time
+import urllib.parse
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from .myrequests import HttpRequestError
+
+
+class TokenBucket(object):
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = capacity
+        self.last_refill = clock()
+        self.lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        elapsed = max(0.0, now - self.last_refill)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.last_refill = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        with self.lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+    def time_until_available(self, tokens: float = 1.0) -> float:
+        with self.lock:
+            self._refill()
+            missing = tokens - self.tokens
+            return max(0.0, missing / self.rate)
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        while not self.try_acquire(tokens):
+            self.sleep(self.time_until_available(tokens))
+
+    def get_remaining(self) -> float:
+        with self.lock:
+            self._refill()
+            return self.tokens
+
+    def drain(self) -> None:
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, 0.0)
+
+
+class RateLimitError(HttpRequestError):
+    pass
+
+
+class Priority(enum.IntEnum):
+    ORDER = 0
+    TICKER = 1
+    HISTORY = 2
+
+
+@dataclasses.dataclass()
+class Limit:
+    name: str
+    rate: float
+    capacity: float
+
+
+# Longest time a request waits for its turn before it is given up. Orders
+# always wait, a price which arrives late is of no use to a trigger.
+default_max_wait: Dict[Priority, Optional[float]] = {
+    Priority.ORDER: None,
+    Priority.TICKER: 10.0,
+    Priority.HISTORY: 30.0,
+}
+
+
+class RequestScheduler(object):
+    """
+    Lets requests to one API pass only as fast as all of its limits allow.
+
+    Waiting requests are served by priority and in the order of arrival within
+    the same priority.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limits: Sequence[Limit],
+        max_wait: Optional[Dict[Priority, Optional[float]]] = None,
+    ):
+        self.name = name
+        self.buckets = {
+            limit.name: TokenBucket(limit.rate, limit.capacity) for limit in limits
+        }
+        self.max_wait = dict(default_max_wait)
+        self.max_wait.update(max_wait or {})
+        self.waiting: List[Tuple[int, int]] = []
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+
+        # The metrics package imports the historical sources, which use this
+        # module. Importing it here avoids the cycle.
+        from .metrics.registry import registry
+
+        self.remaining_budget = registry.gauge(
+            "vcs_rate_limit_remaining",
+            "Requests that can be made right away within a rate limit of an API.",
+            ["api", "limit"],
+        )
+        self.waiting_requests = registry.gauge(
+            "vcs_rate_limit_waiting",
+            "Requests waiting for the rate limits of an API.",
+            ["api"],
+        )
+        self.rejected_requests = registry.counter(
+            "vcs_rate_limit_rejected_total",
+            "Requests given up because they would have waited too long.",
+            ["api", "priority"],
+        )
+        self._update_gauges()
+
+    def acquire(self, priority: Priority = Priority.TICKER, cost: float = 1.0) -> None:
+        """
+        Blocks until the request may be made. Raises `RateLimitError` if that
+        would take longer than the maximum wait for the priority.
+        """
+        max_wait = self.max_wait[priority]
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        ticket = (int(priority), next(self.sequence))
+        with self.condition:
+            bisect.insort(self.waiting, ticket)
+            try:
+                while True:
+                    self._update_gauges()
+                    delay = None
+                    if self.waiting[0] == ticket:
+                        delay = self.time_until_available(cost)
+                        if delay == 0.0:
+                            for bucket in self.buckets.values():
+                                bucket.try_acquire(cost)
+                            return
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0.0 or (
+                            delay is not None and delay > remaining
+                        ):
+                            self.rejected_requests.inc(
+                                api=self.name, priority=priority.name
+                            )
+                            raise RateLimitError(
+                                f"Rate limit of {self.name} would delay the request by more than {max_wait} s."
+                            )
+                        delay = remaining if delay is None else delay
+                    self.condition.wait(delay)
+            finally:
+                self.waiting.remove(ticket)
+                self.condition.notify_all()
+                self._update_gauges()
+
+    def time_until_available(self, cost: float = 1.0) -> float:
+        return max(
+            (
+                bucket.time_until_available(min(cost, bucket.capacity))
+                for bucket in self.buckets.values()
+            ),
+            default=0.0,
+        )
+
+    def drain(self) -> None:
+        """
+        Empties all buckets, after the API has told us that we are too fast.
+        """
+        for bucket in self.buckets.values():
+            bucket.drain()
+        self._update_gauges()
+
+    def _update_gauges(self) -> None:
+        self.waiting_requests.set(len(self.waiting), api=self.name)
+        for limit_name, bucket in self.buckets.items():
+            self.remaining_budget.set(
+                bucket.get_remaining(), api=self.name, limit=limit_name
+            )
+
+
+# Published limits of the APIs. The Kraken private counter decays by 0.33 per
+# second with a maximum of 15, placing orders does not count against it. The
+# monthly Crypto Compare quota of the free plan starts full on every start.
+api_limits: Dict[str, List[Limit]] = {
+    "api.kraken.com/0/public": [Limit("second", 1.0, 1.0)],
+    "api.kraken.com/0/private": [Limit("counter", 0.33, 15.0)],
+    "min-api.cryptocompare.com": [
+        Limit("second", 20.0, 20.0),
+        Limit("minute", 300.0 / 60, 300.0),
+        Limit("hour", 3000.0 / 3600, 3000.0),
+        Limit("month", 100000.0 / (30 * 86400), 100000.0),
+    ],
+    "api.alternative.me": [Limit("minute", 1.0, 60.0)],
+}
+
+_schedulers: Dict[str, RequestScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(url: str) -> RequestScheduler:
+    """
+    Returns the scheduler shared by all requests to the API at this URL. APIs
+    without known limits get a scheduler without limits.
+    """
+    parts = urllib.parse.urlsplit(url)
+    address = (parts.netloc + parts.path).rstrip("/")
+    name = next((api for api in api_limits if address.startswith(api)), address)
+    with _schedulers_lock:
+        if name not in _schedulers:
+            _schedulers[name] = RequestScheduler(name, api_limits.get(name, []))
+        return _schedulers[name]
@@ -1,2 +1,4 @@
+from .trades import get_user_trade_aggregates_df
 from .trades import get_user_trades_df
+from .trades import open_user_datastore
 from .trades_plots import *
@@ -1,9 +1,16 @@
 import datetime
 
+import pandas as pd
+
 from ..core import AssetPair
 from ..core import Trade
 from ..datastorage import ListDatastore
+from ..historical import MockHistorical
+from ..historical.mock import mock_price
 from .trades import add_gains
+from .trades import aggregates_per_asset_pair
+from .trades import aggregates_per_asset_pair_and_trigger
+from .trades import gather_trade_aggregates
 from .trades import gather_trades
 
 
@@ -18,4 +25,52 @@ def test_add_gains() -> None:
             asset_pair=AssetPair("BTC", "EUR"),
         )
     )
+    datastore.add_trade(
+        Trade(
+            timestamp=datetime.datetime(2022, 2, 3, 12, 0),
+            trigger_name="test-trigger",
+            volume_coin=2.0,
+            volume_fiat=10.0,
+            asset_pair=AssetPair("ETH", "EUR"),
+        )
+    )
     trades = gather_trades(datastore)
+    source = MockHistorical()
+    now = datetime.datetime(2022, 3, 1)
+    add_gains(trades, source, now)
+    assert source.calls == 2
+    assert list(trades["current_value"]) == [
+        10.0 * mock_price(now),
+        2.0 * mock_price(now),
+    ]
+    assert list(trades["day"]) == [
+        pd.Timestamp(2022, 1, 15),
+        pd.Timestamp(2022, 2, 3),
+    ]
+    assert list(trades["month"]) == [pd.Timestamp(2022, 1, 1), pd.Timestamp(2022, 2, 1)]
+    assert list(trades["year"]) == [2022, 2022]
+    assert list(trades["buy_price"]) == [1.0, 5.0]
+
+
+def test_gather_trades_empty() -> None:
+    trades = gather_trades(ListDatastore())
+    assert len(trades) == 0
+    assert "coin" in trades.columns
+
+
+def test_aggregates_per_asset_pair() -> None:
+    datastore = ListDatastore()
+    btc = AssetPair("BTC", "EUR")
+    for day in range(1, 4):
+        datastore.add_trade(Trade(datetime.datetime(2022, 1, day), "A", 1.0, 10.0, btc))
+    datastore.add_trade(Trade(datetime.datetime(2022, 1, 1), "B", 1.0, 30.0, btc))
+    aggregates = gather_trade_aggregates(datastore)
+    assert len(aggregates) == 4
+
+    per_asset_pair = aggregates_per_asset_pair(aggregates)
+    assert list(per_asset_pair["Trades"]) == [4]
+    assert list(per_asset_pair["Total Fiat"]) == [60.0]
+    assert list(per_asset_pair["Average Price"]) == [15.0]
+
+    per_trigger = aggregates_per_asset_pair_and_trigger(aggregates)
+    assert list(per_trigger["Trades"]) == [3, 1]
@@ -1,3 +1,4 @@
+import concurrent.futures
 import datetime
 from typing import Optional
 
@@ -7,45 +8,101 @@ from vigilant_crypto_snatch.configuration import YamlConfigurationFactory
 from vigilant_crypto_snatch.core import AssetPair
 from vigilant_crypto_snatch.datastorage import Datastore
 from vigilant_crypto_snatch.datastorage import make_datastore
+from vigilant_crypto_snatch.datastorage import trade_columns
+from vigilant_crypto_snatch.datastorage.sqlalchemy_store import SqlAlchemyDatastore
 from vigilant_crypto_snatch.historical import CryptoCompareHistoricalSource
+from vigilant_crypto_snatch.historical import HistoricalSource
 from vigilant_crypto_snatch.paths import user_db_path
 
-
-def gather_trades(datastore: Datastore) -> pd.DataFrame:
-    trades = datastore.get_all_trades()
-    df = pd.DataFrame(trades)
-    return df.drop(columns="asset_pair").assign(**df["asset_pair"].apply(pd.Series))
+trade_aggregate_columns = [
+    "coin",
+    "fiat",
+    "trigger_name",
+    "day",
+    "count",
+    "volume_coin",
+    "volume_fiat",
+]
+
+
+def gather_trades(
+    datastore: Datastore,
+    start: Optional[datetime.datetime] = None,
+    end: Optional[datetime.datetime] = None,
+    asset_pair: Optional[AssetPair] = None,
+) -> pd.DataFrame:
+    if isinstance(datastore, SqlAlchemyDatastore):
+        query = datastore.make_trade_query(start, end, asset_pair)
+        try:
+            return pd.read_sql(
+                query.statement, datastore.session.bind, parse_dates=["timestamp"]
+            )
+        except TypeError:
+            # pandas 2.2 and later do not accept the engines of SQLAlchemy 1.4.
+            pass
+    return pd.DataFrame.from_records(
+        datastore.iter_trade_rows(start, end, asset_pair), columns=trade_columns
+    )
 
 
-def add_gains(trades: pd.DataFrame):
-    config = YamlConfigurationFactory().make_config()
-    historical_source = CryptoCompareHistoricalSource(config.crypto_compare)
-    unique_currency_pairs = set(
-        AssetPair(coin, fiat) for coin, fiat in zip(trades["coin"], trades["fiat"])
+def get_current_prices(
+    trades: pd.DataFrame,
+    historical_source: HistoricalSource,
+    now: datetime.datetime,
+    max_workers: int = 8,
+) -> pd.DataFrame:
+    asset_pairs = [
+        AssetPair(coin, fiat)
+        for coin, fiat in trades[["coin", "fiat"]]
+        .drop_duplicates()
+        .itertuples(index=False)
+    ]
+    if not asset_pairs:
+        return pd.DataFrame(columns=["coin", "fiat", "current_price"])
+    # The asset pairs are independent, so they are requested concurrently.
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(max_workers, len(asset_pairs))
+    ) as executor:
+        prices = list(
+            executor.map(
+                lambda asset_pair: historical_source.get_price(now, asset_pair),
+                asset_pairs,
+            )
+        )
+    return pd.DataFrame(
+        {
+            "coin": [asset_pair.coin for asset_pair in asset_pairs],
+            "fiat": [asset_pair.fiat for asset_pair in asset_pairs],
+            "current_price": [price.last for price in prices],
+        }
     )
 
-    now = datetime.datetime.now()
-    current_prices = {
-        (asset_pair.coin, asset_pair.fiat): historical_source.get_price(
-            now, asset_pair
-        ).last
-        for asset_pair in unique_currency_pairs
-    }
 
+def add_gains(
+    trades: pd.DataFrame,
+    historical_source: Optional[HistoricalSource] = None,
+    now: Optional[datetime.datetime] = None,
+) -> None:
+    if historical_source is None:
+        config = YamlConfigurationFactory().make_config()
+        historical_source = CryptoCompareHistoricalSource(config.crypto_compare)
+    if now is None:
+        now = datetime.datetime.now()
+
+    current_prices = get_current_prices(trades, historical_source, now)
+    current_price = (
+        trades[["coin", "fiat"]]
+        .merge(current_prices, how="left", on=["coin", "fiat"])["current_price"]
+        .to_numpy()
+    )
+
+    timestamps = pd.to_datetime(trades["timestamp"])
     trades["buy_price"] = trades["volume_fiat"] / trades["volume_coin"]
-    trades["current_value"] = [
-        row["volume_coin"] * current_prices[(row["coin"], row["fiat"])]
-        for index, row in trades.iterrows()
-    ]
+    trades["current_value"] = trades["volume_coin"] * current_price
     trades["gains"] = trades["current_value"] - trades["volume_fiat"]
-    trades["day"] = [
-        datetime.datetime.combine(ts.date(), datetime.time.min)
-        for ts in trades["timestamp"]
-    ]
-    trades["month"] = [
-        datetime.datetime(ts.year, ts.month, 1) for ts in trades["timestamp"]
-    ]
-    trades["year"] = [ts.year for ts in trades["timestamp"]]
+    trades["day"] = timestamps.dt.floor("D")
+    trades["month"] = timestamps.dt.to_period("M").dt.to_timestamp()
+    trades["year"] = timestamps.dt.year
     trades["gains_cumsum"] = trades["gains"].cumsum()
     trades["volume_fiat_cumsum"] = trades.groupby("coin")["volume_fiat"].cumsum()
     trades["volume_coin_cumsum"] = trades.groupby("coin")["volume_coin"].cumsum()
@@ -54,22 +111,56 @@ def add_gains(trades: pd.DataFrame):
     )
 
 
-def get_user_trades_df() -> Optional[pd.DataFrame]:
+def open_user_datastore() -> Optional[Datastore]:
     if user_db_path.exists():
-        datastore = make_datastore(user_db_path)
-        trades = gather_trades(datastore)
-        add_gains(trades)
-        return trades
+        return make_datastore(user_db_path)
     else:
         return None
 
 
-def aggregates_per_asset_pair(trades: pd.DataFrame) -> pd.DataFrame:
+def get_user_trades_df(
+    datastore: Optional[Datastore] = None,
+) -> Optional[pd.DataFrame]:
+    if datastore is None:
+        datastore = open_user_datastore()
+        if datastore is None:
+            return None
+    trades = gather_trades(datastore)
+    add_gains(trades)
+    return trades
+
+
+def gather_trade_aggregates(
+    datastore: Datastore,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    asset_pair: Optional[AssetPair] = None,
+) -> pd.DataFrame:
+    return pd.DataFrame.from_records(
+        [
+            aggregate.to_dict()
+            for aggregate in datastore.get_trade_aggregates(start, end, asset_pair)
+        ],
+        columns=trade_aggregate_columns,
+    )
+
+
+def get_user_trade_aggregates_df(
+    datastore: Optional[Datastore] = None,
+) -> Optional[pd.DataFrame]:
+    if datastore is None:
+        datastore = open_user_datastore()
+        if datastore is None:
+            return None
+    return gather_trade_aggregates(datastore)
+
+
+def aggregates_per_asset_pair(aggregates: pd.DataFrame) -> pd.DataFrame:
     volume_per_asset_pair = (
-        trades[["coin", "fiat", "volume_coin", "volume_fiat"]]
+        aggregates[["coin", "fiat", "count", "volume_coin", "volume_fiat"]]
         .groupby(["coin", "fiat"])
         .agg(
-            count=("volume_fiat", "count"),
+            count=("count", "sum"),
             total_fiat=("volume_fiat", "sum"),
             total_coin=("volume_coin", "sum"),
         )
@@ -91,12 +182,14 @@ def aggregates_per_asset_pair(trades: pd.DataFrame) -> pd.DataFrame:
     return volume_per_asset_pair
 
 
-def aggregates_per_asset_pair_and_trigger(trades: pd.DataFrame) -> pd.DataFrame:
+def aggregates_per_asset_pair_and_trigger(aggregates: pd.DataFrame) -> pd.DataFrame:
     volume_per_asset_pair = (
-        trades[["coin", "fiat", "trigger_name", "volume_coin", "volume_fiat"]]
+        aggregates[
+            ["coin", "fiat", "trigger_name", "count", "volume_coin", "volume_fiat"]
+        ]
         .groupby(["coin", "fiat", "trigger_name"])
         .agg(
-            count=("volume_fiat", "count"),
+            count=("count", "sum"),
             total_fiat=("volume_fiat", "sum"),
             total_coin=("volume_coin", "sum"),
         )
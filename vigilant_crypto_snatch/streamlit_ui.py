@@ -3,7 +3,10 @@ import datetime
 import os
 import sys
 from typing import Any
+from typing import Callable
 from typing import Dict
+from typing import List
+from typing import Tuple
 
 import pandas as pd
 import streamlit as st
@@ -21,12 +24,13 @@ from vigilant_crypto_snatch.evaluation import accumulate_value
 from vigilant_crypto_snatch.evaluation import get_available_coins
 from vigilant_crypto_snatch.evaluation import get_available_fiats
 from vigilant_crypto_snatch.evaluation import get_currency_pairs
+from vigilant_crypto_snatch.evaluation import get_fear_greed_data
 from vigilant_crypto_snatch.evaluation import get_hourly_data
 from vigilant_crypto_snatch.evaluation import make_close_chart
 from vigilant_crypto_snatch.evaluation import make_dataframe_from_json
-from vigilant_crypto_snatch.evaluation import make_fear_greed_chart
 from vigilant_crypto_snatch.evaluation import make_gain_chart
 from vigilant_crypto_snatch.evaluation import make_survey_chart
+from vigilant_crypto_snatch.evaluation import plot_fear_greed
 from vigilant_crypto_snatch.evaluation import simulate_triggers
 from vigilant_crypto_snatch.evaluation import summarize_simulation
 from vigilant_crypto_snatch.reporting import get_user_trades_df
@@ -37,12 +41,92 @@ from vigilant_crypto_snatch.reporting import plot_value_and_investment
 from vigilant_crypto_snatch.triggers import TriggerSpec
 
 
+# Streamlit reruns the whole script on every interaction, so everything that
+# needs the network or takes long is cached. `st.cache_data` replaced
+# `st.experimental_memo` in Streamlit 1.18. Arguments with a leading underscore
+# are not hashed, the other arguments form the cache key.
+if hasattr(st, "cache_data"):
+    cache_data = st.cache_data
+else:
+    cache_data = st.experimental_memo  # type: ignore
+
+
+@cache_data(ttl=datetime.timedelta(days=1), show_spinner=False)
+def load_currency_pairs(api_key: str) -> List[Dict[str, str]]:
+    return get_currency_pairs(api_key)
+
+
+@cache_data(ttl=datetime.timedelta(hours=1), show_spinner=False)
+def load_price_data(coin: str, fiat: str, api_key: str) -> pd.DataFrame:
+    return make_dataframe_from_json(get_hourly_data(AssetPair(coin, fiat), api_key))
+
+
+@cache_data(ttl=datetime.timedelta(hours=6), show_spinner=False)
+def load_fear_greed_data(
+    time_begin: datetime.datetime, time_end: datetime.datetime
+) -> pd.DataFrame:
+    return get_fear_greed_data(time_begin, time_end)
+
+
+@cache_data(ttl=datetime.timedelta(hours=1), max_entries=20, show_spinner=False)
+def run_simulation(
+    _data: pd.DataFrame,
+    data_key: Tuple[str, str, int, int],
+    time_begin: datetime.datetime,
+    time_end: datetime.datetime,
+    trigger_spec_primitives: List[Dict[str, Any]],
+    _simulation_progress: Callable[[float], Any],
+    _cumsum_progress: Callable[[float], Any],
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Simulates the triggers and summarizes the outcome.
+
+    `data_key` identifies the unhashed price data, the trigger specs are passed
+    as primitives such that they can be hashed.
+    """
+    asset_pair = AssetPair(data_key[0], data_key[1])
+    trigger_specs = [
+        parse_trigger_spec(primitives) for primitives in trigger_spec_primitives
+    ]
+    data_datetime = _data["datetime"]
+    selection = (time_begin <= data_datetime) & (data_datetime <= time_end)
+
+    trades, trigger_names = simulate_triggers(
+        _data.loc[selection].reset_index(),
+        asset_pair,
+        trigger_specs,
+        _simulation_progress,
+    )
+    if len(trades) == 0:
+        return trades, pd.DataFrame(), pd.DataFrame()
+
+    value = accumulate_value(_data, trades, trigger_names, _cumsum_progress)
+    summary = summarize_simulation(
+        _data.loc[selection],
+        trades,
+        value,
+        trigger_names,
+        asset_pair,
+    )
+    return trades, value, summary
+
+
 @dataclasses.dataclass()
 class SidebarSettings:
     asset_pair: AssetPair
     data: pd.DataFrame
 
 
+def get_data_key(sidebar_settings: SidebarSettings) -> Tuple[str, str, int, int]:
+    data = sidebar_settings.data
+    return (
+        sidebar_settings.asset_pair.coin,
+        sidebar_settings.asset_pair.fiat,
+        int(data["time"].iloc[0]),
+        int(data["time"].iloc[-1]),
+    )
+
+
 def sub_home(sidebar_settings: SidebarSettings):
     st.title("Home")
 
@@ -154,7 +238,7 @@ def sub_trigger_simulation(sidebar_settings: SidebarSettings):
     )
     st.altair_chart(close_chart, use_container_width=True)
 
-    feargreed_chart = make_fear_greed_chart(time_begin, time_end)
+    feargreed_chart = plot_fear_greed(load_fear_greed_data(time_begin, time_end))
     st.altair_chart(feargreed_chart, use_container_width=True)
 
     st.markdown("# Parameters")
@@ -174,35 +258,27 @@ def sub_trigger_simulation(sidebar_settings: SidebarSettings):
 
     st.markdown("# Run")
 
-    st.markdown("Simulating triggers …")
+    st.markdown("Simulating triggers and accumulating value …")
     simulation_progress_bar = st.progress(0.0)
+    cumsum_progress_bar = st.progress(0.0)
 
-    trades, trigger_names = simulate_triggers(
-        sidebar_settings.data.loc[selection].reset_index(),
-        sidebar_settings.asset_pair,
-        trigger_specs,
+    trades, value, summary = run_simulation(
+        sidebar_settings.data,
+        get_data_key(sidebar_settings),
+        time_begin,
+        time_end,
+        [trigger_spec.to_primitives() for trigger_spec in trigger_specs],
         simulation_progress_bar.progress,
+        cumsum_progress_bar.progress,
     )
+    simulation_progress_bar.progress(1.0)
+    cumsum_progress_bar.progress(1.0)
 
     if len(trades) == 0:
         st.markdown("This trigger did not execute once.")
         st.stop()
 
-    st.markdown("Accumulating value …")
-    cumsum_progress_bar = st.progress(0.0)
-    value = accumulate_value(
-        sidebar_settings.data, trades, trigger_names, cumsum_progress_bar.progress
-    )
-
     st.markdown("# Summary")
-
-    summary = summarize_simulation(
-        sidebar_settings.data.loc[selection],
-        trades,
-        value,
-        trigger_names,
-        sidebar_settings.asset_pair,
-    )
     st.dataframe(summary)
 
     gain_chart = make_gain_chart(value, sidebar_settings.asset_pair.fiat)
@@ -301,7 +377,7 @@ def ui():
     api_key = get_api_key()
     st.sidebar.title("Vigilant Crypto Snatch Evaluation")
 
-    available_pairs = get_currency_pairs(api_key)
+    available_pairs = load_currency_pairs(api_key)
     available_fiats = get_available_fiats(available_pairs)
     fiat = st.sidebar.selectbox(
         "Fiat", available_fiats, index=available_fiats.index("EUR")
@@ -313,8 +389,7 @@ def ui():
 
     asset_pair = AssetPair(coin, fiat)
 
-    data = get_hourly_data(asset_pair, api_key)
-    data = make_dataframe_from_json(data)
+    data = load_price_data(coin, fiat, api_key)
 
     sidebar_settings = SidebarSettings(asset_pair=asset_pair, data=data)
 
@@ -0,0 +1,66 @@
+import threading
+import time
+from typing import List
+
+import pytest
+
+from .caching import SingleFlight
+from .caching import TTLCache
+from .test_ratelimit import FakeClock
+
+
+def test_ttl_cache() -> None:
+    clock = FakeClock()
+    cache = TTLCache(max_size=2, clock=clock)
+    cache.put("a", 1, ttl=10)
+    cache.put("b", 2, ttl=100)
+    assert cache.get("a") == 1
+    cache.put("c", 3, ttl=100)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    clock.now += 50
+    assert cache.get("a") is None
+    assert cache.get("c") == 3
+    assert len(cache) == 1
+
+
+def test_single_flight() -> None:
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls: List[None] = []
+
+    def download() -> int:
+        calls.append(None)
+        started.set()
+        release.wait()
+        return 42
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flights.do("key", download)))
+        for i in range(5)
+    ]
+    threads[0].start()
+    started.wait()
+    for thread in threads[1:]:
+        thread.start()
+    while flights.calls["key"].followers < 4:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == [42] * 5
+    assert len(calls) == 1
+    assert flights.calls == {}
+
+
+def test_single_flight_exception() -> None:
+    flights = SingleFlight()
+
+    def fail() -> int:
+        raise RuntimeError("Failed.")
+
+    with pytest.raises(RuntimeError):
+        flights.do("key", fail)
+    assert flights.do("key", lambda: 1) == 1
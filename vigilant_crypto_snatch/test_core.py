@@ -1,4 +1,8 @@
+import dataclasses
 import datetime
+import pickle
+
+import pytest
 
 from .core import AssetPair
 from .core import Price
@@ -21,3 +25,28 @@ def test_trade() -> None:
     repr(trade)
     d = trade.to_dict()
     assert isinstance(d, dict)
+
+
+def test_asset_pair_interned() -> None:
+    a = AssetPair("BTC", "EUR")
+    b = AssetPair(coin="BTC", fiat="EUR")
+    assert a is b
+    assert a != AssetPair("ETH", "EUR")
+    assert sorted([AssetPair("ETH", "EUR"), a]) == [a, AssetPair("ETH", "EUR")]
+    assert pickle.loads(pickle.dumps(a)) is a
+
+
+def test_frozen_and_slotted() -> None:
+    price = Price(datetime.datetime(2021, 1, 1), 10.0, AssetPair("BTC", "EUR"))
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        price.last = 11.0  # type: ignore
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        AssetPair("BTC", "EUR").coin = "ETH"  # type: ignore
+    assert not hasattr(price, "__dict__")
+    copy = pickle.loads(pickle.dumps(price))
+    assert copy == price
+    assert hash(copy) == hash(price)
+
+    trade = Trade(datetime.datetime(2021, 1, 1), "Test", 1.0, 10.0, price.asset_pair)
+    assert pickle.loads(pickle.dumps(trade)) == trade
+    assert len({trade, pickle.loads(pickle.dumps(trade))}) == 1
@@ -0,0 +1,119 @@
+import datetime
+import threading
+
+import krakenex
+import pytest
+
+from .core import AssetPair
+from .datastorage import make_datastore
+from .exchange_simulator import ExchangeSimulator
+from .exchange_simulator import FaultModel
+from .exchange_simulator import LatencyModel
+from .exchange_simulator import SimulatorConfig
+from .historical import CryptoCompareConfig
+from .historical import CryptoCompareHistoricalSource
+from .marketplace import InsufficientFundsError
+from .marketplace import KrakenConfig
+from .marketplace import TickerError
+from .marketplace.krakenex_adaptor import KrakenexMarketplace
+from .myrequests import HttpRequestError
+
+
+def make_market(simulator: ExchangeSimulator) -> KrakenexMarketplace:
+    handle = krakenex.API("key", "c2VjcmV0")
+    handle.uri = simulator.url
+    return KrakenexMarketplace(KrakenConfig("key", "c2VjcmV0", False, {}), handle)
+
+
+def test_kraken_endpoints() -> None:
+    config = SimulatorConfig(kraken_public_burst=10.0)
+    with ExchangeSimulator(config) as simulator:
+        market = make_market(simulator)
+        asset_pair = AssetPair("BTC", "EUR")
+        price = market.get_spot_price(asset_pair, datetime.datetime.now())
+        assert price.last > 0
+        assert market.get_balance() == {"EUR": 10000.0}
+        market.place_order(asset_pair, 0.001)
+        balance = market.get_balance()
+        assert balance["BTC"] == 0.001
+        assert balance["EUR"] < 10000.0
+        assert simulator.counts[("AddOrder", "ok")] == 1
+
+
+def test_kraken_faults() -> None:
+    config = SimulatorConfig(
+        faults=FaultModel(insufficient_funds=1.0), kraken_public_burst=1.0
+    )
+    with ExchangeSimulator(config) as simulator:
+        market = make_market(simulator)
+        asset_pair = AssetPair("BTC", "EUR")
+        with pytest.raises(InsufficientFundsError):
+            market.place_order(asset_pair, 0.001)
+        market.get_spot_price(asset_pair, datetime.datetime.now())
+        with pytest.raises(TickerError):
+            market.get_spot_price(asset_pair, datetime.datetime.now())
+        assert simulator.counts[("Ticker", "rate limited")] == 1
+
+
+def test_crypto_compare_histo() -> None:
+    config = SimulatorConfig(crypto_compare_rate=0.1, crypto_compare_burst=1.0)
+    with ExchangeSimulator(config) as simulator:
+        source = CryptoCompareHistoricalSource(
+            CryptoCompareConfig("key"), simulator.url
+        )
+        asset_pair = AssetPair("BTC", "EUR")
+        then = datetime.datetime.now() - datetime.timedelta(minutes=10)
+        assert source.get_price(then, asset_pair).last > 0
+        # The same window comes from the cache, hourly data needs a request.
+        assert source.get_price(then, asset_pair).last > 0
+        with pytest.raises(HttpRequestError):
+            source.get_price(then - datetime.timedelta(days=2), asset_pair)
+
+
+def test_crypto_compare_shared_requests() -> None:
+    config = SimulatorConfig(crypto_compare_latency=LatencyModel(0.05))
+    with ExchangeSimulator(config) as simulator:
+        source = CryptoCompareHistoricalSource(
+            CryptoCompareConfig("key"), simulator.url
+        )
+        asset_pair = AssetPair("ETH", "EUR")
+        then = datetime.datetime.now() - datetime.timedelta(hours=3)
+        threads = [
+            threading.Thread(target=source.get_price, args=(then, asset_pair))
+            for i in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert simulator.counts[("histominute", "ok")] == 1
+
+
+def test_crypto_compare_windows() -> None:
+    with ExchangeSimulator() as simulator:
+        datastore = make_datastore(None)
+        source = CryptoCompareHistoricalSource(
+            CryptoCompareConfig("key"), simulator.url, datastore
+        )
+        asset_pair = AssetPair("ADA", "EUR")
+        now = datetime.datetime.now()
+        for hours in [2, 3, 4]:
+            source.get_price(now - datetime.timedelta(hours=hours), asset_pair)
+            source.get_price(now - datetime.timedelta(days=hours), asset_pair)
+        assert simulator.counts[("histominute", "ok")] <= 2
+        assert simulator.counts[("histohour", "ok")] <= 2
+
+        prices = datastore.get_all_prices()
+        assert len(prices) > 1000
+        assert max(price.timestamp for price in prices) <= datetime.datetime.now()
+        stored = len(prices)
+        source.get_price(now - datetime.timedelta(hours=2), asset_pair)
+        assert len(datastore.get_all_prices()) == stored
+
+
+def test_server_errors() -> None:
+    config = SimulatorConfig(faults=FaultModel(server_error=1.0))
+    with ExchangeSimulator(config) as simulator:
+        market = make_market(simulator)
+        with pytest.raises(HttpRequestError):
+            market.get_spot_price(AssetPair("BTC", "EUR"), datetime.datetime.now())
@@ -0,0 +1,49 @@
+import io
+import pathlib
+import tempfile
+
+from .core import AssetPair
+from .datastorage import ListDatastore
+from .historical import MockHistorical
+from .marketplace import MockMarketplace
+from .profiling import SweepProfiler
+from .profiling import timed
+from .triggers import make_buy_trigger
+from .triggers import TriggerSpec
+from .watchloop import process_trigger
+
+
+def test_timed_without_sweep() -> None:
+    with timed("Nothing"):
+        pass
+
+
+def test_sweep_timing_tree() -> None:
+    trigger_spec = TriggerSpec(
+        name="Drop",
+        asset_pair=AssetPair("BTC", "EUR"),
+        drop_percentage=120.0,
+        volume_fiat=25.0,
+        cooldown_minutes=10,
+        delay_minutes=10,
+    )
+    trigger = make_buy_trigger(
+        ListDatastore(), MockHistorical(), MockMarketplace(), trigger_spec
+    )
+    output = io.StringIO()
+    profiler = SweepProfiler(output=output)
+    root = profiler.profile_sweep(lambda: process_trigger(trigger))
+    assert [child.name for child in root.children] == ["Drop"]
+    assert [child.name for child in root.children[0].children] == ["Cooldown", "Drop"]
+    assert "Sweep 1" in output.getvalue()
+
+
+def test_snapshot_rotation() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = pathlib.Path(tmpdir)
+        profiler = SweepProfiler(
+            path, snapshot_interval=1, snapshots_to_keep=2, output=io.StringIO()
+        )
+        for i in range(4):
+            profiler.profile_sweep(lambda: None)
+        assert len(list(path.glob("*.pstats"))) == 2
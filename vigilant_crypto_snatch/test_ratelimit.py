@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+
+from .ratelimit import get_scheduler
+from .ratelimit import Limit
+from .ratelimit import Priority
+from .ratelimit import RateLimitError
+from .ratelimit import RequestScheduler
+from .ratelimit import TokenBucket
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, duration: float) -> None:
+        self.now += duration
+
+
+def test_burst_and_refill() -> None:
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=3.0, clock=clock, sleep=clock.sleep)
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert bucket.time_until_available() == 0.5
+    clock.now += 0.5
+    assert bucket.try_acquire()
+    clock.now += 10
+    assert bucket.get_remaining() == 3.0
+
+
+def test_acquire_waits() -> None:
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1.0, capacity=1.0, clock=clock, sleep=clock.sleep)
+    bucket.acquire()
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.now == 2.0
+
+
+def test_scheduler_priorities() -> None:
+    scheduler = RequestScheduler("test", [Limit("second", 5.0, 1.0)])
+    scheduler.acquire()
+    order = []
+
+    def request(priority: Priority) -> None:
+        scheduler.acquire(priority)
+        order.append(priority)
+
+    threads = []
+    for priority in [Priority.HISTORY, Priority.TICKER, Priority.ORDER]:
+        thread = threading.Thread(target=request, args=(priority,))
+        thread.start()
+        threads.append(thread)
+        while len(scheduler.waiting) < len(threads):
+            time.sleep(0.001)
+    for thread in threads:
+        thread.join()
+    assert order == [Priority.ORDER, Priority.TICKER, Priority.HISTORY]
+
+
+def test_scheduler_gives_up() -> None:
+    scheduler = RequestScheduler(
+        "test",
+        [Limit("second", 10.0, 10.0), Limit("minute", 1 / 60, 1.0)],
+        max_wait={Priority.TICKER: 1.0},
+    )
+    scheduler.acquire()
+    assert scheduler.buckets["second"].get_remaining() >= 8.99
+    start = time.monotonic()
+    with pytest.raises(RateLimitError):
+        scheduler.acquire()
+    assert time.monotonic() - start < 0.5
+    assert scheduler.rejected_requests.get(api="test", priority="TICKER") == 1
+    scheduler.acquire(Priority.TICKER, cost=0.0)
+
+
+def test_get_scheduler() -> None:
+    public = get_scheduler("https://api.kraken.com/0/public")
+    assert public is get_scheduler("https://api.kraken.com/0/public/")
+    assert public is not get_scheduler("https://api.kraken.com/0/private")
+    assert "month" in get_scheduler("https://min-api.cryptocompare.com").buckets
+    assert get_scheduler("http://127.0.0.1:8000/0/public").buckets == {}
@@ -4,3 +4,4 @@ from .factory import make_triggers
 from .interface import InvalidTriggerSpec
 from .interface import Trigger
 from .interface import TriggerSpec
+from .triggered_delegates import DelegateEvaluation
@@ -3,6 +3,7 @@ import datetime
 from typing import Dict
 from typing import List
 from typing import Optional
+from typing import Tuple
 
 from .. import logger
 from ..core import AssetPair
@@ -13,7 +14,9 @@ from ..marketplace import check_and_perform_widthdrawal
 from ..marketplace import InsufficientFundsError
 from ..marketplace import Marketplace
 from ..marketplace import report_balances
+from ..profiling import timed
 from .interface import Trigger
+from .triggered_delegates import DelegateEvaluation
 from .triggered_delegates import TriggeredDelegate
 from .volume_fiat_delegates import VolumeFiatDelegate
 
@@ -45,6 +48,8 @@ class FailureTimeout(object):
 
 
 class BuyTrigger(Trigger, abc.ABC):
+    exploration_interval = 20
+
     def __init__(
         self,
         datastore: Datastore,
@@ -54,6 +59,7 @@ class BuyTrigger(Trigger, abc.ABC):
         triggered_delegates: Dict[str, Optional[TriggeredDelegate]],
         volume_fiat_delegate: VolumeFiatDelegate,
         name: str,
+        adaptive_order: bool = False,
     ):
         super().__init__()
         self.datastore = datastore
@@ -63,14 +69,43 @@ class BuyTrigger(Trigger, abc.ABC):
         self.triggered_delegates = triggered_delegates
         self.volume_fiat_delegate = volume_fiat_delegate
         self.name = name
+        self.adaptive_order = adaptive_order
+        self.checks = 0
         self.failure_timeout = FailureTimeout()
 
     def is_triggered(self, now: datetime.datetime) -> bool:
-        return all(
-            triggered_delegate.is_triggered(now)
-            for triggered_delegate in self.triggered_delegates.values()
+        # Statistics are only recorded for delegates that are evaluated. In
+        # adaptive mode all of them are therefore evaluated every few checks,
+        # so that those behind a rejecting delegate can move forward as well.
+        explore = self.adaptive_order and self.checks % self.exploration_interval == 0
+        self.checks += 1
+        triggered = True
+        for name, triggered_delegate in self.get_check_order():
+            with timed(name):
+                if not triggered_delegate.is_triggered(now):
+                    triggered = False
+                    if not explore:
+                        break
+        return triggered
+
+    def get_check_order(self) -> List[Tuple[str, TriggeredDelegate]]:
+        """
+        Orders the delegates such that cheap ones are checked first.
+
+        By default this uses the declared cost class, so local checks run before
+        database and network checks. In adaptive mode the observed pass rate and
+        latency of each delegate decide. Every `exploration_interval` checks
+        all delegates are evaluated to keep their statistics current.
+        """
+        delegates = [
+            (name, triggered_delegate)
+            for name, triggered_delegate in self.triggered_delegates.items()
             if triggered_delegate is not None
-        )
+        ]
+        if self.adaptive_order:
+            return sorted(delegates, key=lambda item: item[1].statistics.get_rank())
+        else:
+            return sorted(delegates, key=lambda item: item[1].cost)
 
     def fire(self, now: datetime.datetime) -> None:
         logger.info(f"Trigger “{self.get_name()}” fired, try buying …")
@@ -88,6 +123,9 @@ class BuyTrigger(Trigger, abc.ABC):
             self.failure_timeout.timeout_until = now + datetime.timedelta(hours=24)
         else:
             self.failure_timeout.finish()
+            # The trade changes cooldown and funds, so the remembered results
+            # for this timestamp are no longer valid.
+            self.forget_evaluations()
 
     def perform_buy(
         self, volume_coin: float, volume_fiat: float, now: datetime.datetime
@@ -117,14 +155,29 @@ class BuyTrigger(Trigger, abc.ABC):
     def get_name(self) -> str:
         return self.name
 
-    def get_stall_reasons(self) -> List[str]:
-        now = datetime.datetime.now()
-        reasons = [
-            triggered_delegate.format_stall_reason(now)
-            for triggered_delegate in self.triggered_delegates.values()
-            if triggered_delegate is not None
+    def get_evaluations(
+        self, now: datetime.datetime
+    ) -> Dict[str, Optional[DelegateEvaluation]]:
+        return {
+            name: None
+            if triggered_delegate is None
+            else triggered_delegate.evaluate(now)
+            for name, triggered_delegate in self.triggered_delegates.items()
+        }
+
+    def forget_evaluations(self) -> None:
+        for triggered_delegate in self.triggered_delegates.values():
+            if triggered_delegate is not None:
+                triggered_delegate.forget_evaluation()
+
+    def get_stall_reasons(self, now: Optional[datetime.datetime] = None) -> List[str]:
+        if now is None:
+            now = datetime.datetime.now()
+        return [
+            evaluation.reason
+            for evaluation in self.get_evaluations(now).values()
+            if evaluation is not None and not evaluation.triggered and evaluation.reason
         ]
-        return [reason for reason in reasons if reason]
 
 
 class CheckinTrigger(Trigger):
@@ -25,11 +25,13 @@ from .volume_fiat_delegates import VolumeFiatDelegate
 
 
 def make_buy_triggers(
-    config: List[TriggerSpec], session, source, market
+    config: List[TriggerSpec], session, source, market, adaptive_order: bool = False
 ) -> List[BuyTrigger]:
     active_triggers = []
     for trigger_spec in config:
-        trigger = make_buy_trigger(session, source, market, trigger_spec)
+        trigger = make_buy_trigger(
+            session, source, market, trigger_spec, adaptive_order
+        )
         active_triggers.append(trigger)
     return active_triggers
 
@@ -39,6 +41,7 @@ def make_buy_trigger(
     source: HistoricalSource,
     market: Marketplace,
     trigger_spec: TriggerSpec,
+    adaptive_order: bool = False,
 ) -> BuyTrigger:
     logger.debug(f"Processing trigger spec: {trigger_spec}")
 
@@ -107,6 +110,7 @@ def make_buy_trigger(
         triggered_delegates=triggered_delegates,
         volume_fiat_delegate=volume_fiat_delegate,
         name=trigger_spec.name,
+        adaptive_order=adaptive_order,
     )
     logger.debug(f"Constructed trigger: {result.get_name()}")
     return result
@@ -117,8 +121,9 @@ def make_triggers(
     datastore: Datastore,
     source: HistoricalSource,
     market: Marketplace,
+    adaptive_order: bool = False,
 ) -> List[Trigger]:
-    buy_triggers = make_buy_triggers(config, datastore, source, market)
+    buy_triggers = make_buy_triggers(config, datastore, source, market, adaptive_order)
     longest_cooldown = max(
         (
             trigger_spec.delay_minutes
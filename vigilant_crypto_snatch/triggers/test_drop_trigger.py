@@ -48,3 +48,57 @@ def test_waiting() -> None:
     )
     datastore.add_trade(trade)
     assert not drop_trigger.is_triggered(now)
+
+
+def test_stall_reasons_reuse_evaluation() -> None:
+    drop_trigger, source = make_drop_trigger()
+    now = datetime.datetime.now()
+    assert not drop_trigger.is_triggered(now)
+    reasons = drop_trigger.get_stall_reasons(now)
+    evaluations = drop_trigger.get_evaluations(now)
+    assert source.calls == 2
+    assert any("Old price" in reason for reason in reasons)
+    assert evaluations["Start"] is None
+    drop = evaluations["Drop"]
+    assert drop is not None
+    assert not drop.triggered
+    assert drop.values["critical"] < 0
+
+
+def test_cheap_delegates_first() -> None:
+    drop_trigger, source = make_drop_trigger()
+    names = [name for name, delegate in drop_trigger.get_check_order()]
+    assert names == ["Cooldown", "Drop", "Funds"]
+
+    now = datetime.datetime.now()
+    drop_trigger.datastore.add_trade(
+        Trade(now, drop_trigger.get_name(), 1.0, 1.0, AssetPair("BTC", "EUR"))
+    )
+    assert not drop_trigger.is_triggered(now)
+    assert source.calls == 0
+
+
+def test_adaptive_order() -> None:
+    drop_trigger, source = make_drop_trigger()
+    drop_trigger.adaptive_order = True
+    drop = drop_trigger.triggered_delegates["Drop"]
+    cooldown = drop_trigger.triggered_delegates["Cooldown"]
+    assert drop is not None and cooldown is not None
+    # Drop always fails quickly in this test, the cooldown always passes.
+    for i in range(20):
+        drop.statistics.record(False, 1e-4)
+        cooldown.statistics.record(True, 1e-4)
+    names = [name for name, delegate in drop_trigger.get_check_order()]
+    assert names[0] == "Drop"
+
+
+def test_adaptive_order_explores() -> None:
+    drop_trigger, source = make_drop_trigger()
+    drop_trigger.adaptive_order = True
+    funds = drop_trigger.triggered_delegates["Funds"]
+    assert funds is not None
+    now = datetime.datetime.now()
+    for i in range(2 * drop_trigger.exploration_interval):
+        assert not drop_trigger.is_triggered(now + datetime.timedelta(minutes=i))
+    # The drop always fails, so the funds are only checked when exploring.
+    assert funds.statistics.checks == 2
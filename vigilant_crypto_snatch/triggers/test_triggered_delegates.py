@@ -1,7 +1,9 @@
 import datetime
 
 from ..feargreed import AlternateMeFearAndGreedIndex
+from ..marketplace import MockMarketplace
 from .triggered_delegates import FearAndGreedIndexTriggeredDelegate
+from .triggered_delegates import SufficientFundsTriggeredDelegate
 
 
 def test_fear_and_greed_triggered_delegate_true() -> None:
@@ -14,3 +16,16 @@ def test_fear_and_greed_triggered_delegate_false() -> None:
     index = AlternateMeFearAndGreedIndex(test=True)
     delegate = FearAndGreedIndexTriggeredDelegate(25, index)
     assert not delegate.is_triggered(datetime.datetime(2021, 12, 22))
+
+
+def test_sufficient_funds_stall_reason() -> None:
+    market = MockMarketplace()
+    now = datetime.datetime(2021, 12, 22)
+    poor = SufficientFundsTriggeredDelegate(1e9, "EUR", market)
+    assert not poor.is_triggered(now)
+    reason = poor.format_stall_reason(now)
+    assert reason is not None
+    assert "below the required" in reason
+    rich = SufficientFundsTriggeredDelegate(1.0, "EUR", market)
+    assert rich.is_triggered(now)
+    assert rich.format_stall_reason(now) is None
@@ -1,5 +1,11 @@
+import dataclasses
 import datetime
+import enum
+import time
+from typing import Any
+from typing import Dict
 from typing import Optional
+from typing import Tuple
 
 from .. import logger
 from ..core import AssetPair
@@ -10,32 +16,114 @@ from ..historical import HistoricalSource
 from ..marketplace import Marketplace
 
 
+@dataclasses.dataclass()
+class DelegateEvaluation:
+    triggered: bool
+    values: Dict[str, Any] = dataclasses.field(default_factory=dict)
+    reason: Optional[str] = None
+
+
+class DelegateCost(enum.IntEnum):
+    LOCAL = 0
+    DATABASE = 1
+    NETWORK = 2
+
+
+# Assumed latency in seconds until a delegate has been timed.
+default_latencies = {
+    DelegateCost.LOCAL: 1e-6,
+    DelegateCost.DATABASE: 1e-3,
+    DelegateCost.NETWORK: 0.1,
+}
+
+
+class DelegateStatistics(object):
+    """
+    Moving averages of how often a delegate passes and how long it takes.
+    """
+
+    def __init__(self, cost: DelegateCost, smoothing: float = 0.1):
+        self.smoothing = smoothing
+        self.checks = 0
+        self.pass_rate = 0.5
+        self.latency = default_latencies[cost]
+
+    def record(self, triggered: bool, duration: float) -> None:
+        self.checks += 1
+        alpha = max(self.smoothing, 1 / self.checks)
+        self.pass_rate += alpha * (float(triggered) - self.pass_rate)
+        self.latency += alpha * (duration - self.latency)
+
+    def get_rank(self) -> float:
+        # Checking conditions in increasing order of cost per rejection
+        # minimizes the expected time until the first one fails.
+        return self.latency / max(1.0 - self.pass_rate, 0.01)
+
+
 class TriggeredDelegate(object):
+    """
+    A single condition of a trigger.
+
+    Subclasses implement `_evaluate`. The result is remembered for the last
+    timestamp, so checking the trigger, formatting stall reasons and showing
+    the status within the same sweep only do the work once.
+    """
+
+    cost = DelegateCost.NETWORK
+
+    def __init__(self):
+        self._last_evaluation: Optional[
+            Tuple[datetime.datetime, DelegateEvaluation]
+        ] = None
+        self.statistics = DelegateStatistics(self.cost)
+
+    def evaluate(self, now: datetime.datetime) -> DelegateEvaluation:
+        if self._last_evaluation is not None and self._last_evaluation[0] == now:
+            return self._last_evaluation[1]
+        start = time.perf_counter()
+        evaluation = self._evaluate(now)
+        self.statistics.record(evaluation.triggered, time.perf_counter() - start)
+        self._last_evaluation = (now, evaluation)
+        return evaluation
+
+    def forget_evaluation(self) -> None:
+        self._last_evaluation = None
+
     def is_triggered(self, now: datetime.datetime) -> bool:
-        raise NotImplementedError()  # pragma: no cover
+        return self.evaluate(now).triggered
 
     def format_stall_reason(self, now: datetime.datetime) -> Optional[str]:
+        evaluation = self.evaluate(now)
+        if evaluation.triggered:
+            return None
+        else:
+            return evaluation.reason
+
+    def _evaluate(self, now: datetime.datetime) -> DelegateEvaluation:
         raise NotImplementedError()  # pragma: no cover
 
 
 class StartTriggeredDelegate(TriggeredDelegate):
+    cost = DelegateCost.LOCAL
+
     def __init__(self, start: datetime.datetime):
+        super().__init__()
         self.start = start
 
-    def is_triggered(self, now: datetime.datetime) -> bool:
-        return self.start <= now
+    def _evaluate(self, now: datetime.datetime) -> DelegateEvaluation:
+        return DelegateEvaluation(
+            triggered=self.start <= now,
+            values={"start": self.start},
+            reason=f"Start ({self.start.isoformat()}) is not reached yet.",
+        )
 
     def __str__(self) -> str:
         return f"StartTriggeredDelegate(start={self.start})"
 
-    def format_stall_reason(self, now: datetime.datetime) -> Optional[str]:
-        if not self.is_triggered(now):
-            return f"Start ({self.start.isoformat()}) is not reached yet."
-        else:
-            return None
-
 
 class CooldownTriggeredDelegate(TriggeredDelegate):
+    cost = DelegateCost.DATABASE
+
     def __init__(
         self,
         cooldown_minutes: int,
@@ -43,26 +131,29 @@ class CooldownTriggeredDelegate(TriggeredDelegate):
         asset_pair: AssetPair,
         name: str,
     ):
+        super().__init__()
         self.cooldown_minutes = cooldown_minutes
         self.datastore = datastore
         self.asset_pair = asset_pair
         self.name = name
 
-    def is_triggered(self, now: datetime.datetime) -> bool:
+    def _evaluate(self, now: datetime.datetime) -> DelegateEvaluation:
         then = now - datetime.timedelta(minutes=self.cooldown_minutes)
-        return not self.datastore.was_triggered_since(self.name, self.asset_pair, then)
+        return DelegateEvaluation(
+            triggered=not self.datastore.was_triggered_since(
+                self.name, self.asset_pair, then
+            ),
+            values={"since": then},
+            reason="Cooldown not over yet.",
+        )
 
     def __str__(self) -> str:
         return f"CooldownTriggeredDelegate({self.cooldown_minutes} minutes)"
 
-    def format_stall_reason(self, now: datetime.datetime) -> Optional[str]:
-        if not self.is_triggered(now):
-            return "Cooldown not over yet."
-        else:
-            return None
-
 
 class DropTriggeredDelegate(TriggeredDelegate):
+    cost = DelegateCost.NETWORK
+
     def __init__(
         self,
         asset_pair: AssetPair,
@@ -70,12 +161,13 @@ class DropTriggeredDelegate(TriggeredDelegate):
         drop_percentage: float,
         source: HistoricalSource,
     ):
+        super().__init__()
         self.asset_pair = asset_pair
         self.delay_minutes = delay_minutes
         self.drop_percentage = drop_percentage
         self.source = source
 
-    def is_triggered(self, now: datetime.datetime) -> bool:
+    def _evaluate(self, now: datetime.datetime) -> DelegateEvaluation:
         price = self.source.get_price(now, self.asset_pair)
         then = now - datetime.timedelta(minutes=self.delay_minutes)
         try:
@@ -85,53 +177,65 @@ class DropTriggeredDelegate(TriggeredDelegate):
                 f"Could not retrieve a historical price, so cannot determine if strategy “{self}” was triggered."
                 f" The original error is: {e}"
             )
-            return False
+            return DelegateEvaluation(
+                triggered=False,
+                values={"price": price.last},
+                reason=f"Old price is not available: {e}",
+            )
         critical = float(then_price.last) * (1 - self.drop_percentage / 100)
-        return price.last < critical
+        return DelegateEvaluation(
+            triggered=price.last < critical,
+            values={
+                "price": price.last,
+                "then_price": then_price.last,
+                "critical": critical,
+            },
+            reason=f"Old price ({then_price}) is too high.",
+        )
 
     def __str__(self) -> str:
         return f"Drop(delay_minutes={self.delay_minutes}, drop={self.drop_percentage})"  # pragma: no cover
 
-    def format_stall_reason(self, now: datetime.datetime) -> Optional[str]:
-        if not self.is_triggered(now):
-            then = now - datetime.timedelta(minutes=self.delay_minutes)
-            then_price = self.source.get_price(then, self.asset_pair)
-            return f"Old price ({then_price}) is too high."
-        else:
-            return None
-
 
 class FearAndGreedIndexTriggeredDelegate(TriggeredDelegate):
+    cost = DelegateCost.NETWORK
+
     def __init__(self, threshold: int, index: FearAndGreedIndex):
+        super().__init__()
         self.threshold = threshold
         self.index = index
 
-    def is_triggered(self, now: datetime.datetime) -> bool:
+    def _evaluate(self, now: datetime.datetime) -> DelegateEvaluation:
         value = self.index.get_value(now.date(), now.date())
-        return value < self.threshold
+        return DelegateEvaluation(
+            triggered=value < self.threshold,
+            values={"value": value},
+            reason=f"Fear & Greed index ({value}) is higher than threshold ({self.threshold}).",
+        )
 
     def __str__(self) -> str:
         return (
             f"FearAndGreedIndexTriggeredDelegate({self.threshold})"  # pragma: no cover
         )
 
-    def format_stall_reason(self, now: datetime.datetime) -> Optional[str]:
-        if not self.is_triggered(now):
-            value = self.index.get_value(now.date(), now.date())
-            return f"Fear & Greed index ({value}) is higher than threshold ({self.threshold})."
-        else:
-            return None
-
 
 class SufficientFundsTriggeredDelegate(TriggeredDelegate):
+    cost = DelegateCost.NETWORK
+
     def __init__(self, required_fiat: float, fiat: str, marketplace: Marketplace):
+        super().__init__()
         self.fiat = fiat
         self.required_fiat = required_fiat
         self.marketplace = marketplace
 
-    def is_triggered(self, now: datetime.datetime) -> bool:
+    def _evaluate(self, now: datetime.datetime) -> DelegateEvaluation:
         try:
             balances = self.marketplace.get_balance()
-            return balances[self.fiat] >= self.required_fiat
         except NotImplementedError:
-            return True
+            return DelegateEvaluation(triggered=True)
+        balance = balances.get(self.fiat, 0.0)
+        return DelegateEvaluation(
+            triggered=balance >= self.required_fiat,
+            values={"balance": balance},
+            reason=f"Balance ({balance} {self.fiat}) is below the required {self.required_fiat} {self.fiat}.",
+        )
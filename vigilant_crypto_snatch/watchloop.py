@@ -3,6 +3,7 @@ import logging
 import time
 import traceback
 import typing
+from typing import Optional
 
 from . import logger
 from .datastorage import DatastoreException
@@ -10,19 +11,44 @@ from .feargreed import FearAndGreedException
 from .marketplace import BuyError
 from .marketplace import TickerError
 from .marketplace import WithdrawalError
+from .metrics import registry
 from .myrequests import HttpRequestError
-from .notifications import message_queue_holder
+from .notifications import notification_router
+from .profiling import SweepProfiler
+from .profiling import timed
 from .triggers import Trigger
 
+sweep_duration = registry.histogram(
+    "vcs_sweep_duration_seconds", "Time to check all active triggers once."
+)
+trigger_checks = registry.counter(
+    "vcs_trigger_checks_total", "Number of times a trigger was checked.", ["trigger"]
+)
+trigger_fired = registry.counter(
+    "vcs_trigger_fired_total", "Number of times a trigger has fired.", ["trigger"]
+)
+trigger_errors = registry.counter(
+    "vcs_trigger_errors_total",
+    "Errors while processing a trigger, by exception class.",
+    ["trigger", "exception"],
+)
+trigger_duration = registry.histogram(
+    "vcs_trigger_duration_seconds",
+    "Time to check and possibly fire a trigger.",
+    ["trigger"],
+)
+
 
 class TriggerLoop(object):
     def __init__(
         self,
         active_triggers: typing.List[Trigger],
         sleep: int,
+        profiler: Optional[SweepProfiler] = None,
     ):
         self.active_triggers = active_triggers
         self.sleep = sleep
+        self.profiler = profiler
 
     def loop(self) -> None:
         try:
@@ -30,46 +56,64 @@ class TriggerLoop(object):
                 self.loop_body()
         except KeyboardInterrupt:
             logger.info("User interrupted, shutting down.")
-            if message_queue_holder.get() is not None:
-                message_queue_holder.get().shutdown()
+            notification_router.shutdown()
 
     def loop_body(self) -> None:
-        for trigger in self.active_triggers:
-            process_trigger(trigger)
+        with sweep_duration.time():
+            if self.profiler is None:
+                self.check_triggers()
+            else:
+                self.profiler.profile_sweep(self.check_triggers)
         logger.debug(f"All triggers checked, sleeping for {self.sleep} seconds …")
         time.sleep(self.sleep)
 
+    def check_triggers(self) -> None:
+        for trigger in self.active_triggers:
+            process_trigger(trigger)
+
 
-def notify_and_continue(exception: Exception, severity: int) -> None:
+def notify_and_continue(trigger: Trigger, exception: Exception, severity: int) -> None:
+    trigger_errors.inc(trigger=trigger.get_name(), exception=type(exception).__name__)
     logger.log(
         severity, f"An exception of type {type(exception)} has occurred: {exception}"
     )
     logger.debug(traceback.format_exc())
 
 
-def process_trigger(trigger: Trigger):
+def process_trigger(trigger: Trigger, now: Optional[datetime.datetime] = None):
     logger.debug(f"Checking trigger “{trigger.get_name()}” …")
+    trigger_checks.inc(trigger=trigger.get_name())
+    start = time.perf_counter()
     try:
-        now = datetime.datetime.now()
-        if trigger.is_triggered(now):
-            trigger.fire(now)
+        with timed(trigger.get_name()):
+            if now is None:
+                now = datetime.datetime.now()
+            if trigger.is_triggered(now):
+                trigger_fired.inc(trigger=trigger.get_name())
+                with timed("Fire"):
+                    trigger.fire(now)
     except HttpRequestError as e:
-        notify_and_continue(e, logging.DEBUG)
+        notify_and_continue(trigger, e, logging.DEBUG)
     except TickerError as e:
-        notify_and_continue(e, logging.ERROR)
+        notify_and_continue(trigger, e, logging.ERROR)
     except BuyError as e:
-        notify_and_continue(e, logging.CRITICAL)
+        notify_and_continue(trigger, e, logging.CRITICAL)
     except WithdrawalError as e:
-        notify_and_continue(e, logging.CRITICAL)
+        notify_and_continue(trigger, e, logging.CRITICAL)
     except DatastoreException as e:
-        notify_and_continue(e, logging.ERROR)
+        notify_and_continue(trigger, e, logging.ERROR)
     except FearAndGreedException as e:
-        notify_and_continue(e, logging.ERROR)
+        notify_and_continue(trigger, e, logging.ERROR)
     except KeyboardInterrupt:
         raise
     except Exception as e:
+        trigger_errors.inc(trigger=trigger.get_name(), exception=type(e).__name__)
         logger.critical(
             f"Unhandled exception type: {repr(e)}. Please report this to Martin!\n"
             f"\n"
             f"{traceback.format_exc()}\n"
         )
+    finally:
+        trigger_duration.observe(
+            time.perf_counter() - start, trigger=trigger.get_name()
+        )